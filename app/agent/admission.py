@@ -0,0 +1,131 @@
+import asyncio
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.observability.metrics import ADMISSION
+
+ADMITTED = "admitted"
+COALESCED = "coalesced"
+QUEUE_FULL = "queue_full"
+TIMED_OUT = "timed_out"
+
+# Weight of the newest run in the moving average behind Retry-After hints.
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing an agent run the server cannot start soon enough."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Server busy ({reason}), retry in {retry_after}s")
+
+    @property
+    def status_code(self) -> int:
+        # A full queue sheds the burst right away (429); a queued request that
+        # could not start within `max_wait` means the server is behind (503).
+        return 429 if self.reason == QUEUE_FULL else 503
+
+
+class AdmissionController:
+    """
+    Admission control for agent runs in one API process.
+
+    - at most `max_concurrent` runs execute at once; up to `max_queue` more
+      wait for a slot, and later arrivals are rejected at once (Overloaded)
+    - a queued run that cannot start within `max_wait` seconds is rejected too
+    - concurrent runs with the same key execute once and share the result;
+      the shared run is not cancelled when one of its callers goes away
+    - rejections carry a Retry-After hint from the average run time
+
+    0 disables a limit.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32, max_wait: float = 15.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self._active = 0
+        self._waiting = 0
+        self._avg_seconds = 1.0
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, assuming the queue drains at the average rate."""
+        slots = self.max_concurrent or 1
+        return max(1, math.ceil(self._avg_seconds * (self._waiting + 1) / slots))
+
+    def _reject(self, reason: str) -> Overloaded:
+        ADMISSION.inc(result=reason)
+        return Overloaded(reason, self.retry_after())
+
+    def check(self) -> None:
+        """Raise Overloaded if a run arriving now would be turned away for a full queue."""
+        # Counted here rather than asked of the semaphore, which only sees a
+        # waiter once its acquire has been scheduled.
+        if self._semaphore is not None and self.max_queue \
+                and self._active + self._waiting >= self.max_concurrent + self.max_queue:
+            raise self._reject(QUEUE_FULL)
+
+    async def acquire(self) -> None:
+        """Wait for a run slot; raises Overloaded when the queue is full or the wait too long."""
+        self.check()
+        if self._semaphore is not None:
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.max_wait or None)
+            except asyncio.TimeoutError:
+                raise self._reject(TIMED_OUT) from None
+            finally:
+                self._waiting -= 1
+        self._active += 1
+        ADMISSION.inc(result=ADMITTED)
+
+    def release(self, started: Optional[float] = None) -> None:
+        self._active -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+        if started is not None:
+            elapsed = time.monotonic() - started
+            self._avg_seconds += _EWMA_ALPHA * (elapsed - self._avg_seconds)
+
+    async def run(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `factory()` in a slot."""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            return await factory()
+        finally:
+            self.release(started)
+
+    async def run_once(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        `(result, shared)`: `factory()` run in a slot, or the result of the run
+        already in flight for `key` (`shared=True`), which takes no extra slot.
+        """
+        loop_key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(loop_key)
+        shared = task is not None
+        if shared:
+            ADMISSION.inc(result=COALESCED)
+        else:
+            task = self._inflight[loop_key] = asyncio.ensure_future(self.run(factory))
+            task.add_done_callback(lambda _: self._inflight.pop(loop_key, None))
+            # Mark failures as retrieved when every caller has gone away.
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> dict:
+        return {"active": self._active, "queued": self._waiting, "avg_seconds": self._avg_seconds}
+
+
+def admission_from_env() -> AdmissionController:
+    return AdmissionController(
+        max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", "8")),
+        max_queue=int(os.getenv("AGENT_MAX_QUEUE", "32")),
+        max_wait=float(os.getenv("AGENT_QUEUE_TIMEOUT", "15")),
+    )
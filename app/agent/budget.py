@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.observability.metrics import BUDGET_EXHAUSTED
+
+DEADLINE = "deadline"
+ITERATIONS = "iterations"
+TOKENS = "tokens"
+GITHUB_CALLS = "github_calls"
+
+# How each budget is described to the user.
+_DESCRIPTIONS = {DEADLINE: "time", ITERATIONS: "step", TOKENS: "token", GITHUB_CALLS: "GitHub call"}
+
+# Characters of each tool observation quoted in a partial answer.
+PARTIAL_OBSERVATION_CHARS = 600
+
+
+class BudgetExceeded(Exception):
+    """Raised when a request tries to spend past one of its budgets."""
+
+    def __init__(self, budget: str):
+        self.budget = budget
+        super().__init__(f"Request {_DESCRIPTIONS[budget]} budget exhausted")
+
+
+@dataclass(frozen=True)
+class BudgetLimits:
+    """Per-request limits; 0 disables a limit."""
+
+    max_seconds: float = 60.0
+    max_iterations: int = 8
+    max_tokens: int = 20000
+    max_github_calls: int = 40
+
+    @classmethod
+    def from_env(cls) -> "BudgetLimits":
+        return cls(
+            max_seconds=float(os.getenv("AGENT_MAX_SECONDS", "60")),
+            max_iterations=int(os.getenv("AGENT_MAX_ITERATIONS", "8")),
+            max_tokens=int(os.getenv("AGENT_MAX_TOKENS", "20000")),
+            max_github_calls=int(os.getenv("AGENT_MAX_GITHUB_CALLS", "40")),
+        )
+
+
+class RequestBudget:
+    """
+    What one agent turn has spent against its BudgetLimits. The first budget
+    to run out is recorded in `exhausted` (and counted once in
+    `agent_budget_exhausted_total`); from then on the ReAct loop stops at the
+    next iteration and further GitHub calls are refused. Tool observations are
+    kept so a best-effort answer can still be returned.
+    """
+
+    def __init__(self, limits: BudgetLimits):
+        self.limits = limits
+        self.started = time.monotonic()
+        self.deadline = self.started + limits.max_seconds if limits.max_seconds else None
+        self.iterations = 0
+        self.tokens = 0
+        self.github_calls = 0
+        self.exhausted: Optional[str] = None
+        self.observations: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhaust(self, budget: str) -> None:
+        with self._lock:
+            if self.exhausted is not None:
+                return
+            self.exhausted = budget
+        BUDGET_EXHAUSTED.inc(budget=budget)
+
+    def _check(self) -> Optional[str]:
+        if self.exhausted is not None:
+            return self.exhausted
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.exhaust(DEADLINE)
+        elif self.limits.max_tokens and self.tokens >= self.limits.max_tokens:
+            self.exhaust(TOKENS)
+        return self.exhausted
+
+    def allow_iteration(self, iterations: int) -> bool:
+        """Called by the ReAct loop before each step; `iterations` are the steps already taken."""
+        self.iterations = iterations
+        if self._check() is None and self.limits.max_iterations and iterations >= self.limits.max_iterations:
+            self.exhaust(ITERATIONS)
+        return self.exhausted is None
+
+    def charge_tokens(self, tokens: int) -> None:
+        with self._lock:
+            self.tokens += tokens
+
+    def charge_github_call(self) -> None:
+        if self._check() is None:
+            with self._lock:
+                self.github_calls += 1
+                over = self.limits.max_github_calls and self.github_calls > self.limits.max_github_calls
+            if over:
+                self.exhaust(GITHUB_CALLS)
+        if self.exhausted is not None:
+            raise BudgetExceeded(self.exhausted)
+
+    def observe(self, tool: str, output: Any) -> None:
+        self.observations.append((tool, str(output)))
+
+    def partial_answer(self) -> str:
+        reason = _DESCRIPTIONS.get(self.exhausted, "request")
+        if not self.observations:
+            return (f"⏱️ I ran out of my {reason} budget before I could answer. "
+                    "Please try a narrower question.")
+        parts = [f"⏱️ I ran out of my {reason} budget before finishing. Here is what I found so far:"]
+        for tool, output in self.observations:
+            text = output.strip()
+            if len(text) > PARTIAL_OBSERVATION_CHARS:
+                text = text[:PARTIAL_OBSERVATION_CHARS].rstrip() + " …"
+            parts.append(f"**{tool}**\n{text}")
+        return "\n\n".join(parts)
+
+    def stats(self) -> dict:
+        return {
+            "elapsed": time.monotonic() - self.started,
+            "iterations": self.iterations,
+            "tokens": self.tokens,
+            "github_calls": self.github_calls,
+            "exhausted": self.exhausted,
+        }
+
+
+_current_budget: ContextVar[Optional[RequestBudget]] = ContextVar("current_budget", default=None)
+
+
+def current_budget() -> Optional[RequestBudget]:
+    return _current_budget.get()
+
+
+def charge_github_call() -> None:
+    """Count one GitHub request against the current request's budget, if any."""
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.charge_github_call()
+
+
+@contextmanager
+def request_budget(limits: BudgetLimits):
+    budget = RequestBudget(limits)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        try:
+            _current_budget.reset(token)
+        except ValueError:
+            # Async generators may be closed from another context (client disconnect).
+            pass
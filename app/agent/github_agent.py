@@ -1,23 +1,31 @@
 # github_agent.py
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
 
-from langchain import hub
 from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain.agents import AgentExecutor, create_react_agent, create_tool_calling_agent
+from langchain_core.agents import AgentAction
+from langchain_core.messages import HumanMessage, AIMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START, MessagesState, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
-from langchain.chains.summarize import load_summarize_chain
-from tiktoken import encoding_for_model
-
-from app.client.openai_client import get_openai_llm
-from app.tools.search_github_repo import search_github_repo
-from app.tools.github_describe_repo import github_describe_repo
-from app.tools.github_issue_details import github_issue_details
-from app.tools.github_pr_details import github_pr_details
-from app.tools.list_top_issues import list_top_issues
-from app.tools.list_top_prs import list_top_prs
-from app.tools.github_pr_review import github_review_pr
-from app.tools.github_issue_review import github_issue_fixer
+
+from app.agent.budget import DEADLINE, BudgetLimits, current_budget, request_budget
+from app.agent.checkpointer import get_checkpointer
+from app.agent.prompts import get_react_prompt, get_tool_calling_prompt
+from app.agent.tokens import TokenAccountant, message_text
+from app.client.cassette_llm import CassetteChatModel
+from app.client.openai_client import OPENAI_MODEL, get_openai_llm
+from app.observability.callbacks import BudgetCallbackHandler, TraceCallbackHandler
+from app.observability.cassette import Recorder, current_cassette, recorder_from_env
+from app.observability.metrics import NODE_SECONDS, REQUEST_SECONDS
+from app.observability.tracing import trace, traced
+from app.tools import load_tools
+from app.tools.output import output_scope
 
 import logging
 
@@ -29,101 +37,410 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+REACT = "react"
+TOOL_CALLING = "tool_calling"
+
+# Tool calls from one model turn run concurrently; the async executor gathers
+# them itself, the sync one uses this pool.
+_tool_pool = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_MAX_PARALLEL_TOOLS", "8")), thread_name_prefix="tool")
+# Actions of the step the sync executor is currently running, with their futures once submitted.
+_step_actions: ContextVar[Optional[dict]] = ContextVar("step_actions", default=None)
+
+class FinalAnswerFilter:
+    """
+    Passes through only the text a ReAct generation emits after "Final Answer:".
+    With `marker=None` (tool-calling mode, where the answer is the whole
+    message) everything but leading whitespace passes.
+    """
+
+    def __init__(self, marker: Optional[str] = FINAL_ANSWER_MARKER):
+        self._marker = marker
+        self._buffer = ""
+        self._answering = marker is None
+        self._leading = True
+
+    def feed(self, chunk: str) -> str:
+        if not self._answering:
+            self._buffer += chunk
+            idx = self._buffer.find(self._marker)
+            if idx == -1:
+                return ""
+            self._answering = True
+            chunk = self._buffer[idx + len(self._marker):]
+            self._buffer = ""
+        if self._leading:
+            chunk = chunk.lstrip()
+            self._leading = not chunk
+        return chunk
+
+class GitHubAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor whose loop also stops once the current request budget runs
+    out, and whose sync path runs the tool calls of one model turn concurrently
+    (as the async path already does).
+    """
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        budget = current_budget()
+        if budget is None:
+            return super()._should_continue(iterations, time_elapsed)
+        return budget.allow_iteration(iterations)
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        # The base generator yields every AgentAction of the turn before it
+        # performs the first one, so they are all known by then.
+        step = {"actions": [], "futures": None}
+        token = _step_actions.set(step)
+        try:
+            for output in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+                if isinstance(output, AgentAction):
+                    step["actions"].append(output)
+                yield output
+        finally:
+            try:
+                _step_actions.reset(token)
+            except ValueError:
+                pass
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        step = _step_actions.get()
+        if step is None or len(step["actions"]) < 2:
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        if step["futures"] is None:
+            perform = super()._perform_agent_action
+            step["futures"] = [
+                _tool_pool.submit(contextvars.copy_context().run, perform, name_to_tool_map, color_mapping, action, run_manager)
+                for action in step["actions"]
+            ]
+        index = next(i for i, action in enumerate(step["actions"]) if action is agent_action)
+        return step["futures"][index].result()
+
+class AgentState(MessagesState):
+    # Per-message token counts (keyed by message id) and their running sum,
+    # so the summarize node only has to encode messages added since last turn.
+    token_counts: dict[str, int]
+    total_tokens: int
+    # Rolling summary of messages evicted from the history.
+    summary: str
+
+SUMMARY_REFINE_PROMPT = """
+Progressively summarize the conversation between a user and a GitHub assistant.
+Extend the current summary with the new lines, keeping repository names, URLs,
+issue/PR numbers and any conclusions. Return only the updated summary.
+
+Current summary:
+{summary}
+
+New lines:
+{new_lines}
+
+Updated summary:
+""".strip()
+
 class GitHubAgent:
-    def __init__(self, thread_id: str = "default-thread"):
+    """
+    Builds the LLMs, ReAct agent and LangGraph app once. Conversations are kept
+    apart by LangGraph thread ID, so one instance can serve many sessions:
+    pass `thread_id` to `chat`/`achat`, or rely on the default given here.
+
+    With a `recorder` (or CASSETTE_DIR set) every turn's LLM calls and
+    GitHub responses are recorded into a cassette, for `app.agent.replay`.
+    """
+
+    def __init__(self, thread_id: str = "default-thread", checkpointer=None, llm=None, summarizer_llm=None,
+                 agent_mode: Optional[str] = None, recorder: Optional[Recorder] = None):
         self.thread_id = thread_id
         self.max_tokens = 2000
-        self.encoder = encoding_for_model("gpt-3.5-turbo")
-
-        self.llm = get_openai_llm()
-        self.summarizer_llm = ChatOpenAI(temperature=0.0, model="gpt-3.5-turbo")
-
-        self.tools = [
-            search_github_repo,
-            github_describe_repo,
-            github_issue_details,
-            github_pr_details,
-            list_top_issues,
-            list_top_prs,
-            github_review_pr,
-            github_issue_fixer
-        ]
-
-        self.react_prompt = hub.pull("hwchase17/react")
-        self.agent = create_react_agent(self.llm, self.tools, self.react_prompt)
-        self.agent_executor = AgentExecutor(
+
+        self.llm = llm or get_openai_llm()
+        self.summarizer_llm = summarizer_llm or ChatOpenAI(temperature=0.0, model="gpt-3.5-turbo")
+        self.recorder = recorder or recorder_from_env()
+        if self.recorder is not None:
+            if not isinstance(self.llm, CassetteChatModel):
+                self.llm = CassetteChatModel(inner=self.llm)
+            if not isinstance(self.summarizer_llm, CassetteChatModel):
+                self.summarizer_llm = CassetteChatModel(inner=self.summarizer_llm)
+        # Count tokens with the tokenizer of the model that actually sees the history.
+        self.tokens = TokenAccountant(getattr(self.llm, "model_name", None) or OPENAI_MODEL)
+
+        # "react" (text ReAct prompt, one tool per LLM call) or "tool_calling"
+        # (native function calling with typed arguments; several tools per call).
+        self.agent_mode = (agent_mode or os.getenv("AGENT_MODE", REACT)).lower()
+        if self.agent_mode not in (REACT, TOOL_CALLING):
+            raise ValueError(f"Unknown AGENT_MODE {self.agent_mode!r}; use {REACT!r} or {TOOL_CALLING!r}")
+        self.tools = load_tools(structured=self.agent_mode == TOOL_CALLING)
+
+        # Default per-turn limits (AGENT_MAX_*); chat/achat/astream accept overrides.
+        self.budget_limits = BudgetLimits.from_env()
+
+        if self.agent_mode == TOOL_CALLING:
+            self.prompt = get_tool_calling_prompt()
+            self.agent = create_tool_calling_agent(self.llm, self.tools, self.prompt)
+        else:
+            self.prompt = get_react_prompt()
+            self.agent = create_react_agent(self.llm, self.tools, self.prompt)
+        self.agent_executor = GitHubAgentExecutor(
             agent=self.agent,
             tools=self.tools,
-            verbose=True,
             handle_parsing_errors=True,
+            # Only used when the executor runs outside a request budget.
+            max_iterations=self.budget_limits.max_iterations or None,
+            max_execution_time=self.budget_limits.max_seconds or None,
         )
 
-        self.summary_chain = load_summarize_chain(
-            self.summarizer_llm,
-            chain_type="map_reduce",
-            verbose=False,
-        )
+        # "inline" folds evicted messages into the summary before answering;
+        # "background" (async path only) does it after the reply is returned.
+        self.summary_mode = os.getenv("SUMMARY_MODE", "inline").lower()
+        self.keep_last_messages = 5
+        self._compactions: dict[str, asyncio.Task] = {}
 
-        self.memory = MemorySaver()
+        self.memory = checkpointer or get_checkpointer()
         self.app = self._build_graph()
 
+    @staticmethod
+    def _node(name: str, func, afunc) -> RunnableLambda:
+        timed = traced(name, "node", NODE_SECONDS, {"node": name})
+        return RunnableLambda(timed(func), afunc=timed(afunc), name=name)
+
     def _build_graph(self):
-        workflow = StateGraph(state_schema=MessagesState)
-        workflow.add_node("summarize", self._summarize_old_messages)
-        workflow.add_node("agent", self._safe_call_agent)
+        workflow = StateGraph(state_schema=AgentState)
+        # Each node has a sync and an async implementation so that both
+        # `app.invoke` (CLI) and `app.ainvoke` (API) run without blocking.
+        workflow.add_node("summarize", self._node("summarize", self._summarize_old_messages, self._asummarize_old_messages))
+        workflow.add_node("agent", self._node("agent", self._safe_call_agent, self._asafe_call_agent))
         workflow.add_edge(START, "summarize")
         workflow.add_edge("summarize", "agent")
         return workflow.compile(checkpointer=self.memory)
 
-    def _summarize_old_messages(self, state: MessagesState):
-        messages = state["messages"]
-        total_tokens = sum(len(self.encoder.encode(m.content)) for m in messages)
+    def _account_tokens(self, state: AgentState) -> tuple[dict, int]:
+        token_counts, total_tokens = self.tokens.update(
+            state["messages"],
+            state.get("token_counts") or {},
+            state.get("total_tokens") or 0,
+        )
         logger.info("Summarizing messages: %d tokens", total_tokens)
+        return {"token_counts": token_counts, "total_tokens": total_tokens}, total_tokens
+
+    def _plan_compaction(self, state: AgentState):
+        """
+        Returns `(update, prompt)`: the token accounting update and, when the
+        history is over budget, the refine prompt for the messages to evict.
+        """
+        update, total_tokens = self._account_tokens(state)
+        messages = state["messages"]
+        if total_tokens < self.max_tokens or len(messages) <= self.keep_last_messages:
+            return update, None
 
-        if total_tokens < self.max_tokens:
-            return {"messages": messages}
+        evicted = messages[:-self.keep_last_messages]
+        update["token_counts"], update["total_tokens"] = self.tokens.forget(
+            evicted, update["token_counts"], update["total_tokens"]
+        )
+        update["messages"] = [RemoveMessage(id=m.id) for m in evicted]
+        prompt = SUMMARY_REFINE_PROMPT.format(
+            summary=state.get("summary") or "(none yet)",
+            new_lines="\n".join(f"{m.type}: {message_text(m)}" for m in evicted),
+        )
+        logger.info("Folding %d messages into the running summary", len(evicted))
+        return update, prompt
 
-        summary = self.summary_chain.invoke({"input": messages})["output"]
+    def _apply_summary(self, update: dict, summary_msg) -> dict:
+        summary = summary_msg.content.strip()
         logger.info("Summary generated: %s", summary[:100])
-        new_history = messages[-5:] + [AIMessage(content=summary)]
-        return {"messages": new_history}
+        return {**update, "summary": summary}
 
-    def _call_agent(self, state: MessagesState):
-        logger.info("Calling agent with %d messages", len(state["messages"]))
-        response = self.agent_executor.invoke({"input": state["messages"]})
-        output = response.get("output", "").strip()
+    def _summarize_old_messages(self, state: AgentState):
+        update, prompt = self._plan_compaction(state)
+        if prompt is None:
+            return update
+        return self._apply_summary(update, self.summarizer_llm.invoke([HumanMessage(content=prompt)]))
+
+    async def _asummarize_old_messages(self, state: AgentState):
+        if self.summary_mode == "background":
+            # Only keep the accounting current; compaction runs after the reply is sent.
+            update, _ = self._account_tokens(state)
+            return update
+        update, prompt = self._plan_compaction(state)
+        if prompt is None:
+            return update
+        return self._apply_summary(update, await self.summarizer_llm.ainvoke([HumanMessage(content=prompt)]))
+
+    async def _acompact_thread(self, thread_id: str) -> None:
+        config = self._config(thread_id)
+        try:
+            snapshot = await self.app.aget_state(config)
+            update, prompt = self._plan_compaction(snapshot.values)
+            if prompt is None:
+                return
+            summary_msg = await self.summarizer_llm.ainvoke([HumanMessage(content=prompt)])
+            await self.app.aupdate_state(config, self._apply_summary(update, summary_msg), as_node="agent")
+        except Exception as e:
+            logger.error("Background summarization failed: %s", str(e), exc_info=True)
+
+    def _schedule_compaction(self, thread_id: str) -> None:
+        task = asyncio.create_task(self._acompact_thread(thread_id))
+        self._compactions[thread_id] = task
+        task.add_done_callback(lambda _: self._compactions.pop(thread_id, None))
+
+    def _agent_input(self, state: AgentState) -> list:
+        summary = state.get("summary")
+        if not summary:
+            return state["messages"]
+        return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")] + state["messages"]
+
+    def _agent_result(self, state: MessagesState, response: dict):
+        budget = current_budget()
+        if budget is not None and budget.exhausted:
+            logger.warning("Agent turn stopped early, %s budget exhausted: %s", budget.exhausted, budget.stats())
+            output = budget.partial_answer()
+        else:
+            output = response.get("output", "").strip()
         logger.info("Agent response: %s", output[:100])
         return {"messages": state["messages"] + [AIMessage(content=output)]}
 
-    def _safe_call_agent(self, state: MessagesState):
+    def _call_agent(self, state: MessagesState):
+        logger.info("Calling agent with %d messages", len(state["messages"]))
+        response = self.agent_executor.invoke({"input": self._agent_input(state)})
+        return self._agent_result(state, response)
+
+    async def _acall_agent(self, state: MessagesState):
+        logger.info("Calling agent with %d messages", len(state["messages"]))
+        budget = current_budget()
+        timeout = budget.remaining_seconds() if budget is not None else None
         try:
-            result = self._call_agent(state)
-            last_msg = result["messages"][-1].content.strip()
+            # Hard deadline: the sync loop can only stop between iterations, this also cuts a slow step short.
+            response = await asyncio.wait_for(self.agent_executor.ainvoke({"input": self._agent_input(state)}), timeout)
+        except asyncio.TimeoutError:
+            budget.exhaust(DEADLINE)
+            response = {}
+        return self._agent_result(state, response)
+
+    def _check_agent_result(self, state: MessagesState, result: dict):
+        last_msg = result["messages"][-1].content.strip()
+
+        if not last_msg or "I don't know" in last_msg.lower():
+            fallback = AIMessage(
+                content="🤔 I'm not sure how to help with that yet, but I'm learning every day. Could you rephrase or ask something else?")
+            return {"messages": state["messages"] + [fallback]}
 
-            if not last_msg or "I don't know" in last_msg.lower():
-                fallback = AIMessage(
-                    content="🤔 I'm not sure how to help with that yet, but I'm learning every day. Could you rephrase or ask something else?")
-                return {"messages": state["messages"] + [fallback]}
+        return result
 
-            return result
+    def _agent_error(self, state: MessagesState, e: Exception):
+        logger.error("Agent call failed: %s", str(e), exc_info=True)
+        err = AIMessage(content=f"⚠️ Oops, something went wrong: {e}")
+        return {"messages": state["messages"] + [err]}
+
+    def _safe_call_agent(self, state: MessagesState):
+        try:
+            return self._check_agent_result(state, self._call_agent(state))
+        except Exception as e:
+            return self._agent_error(state, e)
 
+    async def _asafe_call_agent(self, state: MessagesState):
+        try:
+            return self._check_agent_result(state, await self._acall_agent(state))
         except Exception as e:
-            logger.error("Agent call failed: %s", str(e), exc_info=True)
-            err = AIMessage(content=f"⚠️ Oops, something went wrong: {e}")
-            return {"messages": state["messages"] + [err]}
+            return self._agent_error(state, e)
+
+    def _config(self, thread_id: Optional[str]) -> dict:
+        return {"configurable": {"thread_id": thread_id or self.thread_id}}
+
+    def _traced_config(self, thread_id: str, budget) -> dict:
+        # Created inside `trace(...)` so the handler attaches LLM spans to this turn's trace.
+        return {**self._config(thread_id), "callbacks": [TraceCallbackHandler(), BudgetCallbackHandler(budget)]}
 
-    def get_history(self) -> list[str]:
+    def get_history(self, thread_id: Optional[str] = None) -> list[str]:
         """Returns the current message history as plain text."""
-        history = self.memory.get(self.thread_id)
-        if not history:
-            return []
-        return [f"{msg.type}: {msg.content}" for msg in history["messages"]]
+        snapshot = self.app.get_state(self._config(thread_id))
+        messages = snapshot.values.get("messages", []) if snapshot else []
+        return [f"{msg.type}: {msg.content}" for msg in messages]
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Drop all checkpointed state for a thread."""
+        self.memory.delete_thread(thread_id)
+
+    async def acopy_thread(self, source: str, target: str) -> None:
+        """Seed thread `target` with the state of `source` (messages, summary, token accounting)."""
+        snapshot = await self.app.aget_state(self._config(source))
+        if snapshot and snapshot.values:
+            await self.app.aupdate_state(self._config(target), snapshot.values, as_node="agent")
 
-    def chat(self, user_input: str):
+    def _recorded_turn(self, thread_id: str, user_input: str):
+        """Record the turn into the thread's cassette when recording; yields a dict for the answer."""
+        # A turn already running in a cassette (a replay) is not recorded again.
+        if self.recorder is None or current_cassette() is not None:
+            return nullcontext({})
+        return self.recorder.turn(thread_id, user_input, model=self.llm.model_name, agent_mode=self.agent_mode)
+
+    def chat(self, user_input: str, thread_id: Optional[str] = None, limits: Optional[BudgetLimits] = None):
         logger.info("Received user input: %s", user_input)
+        thread_id = thread_id or self.thread_id
         initial_state = {"messages": [HumanMessage(content=user_input)]}
-        result = self.app.invoke(
-            initial_state,
-            config={"configurable": {"thread_id": self.thread_id}},
-        )
+        with self._recorded_turn(thread_id, user_input) as recorded, \
+                trace("chat", REQUEST_SECONDS, {"method": "chat"}, thread_id=thread_id), \
+                request_budget(limits or self.budget_limits) as budget, output_scope():
+            result = self.app.invoke(initial_state, config=self._traced_config(thread_id, budget))
+            recorded["output"] = result["messages"][-1].content
         return result["messages"][-1].content
+
+    async def _await_compaction(self, thread_id: str) -> None:
+        # Never run a turn on top of a half-applied compaction of the same thread.
+        if pending := self._compactions.get(thread_id):
+            await pending
+
+    def _after_turn(self, thread_id: str, total_tokens: int) -> None:
+        if self.summary_mode == "background" and total_tokens >= self.max_tokens:
+            self._schedule_compaction(thread_id)
+
+    async def achat(self, user_input: str, thread_id: Optional[str] = None, limits: Optional[BudgetLimits] = None):
+        """Async counterpart of `chat`; LLM and GitHub I/O never block the event loop."""
+        logger.info("Received user input: %s", user_input)
+        thread_id = thread_id or self.thread_id
+        await self._await_compaction(thread_id)
+        initial_state = {"messages": [HumanMessage(content=user_input)]}
+        with self._recorded_turn(thread_id, user_input) as recorded, \
+                trace("chat", REQUEST_SECONDS, {"method": "achat"}, thread_id=thread_id), \
+                request_budget(limits or self.budget_limits) as budget, output_scope():
+            result = await self.app.ainvoke(initial_state, config=self._traced_config(thread_id, budget))
+            recorded["output"] = result["messages"][-1].content
+        self._after_turn(thread_id, result.get("total_tokens", 0))
+        return result["messages"][-1].content
+
+    async def astream(self, user_input: str, thread_id: Optional[str] = None,
+                      limits: Optional[BudgetLimits] = None) -> AsyncIterator[dict]:
+        """
+        Run a turn and yield progress events as they happen:
+        `tool_start` / `tool_end` for each tool call, `token` for each chunk of
+        the final answer, and a closing `final` event with the full response.
+        """
+        logger.info("Received user input (streaming): %s", user_input)
+        thread_id = thread_id or self.thread_id
+        await self._await_compaction(thread_id)
+        config = self._config(thread_id)
+        initial_state = {"messages": [HumanMessage(content=user_input)]}
+        answers: dict[str, FinalAnswerFilter] = {}
+
+        with self._recorded_turn(thread_id, user_input) as recorded, \
+                trace("chat", REQUEST_SECONDS, {"method": "astream"}, thread_id=thread_id), \
+                request_budget(limits or self.budget_limits) as budget, output_scope():
+            events = self.app.astream_events(initial_state, config=self._traced_config(thread_id, budget), version="v2")
+            async for event in events:
+                kind = event["event"]
+                if event.get("metadata", {}).get("langgraph_node") != "agent":
+                    continue
+                if kind == "on_tool_start":
+                    yield {"event": "tool_start", "tool": event["name"], "input": event["data"].get("input")}
+                elif kind == "on_tool_end":
+                    yield {"event": "tool_end", "tool": event["name"]}
+                elif kind == "on_chat_model_stream":
+                    chunk = event["data"]["chunk"].content
+                    marker = FINAL_ANSWER_MARKER if self.agent_mode == REACT else None
+                    answer = answers.setdefault(event["run_id"], FinalAnswerFilter(marker))
+                    if text := answer.feed(chunk if isinstance(chunk, str) else ""):
+                        yield {"event": "token", "text": text}
+
+            snapshot = await self.app.aget_state(config)
+            recorded["output"] = snapshot.values["messages"][-1].content
+        self._after_turn(thread_id, snapshot.values.get("total_tokens", 0))
+        yield {"event": "final", "response": snapshot.values["messages"][-1].content}
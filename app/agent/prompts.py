@@ -0,0 +1,48 @@
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
+
+# Vendored copy of the LangChain Hub prompt "hwchase17/react" so that building
+# the agent needs no network access. Bump REACT_PROMPT_VERSION whenever the
+# template text changes; it is part of any cache key derived from prompts.
+REACT_PROMPT_VERSION = "hwchase17/react@1"
+
+REACT_TEMPLATE = """Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+
+
+def get_react_prompt() -> PromptTemplate:
+    return PromptTemplate.from_template(REACT_TEMPLATE)
+
+
+# System prompt of AGENT_MODE=tool_calling, where the model calls tools through
+# its native function-calling API instead of the ReAct text protocol.
+TOOL_CALLING_PROMPT_VERSION = "github-tools@1"
+
+TOOL_CALLING_SYSTEM = """You are a helpful assistant for GitHub repositories, issues and pull requests.
+Use the tools to look things up instead of guessing. When a question needs several
+independent lookups (for example the details of three issues), request all of them
+in the same turn: they run in parallel. Answer concisely once you have what you need."""
+
+
+def get_tool_calling_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([
+        ("system", TOOL_CALLING_SYSTEM),
+        MessagesPlaceholder("input"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
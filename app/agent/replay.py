@@ -0,0 +1,195 @@
+"""
+Offline replay of recorded agent sessions.
+
+A cassette (see app/observability/cassette.py) holds the user turns of a
+session with every LLM reply and GitHub response they got. Replaying it runs
+the real graph, summarization, tools and response parsing against those
+answers: no network, no OpenAI key, the same inputs every time. What is left
+is the CPU-side work, timed per turn, per graph node and per tool, and
+optionally profiled with cProfile.
+"""
+import asyncio
+import cProfile
+import io
+import pstats
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.agent.github_agent import GitHubAgent
+from app.client.cassette_llm import CassetteChatModel
+from app.observability.cassette import REPLAY, Cassette, use_cassette
+from app.observability.metrics import GITHUB_SECONDS, NODE_SECONDS, TOOL_SECONDS
+
+CHAT = "chat"
+ACHAT = "achat"
+ASTREAM = "astream"
+
+
+@dataclass
+class ReplayResult:
+    """Timings of one replay of a cassette."""
+    # Per turn: thread_id, input, output, seconds, cpu_seconds, and whether the answer matches the recording.
+    turns: list[dict] = field(default_factory=list)
+    # Seconds per graph node and per tool, and in GitHub response parsing.
+    nodes: dict[str, float] = field(default_factory=dict)
+    tools: dict[str, float] = field(default_factory=dict)
+    parse_seconds: float = 0.0
+    # Answers served, divergences and misses (see Cassette).
+    cassette: dict = field(default_factory=dict)
+    profile: Optional[pstats.Stats] = None
+
+    @property
+    def seconds(self) -> float:
+        return sum(turn["seconds"] for turn in self.turns)
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(turn["cpu_seconds"] for turn in self.turns)
+
+    @property
+    def faithful(self) -> bool:
+        """Every answer matched the recording and every request found its recorded answer."""
+        return all(turn["matches"] for turn in self.turns) and not (self.cassette.get("diverged")
+                                                                    or self.cassette.get("misses"))
+
+
+def load_cassette(path: str, strict: bool = False) -> Cassette:
+    return Cassette(path, REPLAY, strict=strict)
+
+
+def replay_agent(cassette: Cassette, agent_mode: Optional[str] = None) -> GitHubAgent:
+    """A GitHubAgent whose models answer from `cassette`, in the recorded mode, with in-memory threads."""
+    recorded = cassette.turns[0] if cassette.turns else {}
+    return GitHubAgent(
+        llm=CassetteChatModel(model=recorded.get("model")),
+        summarizer_llm=CassetteChatModel(),
+        checkpointer=MemorySaver(),
+        agent_mode=agent_mode or recorded.get("agent_mode"),
+    )
+
+
+def _timings() -> dict:
+    return {
+        "nodes": {labels[0]: total for labels, (_, total) in NODE_SECONDS.totals().items()},
+        "tools": {labels[0]: total for labels, (_, total) in TOOL_SECONDS.totals().items()},
+        "parse": sum(total for (_, phase), (_, total) in GITHUB_SECONDS.totals().items() if phase == "parse"),
+    }
+
+
+def _since(before: dict, after: dict) -> dict:
+    return {name: total - before.get(name, 0.0) for name, total in after.items() if total - before.get(name, 0.0) > 0}
+
+
+async def _run_turn(agent: GitHubAgent, method: str, user_input: str, thread_id: str) -> str:
+    if method == ACHAT:
+        return await agent.achat(user_input, thread_id=thread_id)
+    response = None
+    async for event in agent.astream(user_input, thread_id=thread_id):
+        if event["event"] == "final":
+            response = event["response"]
+    return response
+
+
+async def areplay(cassette: Cassette, agent: Optional[GitHubAgent] = None, method: str = ACHAT,
+                  profile: bool = False) -> ReplayResult:
+    """
+    Replay every turn of `cassette` through `agent.achat` (the API path) or
+    `agent.astream` (the CLI path), on fresh threads. cProfile, when on, sees
+    the event loop thread, where graph nodes, async tools and parsing run.
+    """
+    if method not in (ACHAT, ASTREAM):
+        raise ValueError(f"Unknown replay method {method!r}; use {ACHAT!r} or {ASTREAM!r}")
+    agent = agent or replay_agent(cassette)
+    cassette.rewind()
+    run = uuid.uuid4().hex[:8]
+    profiler = cProfile.Profile() if profile else None
+    result = ReplayResult()
+    before = _timings()
+    with use_cassette(cassette):
+        for turn in cassette.turns:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                output = await _run_turn(agent, method, turn["input"], f"{turn['thread_id']}@replay-{run}")
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            result.turns.append(_turn_result(turn, output, start, cpu_start))
+    return _finish(result, cassette, before, profiler)
+
+
+def replay(cassette: Cassette, agent: Optional[GitHubAgent] = None, method: str = CHAT,
+           profile: bool = False) -> ReplayResult:
+    """
+    Replay every turn of `cassette`; `method` is "chat" (the sync path, run
+    here), "achat" or "astream". Sync replays profile the calling thread only.
+    """
+    if method != CHAT:
+        return asyncio.run(areplay(cassette, agent, method, profile))
+    agent = agent or replay_agent(cassette)
+    cassette.rewind()
+    run = uuid.uuid4().hex[:8]
+    profiler = cProfile.Profile() if profile else None
+    result = ReplayResult()
+    before = _timings()
+    with use_cassette(cassette):
+        for turn in cassette.turns:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                output = agent.chat(turn["input"], thread_id=f"{turn['thread_id']}@replay-{run}")
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            result.turns.append(_turn_result(turn, output, start, cpu_start))
+    return _finish(result, cassette, before, profiler)
+
+
+def _turn_result(turn: dict, output: Optional[str], start: float, cpu_start: float) -> dict:
+    return {
+        "thread_id": turn["thread_id"],
+        "input": turn["input"],
+        "output": output,
+        "seconds": time.perf_counter() - start,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "matches": turn.get("output") is None or output == turn["output"],
+    }
+
+
+def _finish(result: ReplayResult, cassette: Cassette, before: dict, profiler: Optional[cProfile.Profile]) -> ReplayResult:
+    after = _timings()
+    result.nodes = _since(before["nodes"], after["nodes"])
+    result.tools = _since(before["tools"], after["tools"])
+    result.parse_seconds = after["parse"] - before["parse"]
+    result.cassette = cassette.stats()
+    if profiler is not None:
+        result.profile = pstats.Stats(profiler)
+    return result
+
+
+def format_report(result: ReplayResult, top: int = 25, sort: str = "cumulative") -> str:
+    """Per-turn and per-node timings, cassette stats and, if profiled, the `top` functions by `sort`."""
+    lines = [f"{'turn':>4} {'ms':>8} {'cpu ms':>8}  match  input"]
+    for i, turn in enumerate(result.turns, 1):
+        lines.append(f"{i:>4} {turn['seconds'] * 1000:>8.1f} {turn['cpu_seconds'] * 1000:>8.1f}  "
+                     f"{'yes' if turn['matches'] else 'NO':<5}  {turn['input'][:60]}")
+    lines.append(f"total {result.seconds * 1000:.1f} ms, cpu {result.cpu_seconds * 1000:.1f} ms, "
+                 f"parse {result.parse_seconds * 1000:.1f} ms")
+    for title, timings in (("node", result.nodes), ("tool", result.tools)):
+        for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+            lines.append(f"  {title} {name:<28} {seconds * 1000:>8.1f} ms")
+    stats = result.cassette
+    lines.append(f"cassette: {stats.get('llm', 0)} llm / {stats.get('http', 0)} github answers, "
+                 f"{stats.get('diverged', 0)} diverged, {stats.get('misses', 0)} missed")
+    if result.profile is not None:
+        out = io.StringIO()
+        result.profile.stream = out
+        result.profile.sort_stats(sort).print_stats(top)
+        lines.append(out.getvalue().rstrip())
+    return "\n".join(lines)
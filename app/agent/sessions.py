@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Optional
+
+from app.client.cache import LRUTTLCache
+from app.client.shared_cache import SharedCache, get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _off_loop(func, *args) -> None:
+    # resolve() runs on the event loop in the async routes: there its SQLite
+    # writes (shared cache, checkpointer deletes) go to a worker thread.
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args)
+        return
+    loop.run_in_executor(None, _logged, func, *args)
+
+
+def _logged(func, *args) -> None:
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("%s%s failed", func.__name__, args)
+
+
+class SessionManager:
+    """
+    Maps API session IDs to LangGraph thread IDs on a shared GitHubAgent.
+
+    Only the per-thread conversation state is kept per session; the LLMs,
+    ReAct agent and compiled graph live once on the agent. Sessions idle for
+    longer than `idle_ttl` seconds, or pushed out once `max_sessions` is
+    reached, have their checkpointed thread deleted.
+
+    Thread IDs derive from the session ID, so with a shared checkpointer any
+    worker can serve any session. With a `shared` cache, a worker evicting a
+    session first checks that no other worker used it within `idle_ttl`.
+    """
+
+    def __init__(self, agent, max_sessions: int = 1000, idle_ttl: float = 1800.0,
+                 shared: Optional[SharedCache] = None):
+        self.agent = agent
+        self.idle_ttl = idle_ttl
+        self.shared = shared
+        self._sessions = LRUTTLCache(maxsize=max_sessions, ttl=idle_ttl, on_evict=self._on_evict)
+
+    def _on_evict(self, session_id: str, thread_id: str) -> None:
+        _off_loop(self._evict, session_id, thread_id)
+
+    def _evict(self, session_id: str, thread_id: str) -> None:
+        if self.shared is not None:
+            if self.shared.session_idle(session_id) < self.idle_ttl:
+                logger.debug("Session %s is still active in another worker", session_id)
+                return
+            self.shared.forget_session(session_id)
+        logger.info("Evicting idle session %s", session_id)
+        self.agent.delete_thread(thread_id)
+
+    @staticmethod
+    def session_id(requested: Optional[str] = None) -> str:
+        """`requested`, or a new session ID; nothing is registered until resolve()."""
+        return (requested or "").strip() or uuid.uuid4().hex
+
+    def resolve(self, session_id: Optional[str] = None) -> tuple[str, str]:
+        """Return `(session_id, thread_id)`, creating a new session when needed."""
+        self._sessions.expire()
+        session_id = self.session_id(session_id)
+        thread_id = self._sessions.get(session_id)
+        if thread_id is None:
+            thread_id = f"session-{session_id}"
+            self._sessions.set(session_id, thread_id)
+        else:
+            self._sessions.touch(session_id)
+        if self.shared is not None:
+            _off_loop(self.shared.touch_session, session_id)
+        return session_id, thread_id
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def session_manager_from_env(agent) -> SessionManager:
+    return SessionManager(
+        agent,
+        max_sessions=int(os.getenv("MAX_SESSIONS", "1000")),
+        idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+        shared=get_shared_cache(),
+    )
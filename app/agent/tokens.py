@@ -0,0 +1,93 @@
+import hashlib
+import logging
+from typing import Sequence
+
+from langchain_core.messages import BaseMessage
+from tiktoken import Encoding, encoding_for_model, get_encoding
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_ENCODING = "o200k_base"
+# Rough characters-per-token ratio used when no tokenizer can be loaded (e.g. offline
+# and the encoding file is not in the tiktoken cache yet).
+CHARS_PER_TOKEN = 4
+
+
+class _ApproximateEncoder:
+    def encode(self, text: str) -> range:
+        return range(-(-len(text) // CHARS_PER_TOKEN))
+
+
+def encoder_for_model(model: str) -> Encoding:
+    """Tokenizer for `model`, falling back to the gpt-4o family encoding for unknown names."""
+    try:
+        return encoding_for_model(model)
+    except KeyError:
+        logger.warning("No tiktoken encoding registered for %s, using %s", model, FALLBACK_ENCODING)
+        return get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        logger.warning("Could not load tiktoken encoding for %s (%s), approximating token counts", model, e)
+        return _ApproximateEncoder()
+
+
+def message_text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def message_key(message: BaseMessage) -> str:
+    """Stable cache key for a message: its graph-assigned id, or a content hash."""
+    if message.id:
+        return message.id
+    return hashlib.sha1(f"{message.type}:{message_text(message)}".encode("utf-8")).hexdigest()
+
+
+class TokenAccountant:
+    """
+    Keeps per-message token counts so each turn only encodes messages it has
+    not seen before. The counts and running total live in the graph state
+    (`token_counts` / `total_tokens`) and are checkpointed with the thread.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoder = None
+
+    @property
+    def encoder(self):
+        # Loaded on first use: tiktoken may need to download the encoding file.
+        if self._encoder is None:
+            self._encoder = encoder_for_model(self.model)
+        return self._encoder
+
+    def count(self, message: BaseMessage) -> int:
+        return len(self.encoder.encode(message_text(message)))
+
+    def update(
+        self,
+        messages: Sequence[BaseMessage],
+        token_counts: dict[str, int],
+        total_tokens: int,
+    ) -> tuple[dict[str, int], int]:
+        """Account for any new messages; returns the updated `(token_counts, total_tokens)`."""
+        counts = dict(token_counts)
+        encoded = 0
+        for message in messages:
+            key = message_key(message)
+            if key not in counts:
+                counts[key] = self.count(message)
+                total_tokens += counts[key]
+                encoded += 1
+        logger.debug("Encoded %d new messages, running total %d tokens", encoded, total_tokens)
+        return counts, total_tokens
+
+    def forget(
+        self,
+        messages: Sequence[BaseMessage],
+        token_counts: dict[str, int],
+        total_tokens: int,
+    ) -> tuple[dict[str, int], int]:
+        """Remove messages dropped from the history from the running total."""
+        counts = dict(token_counts)
+        for message in messages:
+            total_tokens -= counts.pop(message_key(message), 0)
+        return counts, total_tokens
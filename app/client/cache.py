@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    Thread-safe in-process cache bounded by entry count (LRU) and age (TTL).
+    A ttl of None keeps entries until they are pushed out by newer ones.
+    `on_evict(key, value)` is called for entries dropped by size or by `expire()`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: Optional[float] = 300.0,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def get(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            stored_at, value = item
+            if self._expired(stored_at) and not allow_stale:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def is_fresh(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            return item is not _MISSING and not self._expired(item[0])
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """Store `value`; `age` is how many seconds old it already is (e.g. when copied from another cache)."""
+        evicted = []
+        with self._lock:
+            self._data[key] = (time.monotonic() - age, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+        self._notify(evicted)
+
+    def expire(self) -> int:
+        """Drop every expired entry and return how many were removed."""
+        if self.ttl is None:
+            return 0
+        evicted = []
+        with self._lock:
+            for key, (stored_at, value) in list(self._data.items()):
+                if self._expired(stored_at):
+                    del self._data[key]
+                    evicted.append((key, value))
+        self._notify(evicted)
+        return len(evicted)
+
+    def _notify(self, evicted: list) -> None:
+        if self.on_evict is None:
+            return
+        for key, value in evicted:
+            self.on_evict(key, value)
+
+    def touch(self, key: Hashable) -> None:
+        """Reset the TTL of an entry without changing its value."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                self._data[key] = (time.monotonic(), item[1])
+                self._data.move_to_end(key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.is_fresh(key)
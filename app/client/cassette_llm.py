@@ -0,0 +1,138 @@
+import json
+import re
+from typing import Any, Callable, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.observability.cassette import CassetteMiss, current_cassette, request_key
+
+
+def _role(message: BaseMessage) -> str:
+    # Streamed turns put chunks ("AIMessageChunk") in the history where invoked ones put "ai".
+    if message.type.endswith("MessageChunk"):
+        return message.type[:-len("MessageChunk")].lower()
+    return message.type
+
+
+def _request_key(messages: list[BaseMessage], stop: Optional[list[str]], kwargs: dict) -> str:
+    return request_key({
+        "messages": [(_role(m), m.content, getattr(m, "tool_calls", None) or [], getattr(m, "tool_call_id", None))
+                     for m in messages],
+        "stop": stop,
+        "tools": [tool.get("function", {}).get("name") for tool in kwargs.get("tools") or ()],
+    })
+
+
+def _reply(message: BaseMessage) -> dict:
+    return {"content": message.content, "tool_calls": getattr(message, "tool_calls", None) or [],
+            "usage": getattr(message, "usage_metadata", None)}
+
+
+def _message(entry: dict) -> AIMessage:
+    return AIMessage(content=entry["content"], tool_calls=entry["tool_calls"], usage_metadata=entry["usage"])
+
+
+def _chunks(message: AIMessage) -> list[ChatGenerationChunk]:
+    # Token-sized pieces of the text, then the tool calls and usage in a final
+    # chunk, the way OpenAI streams with include_usage.
+    chunks = [ChatGenerationChunk(message=AIMessageChunk(content=token))
+              for token in re.split(r"(\s+)", message.content if isinstance(message.content, str) else "") if token]
+    tool_call_chunks = [
+        {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+        for i, call in enumerate(message.tool_calls)
+    ]
+    chunks.append(ChatGenerationChunk(message=AIMessageChunk(
+        content="", tool_call_chunks=tool_call_chunks, usage_metadata=message.usage_metadata)))
+    return chunks
+
+
+def _streams(model: BaseChatModel) -> bool:
+    return type(model)._astream is not BaseChatModel._astream or type(model)._stream is not BaseChatModel._stream
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model that records the calls it passes on to `inner` into the
+    current turn's cassette, or answers them from the cassette when it is
+    being replayed; `inner` is then never called and may be None. Outside a
+    cassette it behaves as `inner`.
+
+    `factory` builds `inner` on the first call that needs it, so a replay
+    never needs the model's credentials.
+    """
+
+    inner: Optional[BaseChatModel] = None
+    factory: Optional[Callable[[], BaseChatModel]] = None
+    # Reported model (token counting, metrics, cache keys) while there is no
+    # `inner`: the model `factory` builds, or the recorded one in a replay.
+    model: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.inner, "model_name", None) or self.model or ""
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _inner(self) -> BaseChatModel:
+        if self.inner is None:
+            if self.factory is None:
+                raise CassetteMiss("Not replaying a cassette and no model to call")
+            self.inner = self.factory()
+        return self.inner
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        cassette = current_cassette()
+        if cassette is None:
+            return self._inner()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        key = _request_key(messages, stop, kwargs)
+        if not cassette.recording:
+            return ChatResult(generations=[ChatGeneration(message=_message(cassette.replay_llm(key)))])
+        result = self._inner()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        cassette.record_llm(key, self.model_name, _reply(result.generations[0].message))
+        return result
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        cassette = current_cassette()
+        if cassette is None:
+            return await self._inner()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        key = _request_key(messages, stop, kwargs)
+        if not cassette.recording:
+            return ChatResult(generations=[ChatGeneration(message=_message(cassette.replay_llm(key)))])
+        result = await self._inner()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        cassette.record_llm(key, self.model_name, _reply(result.generations[0].message))
+        return result
+
+    async def _astream(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any):
+        cassette = current_cassette()
+        key = _request_key(messages, stop, kwargs) if cassette is not None else None
+        replayed = cassette is not None and not cassette.recording
+        if replayed or not _streams(self._inner()):
+            if replayed:
+                message = _message(cassette.replay_llm(key))
+            else:
+                result = await self._inner()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                message = result.generations[0].message
+            for chunk in _chunks(message):
+                if run_manager and chunk.text:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        else:
+            merged = None
+            async for chunk in self._inner()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                merged = chunk if merged is None else merged + chunk
+                yield chunk
+            message = merged.message if merged is not None else AIMessage(content="")
+        if cassette is not None and cassette.recording:
+            cassette.record_llm(key, self.model_name, _reply(message))
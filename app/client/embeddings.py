@@ -0,0 +1,52 @@
+import os
+import re
+import zlib
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: local search then ranks by full-text match only
+    np = None
+
+# Hashed bag-of-features embeddings: words and character trigrams are hashed
+# into DIM signed buckets. No model download and no GPU, and close wordings
+# ("leaks memory" / "memory leak") or typos still land near each other.
+DIM = 256
+_WORD_RE = re.compile(r"\w+")
+
+
+def embeddings_enabled() -> bool:
+    """SEARCH_EMBEDDINGS=auto (default) uses embeddings when NumPy is installed; off disables them."""
+    return np is not None and os.getenv("SEARCH_EMBEDDINGS", "auto").lower() != "off"
+
+
+def _features(text: str) -> list[int]:
+    features = []
+    for word in _WORD_RE.findall(text.lower()):
+        features.append(zlib.crc32(word.encode()))
+        padded = f"#{word}#"
+        features.extend(zlib.crc32(padded[i:i + 3].encode()) for i in range(len(padded) - 2))
+    return features
+
+
+def embed(text: str) -> Optional["np.ndarray"]:
+    """Unit-length float32 vector of `text`, or None if embeddings are disabled or the text has no words."""
+    if not embeddings_enabled():
+        return None
+    hashes = np.array(_features(text), dtype=np.uint32)
+    if not hashes.size:
+        return None
+    # The low bits pick the bucket, a high bit the sign, so collisions cancel out on average.
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+    vector = np.bincount(hashes % DIM, weights=signs, minlength=DIM).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+def to_blob(vector: "np.ndarray") -> bytes:
+    return vector.astype(np.float32).tobytes()
+
+
+def from_blobs(blobs: list[bytes]) -> "np.ndarray":
+    """Stack stored vectors into a (len(blobs), DIM) matrix."""
+    return np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), DIM)
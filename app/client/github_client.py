@@ -0,0 +1,393 @@
+import asyncio
+import contextvars
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+
+from app.agent.budget import charge_github_call
+from app.client.cache import LRUTTLCache
+from app.client.rate_limit import GRAPHQL, INTERACTIVE, RateLimitScheduler
+from app.client.shared_cache import tiered
+from app.observability.cassette import current_cassette, replaying, request_key
+from app.observability.metrics import GITHUB_SECONDS
+from app.observability.tracing import current_tool, span
+
+load_dotenv()
+
+GITHUB_API = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+HEADERS = {
+    "Accept": "application/vnd.github.v3+json",
+    "User-Agent": "langchain-agent"
+}
+TIMEOUT = 5
+# GitHub's maximum page size for list endpoints.
+MAX_PER_PAGE = 100
+
+LAST_PAGE_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+def parse_last_page(link_header: Optional[str]) -> int:
+    """Number of the last page advertised in a GitHub `Link` header (1 if there is none)."""
+    match = LAST_PAGE_RE.search(link_header or "")
+    return int(match.group(1)) if match else 1
+
+
+def graphql_url(api_url: str) -> str:
+    """GraphQL endpoint for a REST base URL (github.com or GitHub Enterprise `/api/v3`)."""
+    if api_url.endswith("/api/v3"):
+        return api_url[: -len("/v3")] + "/graphql"
+    return f"{api_url}/graphql"
+
+
+@dataclass
+class GitHubResponse:
+    """Minimal response object returned by GitHubClient (cached or live)."""
+    status_code: int
+    data: Any = None
+    headers: dict = field(default_factory=dict)
+    from_cache: bool = False
+
+    def json(self) -> Any:
+        return self.data
+
+    def dump(self) -> dict:
+        """JSON-serializable form, for the shared cache tier."""
+        return {"status_code": self.status_code, "data": self.data, "headers": dict(self.headers)}
+
+    @classmethod
+    def load(cls, value: dict) -> "GitHubResponse":
+        return cls(value["status_code"], value["data"], CaseInsensitiveDict(value["headers"]), from_cache=True)
+
+
+class GitHubClient:
+    """
+    Shared GitHub REST client used by every tool.
+
+    - one pooled keep-alive `requests.Session` for sync calls and one
+      `httpx.AsyncClient` for async calls; both share the cache below
+    - bounded LRU+TTL response cache; fresh entries are served without network I/O
+    - stale entries are revalidated with If-None-Match / If-Modified-Since, so
+      unchanged resources cost a 304 (which GitHub does not count against the rate limit)
+    - every network request goes through a RateLimitScheduler (token bucket,
+      quota tracking, backoff on rate limits, single-flight for identical requests)
+    - in a recorded agent turn every response is also written to the turn's
+      cassette; in a replayed turn responses come from it and nothing is sent
+    """
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_API,
+        token: Optional[str] = None,
+        cache_size: int = 512,
+        cache_ttl: float = 60.0,
+        pool_size: int = 32,
+        timeout: float = TIMEOUT,
+        scheduler: Optional[RateLimitScheduler] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.graphql_url = os.getenv("GITHUB_GRAPHQL_URL") or graphql_url(self.base_url)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.headers = dict(HEADERS)
+        token = token or os.getenv("GITHUB_TOKEN")
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+        # event loop -> (httpx.AsyncClient, generator that closes it when the loop shuts down)
+        self._async_clients: dict = {}
+        # Used to fan out independent sync requests; sized to the connection pool.
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="github")
+
+        # Entries outlive their TTL until evicted so they can still be revalidated.
+        # With SHARED_CACHE_PATH set, every worker on the node shares them.
+        self.cache = tiered(
+            LRUTTLCache(maxsize=cache_size, ttl=cache_ttl), "github", GitHubResponse.dump, GitHubResponse.load
+        )
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "errors": 0, "graphql": 0}
+        self._stats_lock = threading.Lock()
+        self.scheduler = scheduler or RateLimitScheduler()
+
+    def _url(self, path: str) -> str:
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    @staticmethod
+    def _cache_key(url: str, params: Optional[dict]) -> tuple:
+        return url, tuple(sorted((params or {}).items()))
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _conditional_headers(cached: Optional[GitHubResponse]) -> dict:
+        if cached is None:
+            return {}
+        headers = {}
+        if cached.headers.get("ETag"):
+            headers["If-None-Match"] = cached.headers["ETag"]
+        if cached.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+        return headers
+
+    @staticmethod
+    def _etag_headers(etag: Optional[str]) -> dict:
+        return {"If-None-Match": etag} if etag else {}
+
+    def _lookup(self, path: str, params: Optional[dict], use_cache: bool):
+        url = self._url(path)
+        key = self._cache_key(url, params)
+        cached = self.cache.get(key, allow_stale=True) if use_cache else None
+        fresh = cached is not None and self.cache.is_fresh(key)
+        if fresh:
+            self._count("hits")
+        return url, key, cached, fresh
+
+    def _exchange_key(self, url: str, params: Optional[dict] = None, payload: Optional[dict] = None) -> str:
+        # Relative to the base URL, so a cassette replays against any GitHub host.
+        if payload is not None:
+            return f"POST graphql {request_key(payload)}"
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        query = urlencode(sorted((params or {}).items()))
+        return f"GET {path}?{query}" if query else f"GET {path}"
+
+    def _recorded(self, response: GitHubResponse, url: str, params: Optional[dict] = None,
+                  payload: Optional[dict] = None) -> GitHubResponse:
+        """`response`, also written to the cassette when the current turn is recorded."""
+        cassette = current_cassette()
+        if cassette is not None and cassette.recording:
+            cassette.record_http(self._exchange_key(url, params, payload), response.dump())
+        return response
+
+    def _replayed(self, url: str, params: Optional[dict] = None, payload: Optional[dict] = None):
+        """The recorded response when the current turn replays a cassette, else None."""
+        cassette = replaying()
+        return cassette.replay_http(self._exchange_key(url, params, payload)) if cassette is not None else None
+
+    @staticmethod
+    def _timed(name: str, phase: str):
+        return span(name, phase, GITHUB_SECONDS, {"tool": current_tool(), "phase": phase})
+
+    def _response(self, res) -> GitHubResponse:
+        """Turn a requests/httpx response into a GitHubResponse."""
+        with self._timed("parse", "parse"):
+            try:
+                data = res.json() if res.content else None
+            except ValueError:
+                data = res.text
+        return GitHubResponse(
+            status_code=res.status_code,
+            data=data,
+            headers=CaseInsensitiveDict(res.headers),
+        )
+
+    def _finish(self, key: tuple, cached: Optional[GitHubResponse], res, use_cache: bool) -> GitHubResponse:
+        """Build the GitHubResponse for a REST call and update the cache."""
+        if res.status_code == 304 and cached is not None:
+            self._count("not_modified")
+            self.cache.touch(key)
+            return cached
+
+        self._count("misses")
+        response = self._response(res)
+        if use_cache and res.status_code == 200:
+            self.cache.set(key, GitHubResponse(res.status_code, response.data, response.headers, from_cache=True))
+        return response
+
+    def get(self, path: str, params: Optional[dict] = None, use_cache: bool = True,
+            priority: str = INTERACTIVE, etag: Optional[str] = None) -> GitHubResponse:
+        """
+        GET a REST resource. `etag` revalidates against a version the caller
+        stored itself (use with use_cache=False): an unchanged resource comes
+        back as a bodiless 304.
+        """
+        # A replay answers from its cassette only and leaves the cache (and the
+        # shared tier live workers read) untouched.
+        use_cache = use_cache and replaying() is None
+        url, key, cached, fresh = self._lookup(path, params, use_cache)
+        headers = self._conditional_headers(cached) or self._etag_headers(etag)
+        if fresh:
+            return self._recorded(cached, url, params)
+        charge_github_call()
+
+        def send():
+            if (replayed := self._replayed(url, params)) is not None:
+                return replayed
+            try:
+                with self._timed(f"GET {path}", "http"):
+                    return self.session.get(
+                        url,
+                        params=params,
+                        headers=headers,
+                        timeout=self.timeout,
+                    )
+            except requests.RequestException:
+                self._count("errors")
+                raise
+
+        return self._recorded(self.scheduler.run(
+            (key, use_cache), send, lambda res: self._finish(key, cached, res, use_cache), priority
+        ), url, params)
+
+    async def _close_at_shutdown(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        # asyncio.run finalizes unfinished async generators (shutdown_asyncgens)
+        # while its loop still runs, so the client is closed on its own loop.
+        # The generator keeps its loop alive, hence the explicit pop.
+        try:
+            yield
+        finally:
+            self._async_clients.pop(loop, None)
+            await client.aclose()
+
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the event loop they were first used on, so
+        # there is one per loop (each asyncio.run in the CLI, replays, benchmarks).
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            entry = self._async_clients[loop] = (client, self._close_at_shutdown(loop, client))
+            await entry[1].__anext__()
+        return entry[0]
+
+    async def aget(self, path: str, params: Optional[dict] = None, use_cache: bool = True,
+                   priority: str = INTERACTIVE, etag: Optional[str] = None) -> GitHubResponse:
+        use_cache = use_cache and replaying() is None
+        url, key, cached, fresh = self._lookup(path, params, use_cache)
+        headers = self._conditional_headers(cached) or self._etag_headers(etag)
+        if fresh:
+            return self._recorded(cached, url, params)
+        charge_github_call()
+
+        async def send():
+            if (replayed := self._replayed(url, params)) is not None:
+                return replayed
+            try:
+                with self._timed(f"GET {path}", "http"):
+                    client = await self._get_async_client()
+                    return await client.get(
+                        url,
+                        params=params,
+                        headers=headers,
+                    )
+            except httpx.HTTPError:
+                self._count("errors")
+                raise
+
+        return self._recorded(await self.scheduler.arun(
+            (key, use_cache), send, lambda res: self._finish(key, cached, res, use_cache), priority
+        ), url, params)
+
+    @property
+    def has_token(self) -> bool:
+        return "Authorization" in self.headers
+
+    @staticmethod
+    def _graphql_key(query: str, variables: Optional[dict]) -> tuple:
+        return GRAPHQL, query, json.dumps(variables or {}, sort_keys=True)
+
+    def graphql(self, query: str, variables: Optional[dict] = None,
+                priority: str = INTERACTIVE) -> GitHubResponse:
+        """
+        Run a GraphQL query (requires a token). Not cached here: callers cache
+        the parsed result. Errors are reported in the body's `errors` field.
+        """
+        payload = {"query": query, "variables": variables or {}}
+        charge_github_call()
+
+        def send():
+            if (replayed := self._replayed(self.graphql_url, payload=payload)) is not None:
+                return replayed
+            self._count("graphql")
+            try:
+                with self._timed("POST graphql", "http"):
+                    return self.session.post(self.graphql_url, json=payload, timeout=self.timeout)
+            except requests.RequestException:
+                self._count("errors")
+                raise
+
+        return self._recorded(self.scheduler.run(
+            self._graphql_key(query, variables), send, self._response, priority, GRAPHQL
+        ), self.graphql_url, payload=payload)
+
+    async def agraphql(self, query: str, variables: Optional[dict] = None,
+                       priority: str = INTERACTIVE) -> GitHubResponse:
+        payload = {"query": query, "variables": variables or {}}
+        charge_github_call()
+
+        async def send():
+            if (replayed := self._replayed(self.graphql_url, payload=payload)) is not None:
+                return replayed
+            self._count("graphql")
+            try:
+                with self._timed("POST graphql", "http"):
+                    client = await self._get_async_client()
+                    return await client.post(self.graphql_url, json=payload)
+            except httpx.HTTPError:
+                self._count("errors")
+                raise
+
+        return self._recorded(await self.scheduler.arun(
+            self._graphql_key(query, variables), send, self._response, priority, GRAPHQL
+        ), self.graphql_url, payload=payload)
+
+    async def aclose(self) -> None:
+        """Close the async client of the running loop."""
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+    def gather(self, *calls: Callable[[], Any]) -> list:
+        """Run independent blocking calls concurrently and return their results in order."""
+        if len(calls) == 1:
+            return [calls[0]()]
+        # Each call runs in a copy of the caller's context so tracing spans and
+        # tool attribution carry over into the worker threads. The first runs
+        # on the calling thread, so it may gather() again without waiting on
+        # workers that are all busy waiting on it.
+        futures = [self._executor.submit(contextvars.copy_context().run, call) for call in calls[1:]]
+        first = contextvars.copy_context().run(calls[0])
+        return [first] + [future.result() for future in futures]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["cache_entries"] = len(self.cache)
+        stats["rate_limit"] = self.scheduler.stats()
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_github_client() -> GitHubClient:
+    return GitHubClient(
+        cache_size=int(os.getenv("GITHUB_CACHE_SIZE", "512")),
+        cache_ttl=float(os.getenv("GITHUB_CACHE_TTL", "60")),
+        scheduler=RateLimitScheduler(
+            rate=float(os.getenv("GITHUB_MAX_RPS", "15")),
+            burst=int(os.getenv("GITHUB_BURST", "30")),
+            max_wait=float(os.getenv("GITHUB_MAX_WAIT", "30")),
+            background_reserve=float(os.getenv("GITHUB_BACKGROUND_RESERVE", "0.2")),
+        ),
+    )
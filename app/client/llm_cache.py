@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    resource TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT '',
+    response TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_resource ON responses (resource);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+class SQLiteLLMCache:
+    """
+    Persistent cache of LLM responses in a local SQLite file (WAL mode).
+
+    - keys hash the model, the prompt template version and the prompt inputs,
+      so changing any of them is a miss rather than a stale answer
+    - each entry records the source resource and its `updated_at`; a lookup
+      with a different `updated_at` deletes the entry, and storing a new answer
+      for a resource drops the older answers for it
+    - bounded to `max_entries`, least recently used entries are evicted first
+      (0 disables the cache)
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, *inputs: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, *inputs):
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def lookup(self, key: str, updated_at: Optional[str] = None) -> Optional[str]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, updated_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            response, stored_updated_at = row
+            if stored_updated_at != (updated_at or ""):
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._stats["invalidated"] += 1
+                self._stats["misses"] += 1
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._stats["hits"] += 1
+            return response
+
+    def store(self, key: str, resource: str, response: str, updated_at: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                # Answers for an older version of the same resource can never hit again.
+                self.conn.execute("DELETE FROM responses WHERE resource = ? AND key != ?", (resource, key))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, resource, updated_at or "", response, time.time()),
+                )
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    async def alookup(self, key: str, updated_at: Optional[str] = None) -> Optional[str]:
+        return await asyncio.to_thread(self.lookup, key, updated_at)
+
+    async def astore(self, key: str, resource: str, response: str, updated_at: Optional[str] = None) -> None:
+        await asyncio.to_thread(self.store, key, resource, response, updated_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> SQLiteLLMCache:
+    return SQLiteLLMCache(
+        path=os.getenv("LLM_CACHE_PATH", "data/llm_cache.db"),
+        max_entries=int(os.getenv("LLM_CACHE_SIZE", "1000")),
+    )
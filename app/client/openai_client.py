@@ -4,9 +4,14 @@ from dotenv import load_dotenv
 # Load OpenAI key from .env
 load_dotenv()
 
+# Model of get_openai_llm(), also reported by wrappers that build it lazily.
+OPENAI_MODEL = "gpt-4o-mini"
+
 def get_openai_llm():
     # You can add more config/env handling here
     return ChatOpenAI(
         temperature=0,
-        model="gpt-4o-mini",
+        model=OPENAI_MODEL,
+        # Report token usage on streamed calls too (the ReAct agent streams), for metrics and token budgets.
+        stream_usage=True,
     )
\ No newline at end of file
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# GitHub meters REST ("core") and GraphQL requests against separate quotas.
+CORE = "core"
+GRAPHQL = "graphql"
+
+# Full-jitter exponential backoff for secondary limits without a Retry-After.
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of waiting longer than the scheduler's `max_wait`."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"GitHub rate limit reached, retry in {retry_after:.0f}s")
+
+
+class RateLimitScheduler:
+    """
+    Central admission control for GitHub requests.
+
+    - token bucket (`rate` requests/s, `burst` capacity) smooths bursts from
+      concurrent tools and PR page fan-out
+    - tracks the primary quota of each rate-limit resource (REST "core",
+      "graphql") from `X-RateLimit-Remaining` / `X-RateLimit-Reset`; once it
+      is spent, requests wait for the reset instead of failing
+    - background requests may not use the last `background_reserve` fraction
+      of either budget, which is kept for interactive traffic
+    - 429s, 403s with `Retry-After` and secondary-limit 403s pause all traffic
+      and are retried with jittered backoff
+    - identical in-flight requests are sent once (single-flight)
+    - no request waits longer than `max_wait`; RateLimitExceeded is raised instead
+    """
+
+    def __init__(
+        self,
+        rate: float = 15.0,
+        burst: int = 30,
+        max_wait: float = 30.0,
+        max_retries: int = 3,
+        background_reserve: float = 0.2,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.background_reserve = background_reserve
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        # resource -> {"limit", "remaining", "reset_at"}, learned from response headers
+        self._quotas: dict[str, dict] = {}
+        self._blocked_until = 0.0
+        self._inflight: dict[Hashable, Future] = {}
+        self._ainflight: dict[tuple, asyncio.Future] = {}
+        self._stats = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "retries": 0,
+            "primary_limited": 0,
+            "secondary_limited": 0,
+            "gave_up": 0,
+            "deduplicated": 0,
+        }
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    # -- admission -----------------------------------------------------------
+
+    def _admit(self, priority: str, resource: str) -> float:
+        """Take a token for one request; returns 0, or how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            background = priority == BACKGROUND
+
+            quota = self._quotas.get(resource)
+            if quota is not None and now >= quota["reset_at"]:
+                # The window has reset; the next response reports the new budget.
+                del self._quotas[resource]
+                quota = None
+            if quota is not None:
+                floor = quota["limit"] * self.background_reserve if background else 0
+                if quota["remaining"] <= floor:
+                    return max(quota["reset_at"] - now, 0.1)
+
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                floor = self.burst * self.background_reserve if background else 0
+                if self._tokens - 1 < floor:
+                    return (floor + 1 - self._tokens) / self.rate
+                self._tokens -= 1
+
+            if quota is not None:
+                quota["remaining"] -= 1
+            self._stats["requests"] += 1
+            return 0.0
+
+    def _check_wait(self, waited: float, delay: float) -> None:
+        if waited + delay > self.max_wait:
+            self._count("gave_up")
+            raise RateLimitExceeded(delay)
+
+    def _wait(self, priority: str, resource: str) -> None:
+        waited = 0.0
+        while (delay := self._admit(priority, resource)) > 0:
+            self._check_wait(waited, delay)
+            time.sleep(delay)
+            waited += delay
+        if waited:
+            self._count("throttled")
+            self._count("wait_seconds", waited)
+
+    async def _await(self, priority: str, resource: str) -> None:
+        waited = 0.0
+        while (delay := self._admit(priority, resource)) > 0:
+            self._check_wait(waited, delay)
+            await asyncio.sleep(delay)
+            waited += delay
+        if waited:
+            self._count("throttled")
+            self._count("wait_seconds", waited)
+
+    # -- responses -----------------------------------------------------------
+
+    def observe(self, status_code: int, headers, body: str = "", attempt: int = 0,
+                resource: str = CORE) -> Optional[float]:
+        """
+        Record the quota advertised by a response. Returns how long to back off
+        before retrying it, or None when the response should be returned as is.
+        """
+        now = time.monotonic()
+        resource = headers.get("X-RateLimit-Resource") or resource
+        quota = None
+        with self._lock:
+            if headers.get("X-RateLimit-Remaining") is not None:
+                remaining = int(headers["X-RateLimit-Remaining"])
+                reset = float(headers.get("X-RateLimit-Reset") or 0)
+                quota = self._quotas[resource] = {
+                    "limit": int(headers.get("X-RateLimit-Limit") or remaining),
+                    "remaining": remaining,
+                    "reset_at": now + max(0.0, reset - time.time()),
+                }
+
+        if status_code not in (403, 429):
+            return None
+
+        retry_after = headers.get("Retry-After")
+        primary = quota is not None and quota["remaining"] == 0
+        if retry_after is not None:
+            delay = float(retry_after) + random.uniform(0, 1)
+        elif primary:
+            # Primary limit: wait for the reset (bounded by max_wait).
+            delay = quota["reset_at"] - now
+        elif status_code == 429 or "secondary rate limit" in body.lower():
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        else:
+            return None  # an ordinary 403 (permissions, blocked resource)
+
+        self._check_wait(0.0, delay)
+        with self._lock:
+            self._stats["primary_limited" if primary else "secondary_limited"] += 1
+            self._blocked_until = max(self._blocked_until, now + delay)
+        logger.warning("GitHub rate limited (%s), backing off %.1fs", status_code, delay)
+        return delay
+
+    # -- execution -----------------------------------------------------------
+
+    def run(self, key: Hashable, send: Callable[[], Any], finish: Callable[[Any], Any],
+            priority: str = INTERACTIVE, resource: str = CORE) -> Any:
+        """
+        Send a request through the scheduler. `send()` performs the HTTP call and
+        `finish(raw)` turns the final raw response into the shared result.
+        Concurrent calls with the same `key` share a single request.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self._stats["deduplicated"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._wait(priority, resource)
+                raw = send()
+                delay = self.observe(raw.status_code, raw.headers, _error_body(raw), attempt, resource)
+                if delay is None or attempt == self.max_retries:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+            result = finish(raw)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def arun(self, key: Hashable, send: Callable[[], Awaitable[Any]], finish: Callable[[Any], Any],
+                   priority: str = INTERACTIVE, resource: str = CORE) -> Any:
+        loop_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            future = self._ainflight.get(loop_key)
+            leader = future is None
+            if leader:
+                future = self._ainflight[loop_key] = asyncio.get_running_loop().create_future()
+                # Mark failures as retrieved when nobody else was waiting on them.
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            else:
+                self._stats["deduplicated"] += 1
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                await self._await(priority, resource)
+                raw = await send()
+                delay = self.observe(raw.status_code, raw.headers, _error_body(raw), attempt, resource)
+                if delay is None or attempt == self.max_retries:
+                    break
+                self._count("retries")
+                await asyncio.sleep(delay)
+            result = finish(raw)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._ainflight.pop(loop_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            stats = dict(self._stats)
+            stats["tokens"] = self._tokens
+            stats["quotas"] = {
+                resource: {
+                    "limit": quota["limit"],
+                    "remaining": quota["remaining"],
+                    "reset_in": max(0.0, quota["reset_at"] - now),
+                }
+                for resource, quota in self._quotas.items()
+            }
+        return stats
+
+
+def _error_body(raw) -> str:
+    # Only 403s need the body (to spot secondary limits); avoid decoding anything else.
+    return raw.text if raw.status_code == 403 else ""
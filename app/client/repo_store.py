@@ -0,0 +1,321 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from app.client.embeddings import embed, to_blob
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo TEXT PRIMARY KEY,
+    data TEXT,
+    readme TEXT,
+    since TEXT NOT NULL DEFAULT '',
+    comments_since TEXT NOT NULL DEFAULT '',
+    synced_at REAL NOT NULL DEFAULT 0,
+    indexed_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    is_pull INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    comments INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repo, number)
+);
+CREATE INDEX IF NOT EXISTS items_open ON items (repo, is_pull, state);
+CREATE TABLE IF NOT EXISTS comments (
+    repo TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (repo, id)
+);
+CREATE INDEX IF NOT EXISTS comments_number ON comments (repo, number);
+-- Full-text index of items; rowid is the items rowid.
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, body, comments, tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS item_vectors (
+    item INTEGER PRIMARY KEY,
+    vector BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS etags (
+    repo TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    PRIMARY KEY (repo, resource)
+);
+"""
+
+# Columns added to `repos` after its first release, for stores created before them.
+REPO_COLUMNS = {
+    "comments_since": "TEXT NOT NULL DEFAULT ''",
+    "indexed_at": "REAL NOT NULL DEFAULT 0",
+}
+
+# Issue/PR fields kept locally: what the tools render, plus text for search.
+ITEM_FIELDS = ("number", "title", "body", "state", "comments", "html_url", "created_at", "updated_at")
+# Characters of comments per item that are indexed and embedded.
+MAX_COMMENT_TEXT = 20000
+
+
+def _slim_item(item: dict) -> dict:
+    slim = {name: item.get(name) for name in ITEM_FIELDS}
+    slim["user"] = {"login": (item.get("user") or {}).get("login", "ghost")}
+    slim["labels"] = [label["name"] if isinstance(label, dict) else label for label in item.get("labels") or []]
+    if "pull_request" in item:
+        slim["pull_request"] = {}
+    return slim
+
+
+class RepoStore:
+    """
+    Local copy of watched repositories in a SQLite file (WAL mode), kept up to
+    date by the background refresher and read by the repo and listing tools.
+
+    - `repos`: metadata, README text, the `since` watermark (latest
+      `updated_at` seen) and when the repo was last synced
+    - `items`: issues and pull requests (as returned by the issues endpoint),
+      open and closed, keyed by number
+    - `comments`: issue and PR comments, synced incrementally like the items
+    - `items_fts`: FTS5 index (porter stemming) of item titles, bodies and
+      comments, and `item_vectors` their hashed embeddings when NumPy is
+      installed; both are updated whenever an item or its comments change
+    - `etags`: the ETag of each synced resource, so unchanged resources are
+      revalidated with a 304 that GitHub does not count against the rate limit
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(repos)")}
+        for name, definition in REPO_COLUMNS.items():
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE repos ADD COLUMN {name} {definition}")
+        self._lock = threading.Lock()
+
+    def etag(self, repo: str, resource: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag FROM etags WHERE repo = ? AND resource = ?", (repo, resource)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_etag(self, repo: str, resource: str, etag: Optional[str]) -> None:
+        if not etag:
+            return
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO etags VALUES (?, ?, ?)", (repo, resource, etag))
+
+    def _ensure_repo(self, repo: str) -> None:
+        self.conn.execute("INSERT OR IGNORE INTO repos (repo) VALUES (?)", (repo,))
+
+    def save_repo(self, repo: str, data: dict) -> None:
+        with self._lock:
+            self._ensure_repo(repo)
+            self.conn.execute("UPDATE repos SET data = ? WHERE repo = ?", (json.dumps(data), repo))
+
+    def save_readme(self, repo: str, readme: Optional[str]) -> None:
+        with self._lock:
+            self._ensure_repo(repo)
+            self.conn.execute("UPDATE repos SET readme = ? WHERE repo = ?", (readme, repo))
+
+    def since(self, repo: str, column: str = "since") -> str:
+        """The `since` watermark of items, or of comments with column="comments_since"."""
+        with self._lock:
+            row = self.conn.execute(f"SELECT {column} FROM repos WHERE repo = ?", (repo,)).fetchone()
+        return row[0] if row else ""
+
+    def _reindex(self, repo: str, numbers) -> None:
+        """Rebuild the full-text rows and vectors of items `numbers` (caller holds the lock)."""
+        for number in set(numbers):
+            row = self.conn.execute(
+                "SELECT rowid, data FROM items WHERE repo = ? AND number = ?", (repo, number)
+            ).fetchone()
+            if row is None:
+                continue  # comments of an item that is not stored (yet)
+            rowid, item = row[0], json.loads(row[1])
+            comments = "\n".join(
+                body for body, in self.conn.execute(
+                    "SELECT body FROM comments WHERE repo = ? AND number = ? ORDER BY id", (repo, number)
+                )
+            )[:MAX_COMMENT_TEXT]
+            title, body = item.get("title") or "", item.get("body") or ""
+            self.conn.execute("DELETE FROM items_fts WHERE rowid = ?", (rowid,))
+            self.conn.execute(
+                "INSERT INTO items_fts (rowid, title, body, comments) VALUES (?, ?, ?, ?)",
+                (rowid, title, body, comments),
+            )
+            # The title counts twice: it is the densest description of the item.
+            vector = embed(f"{title}\n{title}\n{body}\n{comments}")
+            if vector is not None:
+                self.conn.execute("INSERT OR REPLACE INTO item_vectors VALUES (?, ?)", (rowid, to_blob(vector)))
+        self.conn.execute("UPDATE repos SET indexed_at = ? WHERE repo = ?", (time.time(), repo))
+
+    def upsert_items(self, repo: str, items: list[dict]) -> None:
+        """Store issues/PRs from the issues endpoint and advance the `since` watermark."""
+        rows = [
+            (
+                repo, item["number"], int("pull_request" in item), item.get("state") or "open",
+                item.get("comments") or 0, item.get("created_at") or "", item.get("updated_at") or "",
+                json.dumps(_slim_item(item)),
+            )
+            for item in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self._ensure_repo(repo)
+                # An upsert rather than REPLACE keeps the rowid, which keys the index.
+                self.conn.executemany(
+                    "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (repo, number) DO UPDATE SET "
+                    "is_pull = excluded.is_pull, state = excluded.state, comments = excluded.comments, "
+                    "created_at = excluded.created_at, updated_at = excluded.updated_at, data = excluded.data",
+                    rows,
+                )
+                self.conn.execute(
+                    "UPDATE repos SET since = MAX(since, ?) WHERE repo = ?",
+                    (max(row[6] for row in rows), repo),
+                )
+                self._reindex(repo, [row[1] for row in rows])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def upsert_comments(self, repo: str, comments: list[dict]) -> None:
+        """Store comments from the repo's issue comments endpoint and reindex their items."""
+        rows = [
+            (
+                repo, c["id"], int(c["issue_url"].rstrip("/").rsplit("/", 1)[1]),
+                c.get("body") or "", c.get("updated_at") or "",
+            )
+            for c in comments
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self._ensure_repo(repo)
+                self.conn.executemany("INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?, ?)", rows)
+                self.conn.execute(
+                    "UPDATE repos SET comments_since = MAX(comments_since, ?) WHERE repo = ?",
+                    (max(row[4] for row in rows), repo),
+                )
+                self._reindex(repo, [row[2] for row in rows])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def mark_synced(self, repo: str) -> None:
+        with self._lock:
+            self._ensure_repo(repo)
+            self.conn.execute("UPDATE repos SET synced_at = ? WHERE repo = ?", (time.time(), repo))
+
+    def overview(self, repo: str, limit: int) -> Optional[dict]:
+        """
+        The repo in the shape of the GraphQL overview (`repo`, `readme`, `issues`,
+        `prs`, plus `synced_at`): top open issues by comments, newest open PRs.
+        None until the repo has been synced once.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data, readme, synced_at FROM repos WHERE repo = ?", (repo,)
+            ).fetchone()
+            if row is None or row[0] is None or not row[2]:
+                return None
+            issues = self.conn.execute(
+                "SELECT data FROM items WHERE repo = ? AND is_pull = 0 AND state = 'open' "
+                "ORDER BY comments DESC, number LIMIT ?", (repo, limit),
+            ).fetchall()
+            prs = self.conn.execute(
+                "SELECT data FROM items WHERE repo = ? AND is_pull = 1 AND state = 'open' "
+                "ORDER BY created_at DESC, number DESC LIMIT ?", (repo, limit),
+            ).fetchall()
+        return {
+            "repo": json.loads(row[0]),
+            "readme": row[1],
+            "issues": [json.loads(data) for data, in issues],
+            "prs": [json.loads(data) for data, in prs],
+            "synced_at": row[2],
+        }
+
+    @staticmethod
+    def _filters(repos: list[str], state: str) -> tuple[str, list]:
+        where = f"items.repo IN ({', '.join('?' * len(repos))})"
+        if state != "all":
+            where += " AND items.state = ?"
+            return where, [*repos, state]
+        return where, list(repos)
+
+    def search_text(self, repos: list[str], match: str, state: str, limit: int) -> list[tuple]:
+        """
+        (repo, item, snippet) of the best full-text matches of the FTS5 `match`
+        expression, best first (BM25; title matches weigh most).
+        """
+        where, params = self._filters(repos, state)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT items.repo, items.data, snippet(items_fts, -1, '**', '**', '…', 12) "
+                "FROM items_fts JOIN items ON items.rowid = items_fts.rowid "
+                f"WHERE items_fts MATCH ? AND {where} "
+                "ORDER BY bm25(items_fts, 5.0, 1.0, 0.5) LIMIT ?",
+                (match, *params, limit),
+            ).fetchall()
+        return [(repo, json.loads(data), snippet) for repo, data, snippet in rows]
+
+    def vectors(self, repos: list[str], state: str) -> tuple[list[tuple], list[bytes]]:
+        """(repo, item) of every indexed item, and the matching embedding blobs."""
+        where, params = self._filters(repos, state)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT items.repo, items.data, item_vectors.vector "
+                f"FROM item_vectors JOIN items ON items.rowid = item_vectors.item WHERE {where}",
+                params,
+            ).fetchall()
+        return [(repo, json.loads(data)) for repo, data, _ in rows], [vector for _, _, vector in rows]
+
+    def indexed_at(self, repos: list[str]) -> float:
+        """Latest index change across `repos` (0 if none are indexed)."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT MAX(indexed_at) FROM repos WHERE repo IN ({', '.join('?' * len(repos))})", repos
+            ).fetchone()
+        return row[0] or 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.executescript(
+                "DELETE FROM items; DELETE FROM repos; DELETE FROM etags; DELETE FROM comments; "
+                "DELETE FROM items_fts; DELETE FROM item_vectors;"
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "repos": self.conn.execute("SELECT COUNT(*) FROM repos").fetchone()[0],
+                "items": self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0],
+                "comments": self.conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0],
+            }
+
+
+@lru_cache(maxsize=1)
+def get_repo_store() -> RepoStore:
+    return RepoStore(path=os.getenv("REPO_STORE_PATH", "data/repos.db"))
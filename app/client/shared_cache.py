@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Optional
+
+from app.client.cache import LRUTTLCache
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+# Writes between two trims of the oldest entries down to `max_entries`.
+TRIM_EVERY = 200
+
+
+class SharedCache:
+    """
+    Cache tier shared by every worker process on a node: one SQLite file in
+    WAL mode, placed on /dev/shm by `serve.py` so it lives in shared memory.
+    Readers never block each other or the writer.
+
+    - `entries`: JSON values by (namespace, key) with the wall-clock time they
+      were stored, so each process applies its own TTL; bounded to
+      `max_entries`, oldest first
+    - `sessions`: when each API session was last used, by any worker
+    - `leases`: named leases, so only one worker runs a background job
+    """
+
+    def __init__(self, path: str, max_entries: int = 20000):
+        self.path = path
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # A cache: losing the last writes on a crash is fine, fsyncs are not.
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[tuple[Any, float]]:
+        """(value, age in seconds) or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            self._stats["hits" if row else "misses"] += 1
+        if row is None:
+            return None
+        return json.loads(row[0]), max(0.0, time.time() - row[1])
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time()),
+            )
+            self._writes += 1
+            if self._writes % TRIM_EVERY == 0:
+                self.conn.execute(
+                    "DELETE FROM entries WHERE rowid IN ("
+                    "SELECT rowid FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def touch(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE entries SET stored_at = ? WHERE namespace = ? AND key = ?", (time.time(), namespace, key)
+            )
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self.conn.execute("DELETE FROM entries")
+            else:
+                self.conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def touch_session(self, session_id: str) -> None:
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?)", (session_id, time.time()))
+
+    def session_idle(self, session_id: str) -> float:
+        """Seconds since any worker last used `session_id` (infinite if never)."""
+        with self._lock:
+            row = self.conn.execute("SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return time.time() - row[0] if row else float("inf")
+
+    def forget_session(self, session_id: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Take or renew lease `name` for `ttl` seconds; False while another owner holds it."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT (name) DO UPDATE SET "
+                "owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.owner = excluded.owner OR leases.expires < ?",
+                (name, owner, now + ttl, now),
+            )
+            row = self.conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return stats
+
+
+class TieredCache:
+    """
+    An LRUTTLCache (L1, per process) backed by a SharedCache namespace (L2,
+    per node), with the LRUTTLCache interface the clients already use.
+
+    L1 misses are looked up in L2 and copied into L1 with their age, so an
+    entry is fresh for the same `ttl` in every worker; every `set` writes
+    through to L2. Values cross processes as JSON via `dump` / `load`.
+    """
+
+    def __init__(self, l1: LRUTTLCache, shared: SharedCache, namespace: str,
+                 dump: Callable[[Any], Any] = lambda v: v, load: Callable[[Any], Any] = lambda v: v):
+        self.l1 = l1
+        self.shared = shared
+        self.namespace = namespace
+        self.dump = dump
+        self.load = load
+
+    @property
+    def ttl(self) -> Optional[float]:
+        return self.l1.ttl
+
+    def _from_l2(self, key: Hashable) -> bool:
+        found = self.shared.get(self.namespace, SharedCache.make_key(key))
+        if found is None:
+            return False
+        value, age = found
+        self.l1.set(key, self.load(value), age=age)
+        return True
+
+    def get(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        if not self.l1.is_fresh(key):
+            self._from_l2(key)
+        return self.l1.get(key, default, allow_stale=allow_stale)
+
+    def is_fresh(self, key: Hashable) -> bool:
+        return self.l1.is_fresh(key) or (self._from_l2(key) and self.l1.is_fresh(key))
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.l1.set(key, value)
+        try:
+            self.shared.set(self.namespace, SharedCache.make_key(key), self.dump(value))
+        except (TypeError, ValueError) as e:
+            logger.debug("Not sharing %s entry %r: %s", self.namespace, key, e)
+
+    def touch(self, key: Hashable) -> None:
+        self.l1.touch(key)
+        self.shared.touch(self.namespace, SharedCache.make_key(key))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self.l1.pop(key, default)
+
+    def clear(self) -> None:
+        self.l1.clear()
+        self.shared.clear(self.namespace)
+
+    def __len__(self) -> int:
+        return len(self.l1)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.is_fresh(key)
+
+
+@lru_cache(maxsize=1)
+def get_shared_cache() -> Optional[SharedCache]:
+    """The node's SharedCache at SHARED_CACHE_PATH, or None when unset (single process)."""
+    path = os.getenv("SHARED_CACHE_PATH", "").strip()
+    if not path:
+        return None
+    return SharedCache(path, max_entries=int(os.getenv("SHARED_CACHE_SIZE", "20000")))
+
+
+def tiered(cache: LRUTTLCache, namespace: str, dump=lambda v: v, load=lambda v: v):
+    """`cache` backed by the node's shared tier when one is configured, else `cache` itself."""
+    shared = get_shared_cache()
+    return cache if shared is None else TieredCache(cache, shared, namespace, dump, load)
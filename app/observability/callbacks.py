@@ -0,0 +1,111 @@
+import time
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.agent.budget import RequestBudget
+from app.observability.metrics import ITERATION_SECONDS, LLM_SECONDS, LLM_TOKENS
+from app.observability.tracing import current_span, record_span
+
+
+# Pseudo-tools the ReAct loop uses to report parsing errors and unknown tools.
+INTERNAL_TOOLS = ("_Exception", "invalid_tool")
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    """(prompt, completion) tokens from the message usage metadata or the provider's llm_output."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """
+    Per-request LangChain callback that times LLM calls (with token counts) and
+    ReAct iterations into the metrics registry, and adds them to the request's
+    trace when it is sampled. A ReAct iteration runs from one agent LLM call to
+    the next (or to the final answer), so it covers the tool call in between.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.trace = current_span()
+        self._llm_runs: dict[UUID, tuple[float, str, Optional[str]]] = {}
+        self._iteration_start: Optional[float] = None
+        self.iterations = 0
+
+    def _close_iteration(self, now: float) -> None:
+        if self._iteration_start is None:
+            return
+        ITERATION_SECONDS.observe(now - self._iteration_start)
+        record_span(self.trace, f"iteration {self.iterations}", "iteration",
+                    self._iteration_start, now - self._iteration_start)
+        self._iteration_start = None
+
+    def _start_llm(self, run_id: UUID, kwargs: dict) -> None:
+        now = time.perf_counter()
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or params.get("_type") or "unknown"
+        node = (kwargs.get("metadata") or {}).get("langgraph_node")
+        self._llm_runs[run_id] = (now, model, node)
+        if node == "agent":
+            self._close_iteration(now)
+            self.iterations += 1
+            self._iteration_start = now
+
+    def on_llm_start(self, serialized: dict, prompts: list, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_llm(run_id, kwargs)
+
+    def on_chat_model_start(self, serialized: dict, messages: list, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_llm(run_id, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._llm_runs.pop(run_id, None)
+        if started is None:
+            return
+        start, model, node = started
+        elapsed = time.perf_counter() - start
+        prompt_tokens, completion_tokens = _token_usage(response)
+        LLM_SECONDS.observe(elapsed, model=model)
+        LLM_TOKENS.inc(prompt_tokens, model=model, type="prompt")
+        LLM_TOKENS.inc(completion_tokens, model=model, type="completion")
+        record_span(self.trace, model, "llm", start, elapsed, node=node,
+                    prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._llm_runs.pop(run_id, None)
+
+    def on_agent_finish(self, finish: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close_iteration(time.perf_counter())
+
+
+class BudgetCallbackHandler(BaseCallbackHandler):
+    """Charges LLM token usage to the request budget and keeps tool observations for partial answers."""
+
+    run_inline = True
+
+    def __init__(self, budget: RequestBudget):
+        self.budget = budget
+        self._tools: dict[UUID, str] = {}
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = _token_usage(response)
+        self.budget.charge_tokens(prompt_tokens + completion_tokens)
+
+    def on_tool_start(self, serialized: dict, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tools[run_id] = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        tool = self._tools.pop(run_id, "tool")
+        if tool not in INTERNAL_TOOLS:
+            self.budget.observe(tool, getattr(output, "content", output))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tools.pop(run_id, None)
@@ -0,0 +1,248 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Only the headers tools read are kept: rate-limit headers would make a
+# replay throttle itself the way production was throttled.
+RECORDED_HEADERS = ("ETag", "Last-Modified", "Link")
+
+# Message and run ids are random per run; they show up in prompts (the
+# ReAct prompt embeds the message list) and must not change the LLM key.
+_ID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+_THREAD_FILE_RE = re.compile(r"[^\w.-]")
+
+# Cassette being recorded or replayed by the current agent turn.
+_active: ContextVar[Optional["Cassette"]] = ContextVar("cassette", default=None)
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay for an LLM call or GitHub request the cassette has no answer for."""
+
+
+def request_key(payload: Any) -> str:
+    """Short stable digest of a JSON-serializable request, ids stripped."""
+    raw = _ID_RE.sub("", json.dumps(payload, sort_keys=True, default=str))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class ReplayedResponse:
+    """A recorded GitHub exchange, standing in for the requests/httpx response."""
+
+    def __init__(self, status_code: int, headers: dict, data: Any):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = b"" if data is None else json.dumps(data).encode("utf-8")
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class Cassette:
+    """
+    The LLM calls and GitHub responses of an agent's turns, one gzip'd JSON
+    line per entry:
+
+    - `turn`: thread id, user input, the answer given, the agent's model and mode
+    - `llm`: request key and the reply (content, tool calls, token usage)
+    - `http`: request (`GET <path>?<query>` or `POST graphql <digest>`) and
+      the response the tool got (status, body, ETag/Link headers)
+
+    GitHub entries are what the client returned, cache hits included, so a
+    replay starting from a cold cache sees the same data. Each recorded turn
+    is appended as its own gzip member when it ends.
+
+    In replay, answers are looked up by request key; a key recorded several
+    times is served in order (the last answer repeats). An LLM request with
+    no match gets the next unused reply in recording order and counts as a
+    divergence; with `strict=True` it raises CassetteMiss instead.
+    """
+
+    def __init__(self, path: str, mode: str = RECORD, strict: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode {mode!r}; use {RECORD!r} or {REPLAY!r}")
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self.turns: list[dict] = []
+        self._lock = threading.Lock()
+        self._pending: list[dict] = []
+        self._entries: dict[tuple, list[dict]] = defaultdict(list)
+        self._served: dict[tuple, int] = defaultdict(int)
+        self._llm_order: list[dict] = []
+        self._used: set[int] = set()
+        self._stats = {"llm": 0, "http": 0, "diverged": 0, "misses": 0}
+        if mode == REPLAY:
+            self._load()
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["type"] == "turn":
+                    self.turns.append(entry)
+                else:
+                    self._entries[entry["type"], entry["key"]].append(entry)
+                    if entry["type"] == "llm":
+                        self._llm_order.append(entry)
+
+    # -- record --------------------------------------------------------------
+
+    def _append(self, entry: dict) -> None:
+        with self._lock:
+            self._pending.append(entry)
+
+    def record_llm(self, key: str, model: str, reply: dict) -> None:
+        self._append({"type": "llm", "key": key, "model": model, **reply})
+
+    def record_http(self, key: str, response: dict) -> None:
+        wanted = {name.lower(): name for name in RECORDED_HEADERS}
+        headers = {wanted[name.lower()]: value for name, value in response["headers"].items() if name.lower() in wanted}
+        self._append({"type": "http", "key": key, "status": response["status_code"],
+                      "headers": headers, "body": response["data"]})
+
+    def record_turn(self, thread_id: str, user_input: str, output: Optional[str], **attrs) -> None:
+        """Close a turn: write it and everything recorded since the last one."""
+        turn = {"type": "turn", "thread_id": thread_id, "input": user_input, "output": output, **attrs}
+        with self._lock:
+            entries, self._pending = self._pending + [turn], []
+            self.turns.append(turn)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.writelines(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+                             for entry in entries)
+
+    # -- replay --------------------------------------------------------------
+
+    def _next(self, kind: str, key: str) -> Optional[dict]:
+        entries = self._entries.get((kind, key))
+        if not entries:
+            return None
+        index = min(self._served[kind, key], len(entries) - 1)
+        self._served[kind, key] = index + 1
+        return entries[index]
+
+    def replay_llm(self, key: str) -> dict:
+        with self._lock:
+            self._stats["llm"] += 1
+            entry = self._next("llm", key)
+            if entry is None and not self.strict:
+                entry = next((e for e in self._llm_order if id(e) not in self._used), None)
+                if entry is not None:
+                    self._stats["diverged"] += 1
+            if entry is None:
+                self._stats["misses"] += 1
+                raise CassetteMiss(f"No recorded LLM reply for request {key} in {self.path}")
+            self._used.add(id(entry))
+        return entry
+
+    def replay_http(self, key: str) -> ReplayedResponse:
+        with self._lock:
+            self._stats["http"] += 1
+            entry = self._next("http", key)
+            if entry is None:
+                self._stats["misses"] += 1
+                raise CassetteMiss(f"No recorded GitHub response for {key} in {self.path}")
+        return ReplayedResponse(entry["status"], dict(entry["headers"]), entry["body"])
+
+    def rewind(self) -> None:
+        """Serve every recorded answer again from the start (for repeated replays)."""
+        with self._lock:
+            self._served.clear()
+            self._used.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+def current_cassette() -> Optional[Cassette]:
+    return _active.get()
+
+
+def replaying() -> Optional[Cassette]:
+    """The cassette the current turn replays from, or None."""
+    cassette = _active.get()
+    return cassette if cassette is not None and not cassette.recording else None
+
+
+@contextmanager
+def use_cassette(cassette: Optional[Cassette]):
+    """Record into / replay from `cassette` for the duration of the block (None: neither)."""
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        try:
+            _active.reset(token)
+        except ValueError:
+            # Async generators may be closed from another context (client disconnect).
+            pass
+
+
+class Recorder:
+    """
+    Where an agent records its turns: every thread into the cassette at
+    `path`, or one cassette per thread under `directory`.
+    """
+
+    def __init__(self, path: Optional[str] = None, directory: Optional[str] = None):
+        if not path and not directory:
+            raise ValueError("Recorder needs a cassette path or a directory")
+        self.path = path
+        self.directory = directory
+        self._cassettes: dict[str, Cassette] = {}
+        self._lock = threading.Lock()
+
+    def cassette(self, thread_id: str) -> Cassette:
+        path = self.path or os.path.join(self.directory, _THREAD_FILE_RE.sub("_", thread_id) + ".jsonl.gz")
+        with self._lock:
+            if path not in self._cassettes:
+                self._cassettes[path] = Cassette(path, RECORD)
+            return self._cassettes[path]
+
+    @contextmanager
+    def turn(self, thread_id: str, user_input: str, **attrs):
+        """
+        Record one turn of `thread_id` (with `attrs`, such as the agent's model
+        and mode). Yields a dict; put the answer under "output" before the
+        block ends. A failed turn is recorded with no output.
+        """
+        cassette = self.cassette(thread_id)
+        result = {"output": None}
+        with use_cassette(cassette):
+            try:
+                yield result
+            finally:
+                try:
+                    cassette.record_turn(thread_id, user_input, result["output"], **attrs)
+                except OSError as e:
+                    logger.warning("Could not write cassette %s: %s", cassette.path, e)
+
+
+def recorder_from_env() -> Optional[Recorder]:
+    """CASSETTE_DIR: record every thread's turns into <dir>/<thread id>.jsonl.gz (unset: off)."""
+    directory = os.getenv("CASSETTE_DIR", "").strip()
+    return Recorder(directory=directory) if directory else None
@@ -0,0 +1,162 @@
+import math
+import threading
+from typing import Callable, Iterable, Optional
+
+# Latency buckets (seconds) spanning cached tool calls to multi-step LLM turns.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value) -> str:
+    # Integral values print exactly (a counter past 1e6 must not become
+    # "1.23457e+06"); others use repr, the shortest exact float form.
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label set."""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple((name, labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket counts..., count, sum]
+                series = self._series[key] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def totals(self) -> dict[tuple, tuple[int, float]]:
+        """(count, sum) per label values, e.g. to diff timings around a run."""
+        with self._lock:
+            return {tuple(value for _, value in key): (series[-2], series[-1]) for key, series in self._series.items()}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', bound))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-2]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple((name, labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items)
+        return lines
+
+
+class Registry:
+    """
+    Holds the process's metrics. Collectors are callables returning extra
+    `(name, type, help, {labels}, value)` samples at scrape time, for stats
+    that already live elsewhere (cache hit counters, rate-limit budget, ...).
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list[Callable[[], Iterable[tuple]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        described = set()
+        for collector in self._collectors:
+            for name, type_, help, labels, value in collector():
+                if value is None:
+                    continue
+                if name not in described:
+                    lines += [f"# HELP {name} {help}", f"# TYPE {name} {type_}"]
+                    described.add(name)
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "agent_request_seconds", "End-to-end latency of one agent turn.", ["method"])
+NODE_SECONDS = REGISTRY.histogram(
+    "agent_node_seconds", "Latency of each LangGraph node.", ["node"])
+ITERATION_SECONDS = REGISTRY.histogram(
+    "agent_iteration_seconds", "Latency of one ReAct iteration (LLM step plus its tool call).")
+TOOL_SECONDS = REGISTRY.histogram(
+    "agent_tool_seconds", "Latency of each tool call.", ["tool"])
+LLM_SECONDS = REGISTRY.histogram(
+    "agent_llm_seconds", "Latency of each LLM call.", ["model"])
+LLM_TOKENS = REGISTRY.counter(
+    "agent_llm_tokens_total", "Tokens reported by the LLM provider.", ["model", "type"])
+BUDGET_EXHAUSTED = REGISTRY.counter(
+    "agent_budget_exhausted_total", "Agent turns cut short by a per-request budget.", ["budget"])
+BATCH_ITEM_SECONDS = REGISTRY.histogram(
+    "batch_item_seconds", "Latency of each /batch item.", ["task"])
+GITHUB_SECONDS = REGISTRY.histogram(
+    "github_request_seconds", "GitHub client time per request, split into network and JSON parsing.",
+    ["tool", "phase"])
+WATCHED_LOOKUPS = REGISTRY.counter(
+    "watched_repo_lookups_total", "Tool lookups of watched repos, served locally (hit) or from GitHub (miss).",
+    ["tool", "result"])
+WATCHED_SYNC_REQUESTS = REGISTRY.counter(
+    "watched_repo_sync_requests_total", "GitHub requests made by the watched-repo refresher.", ["result"])
+ADMISSION = REGISTRY.counter(
+    "agent_admission_total", "Agent runs by admission outcome: admitted, coalesced, queue_full or timed_out.",
+    ["result"])
@@ -0,0 +1,131 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.observability.metrics import Histogram
+
+logger = logging.getLogger("app.trace")
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    start: float
+    attrs: dict = field(default_factory=dict)
+    duration: Optional[float] = None
+    children: list = field(default_factory=list)
+
+    def to_dict(self, origin: float) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round((self.duration or 0.0) * 1000, 2),
+            **({"attrs": self.attrs} if self.attrs else {}),
+            **({"children": [c.to_dict(origin) for c in self.children]} if self.children else {}),
+        }
+
+
+# Innermost open span of the current request's trace; None when the request is not sampled.
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# Tool being executed, used to attribute GitHub client time.
+_current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+
+def sample_rate() -> float:
+    return float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_tool() -> str:
+    return _current_tool.get() or "none"
+
+
+def _reset(var: ContextVar, token) -> None:
+    try:
+        var.reset(token)
+    except ValueError:
+        # Async generators may be closed from another context (client disconnect).
+        pass
+
+
+@contextmanager
+def trace(name: str, histogram: Optional[Histogram] = None, labels: Optional[dict] = None, **attrs):
+    """
+    Root span of one request. Latency always goes to `histogram`; the span tree
+    is only built for a TRACE_SAMPLE_RATE fraction of requests, and logged as a
+    single JSON line on the `app.trace` logger when the request ends.
+    """
+    start = time.perf_counter()
+    root = Span(name, "request", start, attrs) if random.random() < sample_rate() else None
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        elapsed = time.perf_counter() - start
+        _reset(_current_span, token)
+        if histogram is not None:
+            histogram.observe(elapsed, **(labels or {}))
+        if root is not None:
+            root.duration = elapsed
+            logger.info(json.dumps(root.to_dict(start), default=str))
+
+
+@contextmanager
+def span(name: str, kind: str, histogram: Optional[Histogram] = None, labels: Optional[dict] = None, **attrs):
+    """Time a block into `histogram` and, inside a sampled trace, record it as a child span."""
+    start = time.perf_counter()
+    parent = _current_span.get()
+    child = token = None
+    if parent is not None:
+        child = Span(name, kind, start, attrs)
+        parent.children.append(child)
+        token = _current_span.set(child)
+    tool_token = _current_tool.set(name) if kind == "tool" else None
+    try:
+        yield child
+    finally:
+        elapsed = time.perf_counter() - start
+        if tool_token is not None:
+            _reset(_current_tool, tool_token)
+        if child is not None:
+            child.duration = elapsed
+            _reset(_current_span, token)
+        if histogram is not None:
+            histogram.observe(elapsed, **(labels or {}))
+
+
+def record_span(parent: Optional[Span], name: str, kind: str, start: float, duration: float, **attrs) -> None:
+    """Attach an already-measured span (e.g. from a LangChain callback) to a sampled trace."""
+    if parent is not None:
+        parent.children.append(Span(name, kind, start, attrs, duration))
+
+
+def traced(name: str, kind: str, histogram: Optional[Histogram] = None, labels: Optional[dict] = None):
+    """Decorator form of `span` for sync and async callables."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs) -> Any:
+                with span(name, kind, histogram, labels):
+                    return await fn(*args, **kwargs)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs) -> Any:
+            with span(name, kind, histogram, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -1,17 +1,120 @@
 # routes/github_chat.py
+import json
 import logging
+import os
+import time
+from functools import lru_cache
 logger = logging.getLogger(__name__)
 
-from fastapi import APIRouter, Request
-from app.agent.github_agent import GitHubAgent
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.agent.admission import Overloaded, admission_from_env
+from app.agent.sessions import session_manager_from_env
+
+SESSION_HEADER = "X-Session-ID"
 
 router = APIRouter()
-agent = GitHubAgent(thread_id="api-session")
 
-@router.post("/chat")
-async def chat_with_agent(request: Request):
-    logger.info("Received chat request")
+@lru_cache(maxsize=1)
+def get_agent():
+    # Built on first use (with its imports) so the app starts without
+    # constructing LLM clients or loading the agent stack.
+    from app.agent.github_agent import GitHubAgent
+    return GitHubAgent(thread_id="api-session")
+
+@lru_cache(maxsize=1)
+def get_sessions():
+    return session_manager_from_env(get_agent())
+
+@lru_cache(maxsize=1)
+def get_admission():
+    # Limits concurrent agent runs (AGENT_MAX_CONCURRENT / AGENT_MAX_QUEUE) and
+    # shares runs between identical new-session questions.
+    return admission_from_env()
+
+def _busy(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def _read_chat_request(request: Request):
+    """
+    `(message, session_id, new_session)`. The session is only registered
+    (resolve) once the request is admitted: refused requests must not push
+    live sessions, and their threads, out of the session LRU.
+    """
     data = await request.json()
     user_input = data.get("message", "")
-    response = agent.chat(user_input)
-    return {"response": response}
+    requested = request.headers.get(SESSION_HEADER) or data.get("session_id")
+    return user_input, get_sessions().session_id(requested), not requested
+
+def _coalesce_key(user_input: str) -> str:
+    return " ".join(user_input.split()).casefold()
+
+async def _achat(user_input: str, session_id: str):
+    _, thread_id = get_sessions().resolve(session_id)
+    return await get_agent().achat(user_input, thread_id=thread_id), thread_id
+
+@router.post("/chat")
+async def chat_with_agent(request: Request, response: Response):
+    """
+    One agent turn. Questions that start a new session carry no history, so
+    identical ones in flight together run once: every caller gets the answer
+    and its own session, seeded with the conversation of the run they shared.
+    Returns 429/503 with Retry-After when the server is saturated.
+    """
+    logger.info("Received chat request")
+    user_input, session_id, new_session = await _read_chat_request(request)
+    admission = get_admission()
+    try:
+        if new_session and os.getenv("CHAT_COALESCE", "1") != "0":
+            (reply, source), shared = await admission.run_once(
+                _coalesce_key(user_input), lambda: _achat(user_input, session_id)
+            )
+            if shared:
+                _, thread_id = get_sessions().resolve(session_id)
+                await get_agent().acopy_thread(source, thread_id)
+        else:
+            reply, _ = await admission.run(lambda: _achat(user_input, session_id))
+    except Overloaded as e:
+        logger.warning("Rejected chat request: %s", e)
+        raise _busy(e)
+    response.headers[SESSION_HEADER] = session_id
+    return {"response": reply, "session_id": session_id}
+
+@router.post("/chat/stream")
+async def stream_chat_with_agent(request: Request):
+    """Server-Sent Events: tool_start / tool_end / token events, then a final event."""
+    logger.info("Received streaming chat request")
+    user_input, session_id, _ = await _read_chat_request(request)
+    # Streams are admitted like /chat but never shared: each caller follows its own run.
+    # A full queue is refused up front; a stream that waits too long for a slot ends
+    # with an error event instead.
+    admission = get_admission()
+    try:
+        admission.check()
+    except Overloaded as e:
+        logger.warning("Rejected streaming chat request: %s", e)
+        raise _busy(e)
+
+    async def event_stream():
+        yield f"event: session\ndata: {json.dumps({'session_id': session_id})}\n\n"
+        try:
+            await admission.acquire()
+        except Overloaded as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e), 'retry_after': e.retry_after})}\n\n"
+            return
+        started = time.monotonic()
+        try:
+            _, thread_id = get_sessions().resolve(session_id)
+            async for event in get_agent().astream(user_input, thread_id=thread_id):
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+        except Exception as e:
+            logger.error("Streaming chat failed: %s", str(e), exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            admission.release(started)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={SESSION_HEADER: session_id, "Cache-Control": "no-cache"},
+    )
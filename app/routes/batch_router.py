@@ -0,0 +1,46 @@
+# routes/batch_router.py
+import json
+import logging
+import os
+from functools import lru_cache
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+router = APIRouter()
+
+@lru_cache(maxsize=1)
+def get_batch_runner():
+    # Imported on first use, like the agent, to keep API start-up cheap.
+    from app.tools.batch import batch_runner_from_env
+    return batch_runner_from_env()
+
+@router.post("/batch")
+async def batch(request: Request):
+    """
+    Run one task over many issue/PR URLs: `{"task": "details" | "review" | "fix", "urls": [...]}`.
+    Streams one NDJSON line per URL as soon as it finishes (out of order; see `index`).
+    """
+    from app.tools.batch import BATCH_TASKS
+
+    data = await request.json()
+    task = data.get("task", "details")
+    urls = data.get("urls") or []
+    max_items = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+    if task not in BATCH_TASKS:
+        raise HTTPException(status_code=400, detail=f"Unknown task '{task}'; use one of {', '.join(BATCH_TASKS)}")
+    if not isinstance(urls, list) or not urls or not all(isinstance(u, str) for u in urls):
+        raise HTTPException(status_code=400, detail="'urls' must be a non-empty list of issue or PR URLs")
+    if len(urls) > max_items:
+        raise HTTPException(status_code=413, detail=f"At most {max_items} URLs per batch")
+    logger.info("Received batch request: %s x %d", task, len(urls))
+
+    async def lines():
+        async for result in get_batch_runner().run(urls, task):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON)
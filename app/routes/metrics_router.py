@@ -0,0 +1,89 @@
+# routes/metrics_router.py
+import sys
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.observability.metrics import REGISTRY
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+def _built(module: str, factory: str):
+    # Scraping must not import or construct clients (or open the LLM cache)
+    # that the app never used; importing them here would also slow start-up.
+    loaded = sys.modules.get(module)
+    if loaded is None or not getattr(loaded, factory).cache_info().currsize:
+        return None
+    return getattr(loaded, factory)()
+
+
+def _github_samples():
+    client = _built("app.client.github_client", "get_github_client")
+    if client is None:
+        return
+    stats = client.stats()
+    rate = stats.pop("rate_limit")
+    for name in ("hits", "misses", "not_modified", "errors"):
+        yield "github_http_cache_total", "counter", "GitHub client HTTP cache lookups.", {"result": name}, stats[name]
+    yield "github_graphql_requests_total", "counter", "GitHub GraphQL requests sent.", {}, stats["graphql"]
+    yield "github_http_cache_entries", "gauge", "Entries in the GitHub client HTTP cache.", {}, stats["cache_entries"]
+    for name in ("requests", "throttled", "retries", "primary_limited", "secondary_limited", "gave_up", "deduplicated"):
+        yield "github_rate_limit_events_total", "counter", "Rate-limit scheduler events.", {"event": name}, rate[name]
+    yield "github_rate_limit_wait_seconds_total", "counter", "Time spent waiting for rate-limit budget.", {}, rate["wait_seconds"]
+    yield "github_rate_limit_tokens", "gauge", "Tokens left in the local request bucket.", {}, rate["tokens"]
+    for resource, quota in rate["quotas"].items():
+        yield "github_rate_limit_remaining", "gauge", "Requests left in GitHub's reported quota.", {"resource": resource}, quota["remaining"]
+
+
+def _tool_cache_samples():
+    cache = _built("app.tools.github_resources", "get_resource_cache")
+    if cache is None:
+        return
+    for tool, counts in cache.stats().items():
+        for name in ("hits", "misses"):
+            yield "tool_cache_total", "counter", "Tool resource cache lookups.", {"tool": tool, "result": name}, counts[name]
+
+
+def _llm_cache_samples():
+    cache = _built("app.client.llm_cache", "get_llm_cache")
+    if cache is None:
+        return
+    stats = cache.stats()
+    for name in ("hits", "misses", "invalidated"):
+        yield "llm_cache_total", "counter", "Persistent LLM response cache lookups.", {"result": name}, stats[name]
+    yield "llm_cache_entries", "gauge", "Entries in the persistent LLM response cache.", {}, stats["entries"]
+
+
+def _shared_cache_samples():
+    cache = _built("app.client.shared_cache", "get_shared_cache")
+    if cache is None:
+        return
+    stats = cache.stats()
+    for name in ("hits", "misses"):
+        yield "shared_cache_total", "counter", "Lookups in the node-wide shared cache tier.", {"result": name}, stats[name]
+    yield "shared_cache_entries", "gauge", "Entries in the node-wide shared cache tier.", {}, stats["entries"]
+
+
+def _admission_samples():
+    admission = _built("app.routes.agent_router", "get_admission")
+    if admission is None:
+        return
+    stats = admission.stats()
+    yield "agent_runs_active", "gauge", "Agent runs executing in this worker.", {}, stats["active"]
+    yield "agent_runs_queued", "gauge", "Agent runs waiting for a slot in this worker.", {}, stats["queued"]
+
+
+REGISTRY.add_collector(_github_samples)
+REGISTRY.add_collector(_tool_cache_samples)
+REGISTRY.add_collector(_llm_cache_samples)
+REGISTRY.add_collector(_shared_cache_samples)
+REGISTRY.add_collector(_admission_samples)
+
+
+@router.get("/metrics")
+def metrics():
+    """Prometheus text exposition of request, node, tool, LLM and GitHub metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,70 @@
+from importlib import import_module
+
+# (module, attribute) of every tool exposed to the agent. Modules are only
+# imported when `load_tools()` is called, so importing `app.tools` stays cheap.
+# Each module also defines `<attribute>_structured`, a StructuredTool with
+# typed arguments used by the native tool-calling agent.
+TOOL_SPECS = [
+    ("app.tools.search_github_repo", "search_github_repo"),
+    ("app.tools.github_describe_repo", "github_describe_repo"),
+    ("app.tools.github_issue_details", "github_issue_details"),
+    ("app.tools.github_pr_details", "github_pr_details"),
+    ("app.tools.list_top_issues", "list_top_issues"),
+    ("app.tools.list_top_prs", "list_top_prs"),
+    ("app.tools.search_local_issues", "search_local_issues"),
+    ("app.tools.github_pr_review", "github_review_pr"),
+    ("app.tools.github_issue_review", "github_issue_fixer"),
+]
+
+
+def _instrument(tool, mode: str):
+    """
+    Copy of `tool` whose calls are timed (and traced) as tool spans, and
+    whose results are rendered in output `mode` for the agent.
+    """
+    from langchain.tools import StructuredTool, Tool
+
+    from app.observability.metrics import TOOL_SECONDS
+    from app.observability.tracing import span
+    from app.tools.output import COMPACT, repeat_of, tool_call
+
+    def finish(result):
+        # A repeated call (same tool, same input) within the turn.
+        if mode == COMPACT and isinstance(result, str) and (earlier := repeat_of(result)):
+            return f"Same result as the earlier {earlier} call."
+        return result
+
+    def func(*args, **kwargs):
+        with span(tool.name, "tool", TOOL_SECONDS, {"tool": tool.name}), tool_call(tool.name, mode):
+            return finish(tool.func(*args, **kwargs))
+
+    async def coroutine(*args, **kwargs):
+        with span(tool.name, "tool", TOOL_SECONDS, {"tool": tool.name}), tool_call(tool.name, mode):
+            return finish(await tool.coroutine(*args, **kwargs))
+
+    if isinstance(tool, StructuredTool):
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=func,
+            coroutine=coroutine if tool.coroutine else None,
+        )
+    return Tool(
+        name=tool.name,
+        description=tool.description,
+        func=func,
+        coroutine=coroutine if tool.coroutine else None,
+    )
+
+
+def load_tools(structured: bool = False) -> list:
+    """
+    The agent's tools: single-string `Tool`s for ReAct, or their StructuredTool
+    variants, rendering results as TOOL_OUTPUT_MODE says (compact by default).
+    """
+    from app.tools.output import agent_output_mode
+
+    suffix = "_structured" if structured else ""
+    mode = agent_output_mode()
+    return [_instrument(getattr(import_module(module), name + suffix), mode) for module, name in TOOL_SPECS]
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Optional
+
+from app.observability.metrics import BATCH_ITEM_SECONDS
+from app.observability.tracing import span
+from app.tools.github_issue_details import ISSUE_URL_RE, _agithub_issue_details
+from app.tools.github_issue_review import _aload_issue, asuggest_fixes
+from app.tools.github_pr_details import PR_URL_RE, _agithub_pr_details
+from app.tools.github_pr_review import _areview_pr
+
+logger = logging.getLogger(__name__)
+
+ISSUE = "issue"
+PULL = "pull"
+
+# How the tools' results start when they report a failure (tools return
+# their errors as text, for the agent's LLM).
+TOOL_ERRORS = (
+    "Invalid format.", "Invalid PR URL", "Issue fetch failed", "PR fetch failed", "Failed to fetch ",
+    "Error retrieving ", "Error generating fix suggestions",
+)
+
+# Batch task -> the kinds of URL it applies to.
+BATCH_TASKS = {
+    "details": (ISSUE, PULL),
+    "review": (PULL,),
+    "fix": (ISSUE,),
+}
+
+
+def _status(result: str) -> str:
+    return "error" if result.startswith(TOOL_ERRORS) else "ok"
+
+
+def url_kind(url: str) -> Optional[str]:
+    if PR_URL_RE.match(url.strip()):
+        return PULL
+    if ISSUE_URL_RE.match(url.strip()):
+        return ISSUE
+    return None
+
+
+class FixBatcher:
+    """
+    Collects fetched issues from concurrent batch items and generates their fix
+    suggestions together: a batch is sent once `max_batch` issues are waiting
+    or `window` seconds after the first one arrived, whichever comes first.
+    """
+
+    def __init__(self, max_batch: int = 16, window: float = 0.05):
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: list[tuple[tuple, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def suggest(self, loaded: tuple) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((loaded, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(batch: list) -> None:
+        try:
+            results = await asuggest_fixes([loaded for loaded, _ in batch])
+        except Exception as e:
+            logger.error("Batch fix suggestions failed: %s", str(e), exc_info=True)
+            results = [f"Error generating fix suggestions: {e}"] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class BatchRunner:
+    """
+    Runs one task ("details", "review" or "fix") over many issue/PR URLs with
+    at most `concurrency` items in flight, sharing the process-wide GitHub
+    client, caches and LLM. `run` yields one result dict per URL as soon as it
+    finishes, so results arrive out of order; `index` refers to the input list.
+    """
+
+    def __init__(self, concurrency: int = 8, llm_batch_window: float = 0.05):
+        self.concurrency = concurrency
+        self.llm_batch_window = llm_batch_window
+
+    async def _item(self, task: str, url: str, fixes: FixBatcher) -> tuple[str, str]:
+        kind = url_kind(url)
+        if kind is None:
+            return "error", "Not a GitHub issue or pull request URL."
+        if kind not in BATCH_TASKS[task]:
+            return "error", f"Task '{task}' does not apply to {kind} URLs."
+        if task == "details":
+            result = await (_agithub_issue_details(url) if kind == ISSUE else _agithub_pr_details(url))
+        elif task == "review":
+            result = await _areview_pr(url)
+        else:
+            loaded = await _aload_issue(url)
+            if isinstance(loaded, str):
+                return "error", loaded
+            # Fix suggestions for concurrent items share LLM batch calls.
+            result = await fixes.suggest(loaded)
+        return _status(result), result
+
+    async def run(self, urls: list[str], task: str) -> AsyncIterator[dict]:
+        if task not in BATCH_TASKS:
+            raise ValueError(f"Unknown batch task {task!r}; use one of {', '.join(BATCH_TASKS)}")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Items hold their slot while waiting for the LLM, so at most
+        # `concurrency` suggestions are ever waiting: one full batch.
+        fixes = FixBatcher(self.concurrency, self.llm_batch_window)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker(index: int, url: str):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    with span("Batch", "tool", BATCH_ITEM_SECONDS, {"task": task}):
+                        status, result = await self._item(task, url, fixes)
+                except Exception as e:
+                    logger.error("Batch item %s failed: %s", url, str(e), exc_info=True)
+                    status, result = "error", str(e)
+            await results.put({
+                "index": index,
+                "url": url,
+                "task": task,
+                "status": status,
+                "result": result,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            })
+
+        workers = [asyncio.create_task(worker(i, url)) for i, url in enumerate(urls)]
+        try:
+            for _ in workers:
+                yield await results.get()
+        finally:
+            # The consumer went away (client disconnect): stop the remaining items.
+            for w in workers:
+                w.cancel()
+
+
+def batch_runner_from_env() -> BatchRunner:
+    return BatchRunner(concurrency=int(os.getenv("BATCH_CONCURRENCY", "8")))
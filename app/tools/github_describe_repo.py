@@ -1,55 +1,117 @@
-import requests
+import asyncio
 import re
 import base64
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
+
+from app.client.github_client import get_github_client
+from app.tools.github_graphql import afetch_repo_overview, fetch_repo_overview
+from app.tools.github_resources import ResourceKey, get_resource_cache, resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.schemas import RepoURLInput
+from app.tools.watched_repos import alocal_overview, local_overview
+
+TOOL_NAME = "DescribeGitHubRepo"
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
 
 def _extract_owner_repo(url: str):
     match = re.match(r"https?://github\.com/([^/]+)/([^/]+)(?:/|$)", url.strip())
     return match.groups() if match else (None, None)
 
-def _fetch_readme(owner: str, repo: str) -> str:
+def _readme_text(text) -> str:
+    if text is None:
+        return "README not available."
+    return text.strip() or "README is empty."
+
+def _decode_readme(res) -> str:
+    if res.status_code != 200:
+        return "README not available."
+    return _readme_text(base64.b64decode(res.json().get("content", "")).decode("utf-8", errors="ignore"))
+
+def _fetch_readme(key: ResourceKey) -> str:
     try:
-        res = requests.get(f"{GITHUB_API}/{owner}/{repo}/readme", headers=HEADERS, timeout=5)
-        if res.status_code != 200:
-            return "README not available."
-        content = base64.b64decode(res.json().get("content", "")).decode("utf-8", errors="ignore")
-        return content.strip()[:1000] or "README is empty."
+        return _decode_readme(get_resource_cache().get(TOOL_NAME, "repo", key, "/readme"))
+    except Exception:
+        return "Error retrieving README."
+
+async def _afetch_readme(key: ResourceKey) -> str:
+    try:
+        return _decode_readme(await get_resource_cache().aget(TOOL_NAME, "repo", key, "/readme"))
     except Exception:
         return "Error retrieving README."
 
+def _format_repo(data: dict, readme: str) -> str:
+    if output_mode() == COMPACT:
+        return compact(
+            f"repo {data.get('full_name', 'N/A')}",
+            {"description": data.get("description") or "none", "open issues": data.get("open_issues_count", 0)},
+            {"readme": readme},
+        )
+    return (
+        f"📦 Repo: {data.get('full_name', 'N/A')}\n"
+        f"📝 Description: {data.get('description') or 'No description'}\n"
+        f"🐛 Open Issues: {data.get('open_issues_count', 0)}\n"
+        f"📖 README Preview:\n{'-'*30}\n{readme[:1000]}"
+    )
+
 def _describe_repo(repo_url: str) -> str:
     owner, repo = _extract_owner_repo(repo_url)
     if not owner or not repo:
         return "Invalid GitHub URL. Format: https://github.com/owner/repo"
 
+    key = resource_key(owner, repo)
+    # Watched repos are served from the local store, without calling GitHub.
+    overview = local_overview(TOOL_NAME, key) or fetch_repo_overview(TOOL_NAME, key)
+    if overview is not None:
+        return _format_repo(overview["repo"], _readme_text(overview["readme"]))
+
     try:
-        res = requests.get(f"{GITHUB_API}/{owner}/{repo}", headers=HEADERS, timeout=5)
+        # Metadata and README are independent, fetch them concurrently.
+        res, readme = get_github_client().gather(
+            lambda: get_resource_cache().get(TOOL_NAME, "repo", key),
+            lambda: _fetch_readme(key),
+        )
         if res.status_code != 200:
             return f"Repo info fetch failed: {res.status_code}"
-        data = res.json()
-        readme = _fetch_readme(owner, repo)
-
-        return (
-            f"📦 Repo: {data.get('full_name', 'N/A')}\n"
-            f"📝 Description: {data.get('description') or 'No description'}\n"
-            f"🐛 Open Issues: {data.get('open_issues_count', 0)}\n"
-            f"📖 README Preview:\n{'-'*30}\n{readme}"
+        return _format_repo(res.json(), readme)
+    except Exception as e:
+        return f"Unexpected error: {str(e)}"
+
+async def _adescribe_repo(repo_url: str) -> str:
+    owner, repo = _extract_owner_repo(repo_url)
+    if not owner or not repo:
+        return "Invalid GitHub URL. Format: https://github.com/owner/repo"
+
+    key = resource_key(owner, repo)
+    overview = await alocal_overview(TOOL_NAME, key) or await afetch_repo_overview(TOOL_NAME, key)
+    if overview is not None:
+        return _format_repo(overview["repo"], _readme_text(overview["readme"]))
+
+    try:
+        res, readme = await asyncio.gather(
+            get_resource_cache().aget(TOOL_NAME, "repo", key),
+            _afetch_readme(key),
         )
+        if res.status_code != 200:
+            return f"Repo info fetch failed: {res.status_code}"
+        return _format_repo(res.json(), readme)
     except Exception as e:
         return f"Unexpected error: {str(e)}"
 
 github_describe_repo = Tool(
-    name="DescribeGitHubRepo",
+    name=TOOL_NAME,
     func=_describe_repo,
+    coroutine=_adescribe_repo,
     description="Summarize a GitHub repository from its URL. Includes metadata and README preview."
 )
 
+github_describe_repo_structured = StructuredTool.from_function(
+    func=_describe_repo,
+    coroutine=_adescribe_repo,
+    name=github_describe_repo.name,
+    description=github_describe_repo.description,
+    args_schema=RepoURLInput,
+)
+
 # Optional: CLI test
 if __name__ == "__main__":
     print(_describe_repo("https://github.com/openai/openai-python"))
@@ -0,0 +1,114 @@
+import logging
+import os
+from typing import Optional
+
+from app.client.github_client import GitHubResponse, get_github_client
+from app.tools.github_resources import ResourceKey, get_resource_cache
+
+logger = logging.getLogger(__name__)
+
+# Items fetched per list in the overview; the list tools show at most this many.
+OVERVIEW_LIMIT = 10
+# GraphQL has no "the README" lookup like REST's /readme, so try the usual names.
+README_NAMES = ["README.md", "README.rst", "README.txt", "README", "readme.md"]
+
+_README_FIELDS = "\n".join(
+    f'    readme{i}: object(expression: "HEAD:{name}") {{ ... on Blob {{ text }} }}'
+    for i, name in enumerate(README_NAMES)
+)
+
+REPO_OVERVIEW_QUERY = f"""
+query RepoOverview($owner: String!, $name: String!, $limit: Int!) {{
+  repository(owner: $owner, name: $name) {{
+    nameWithOwner
+    description
+    openIssues: issues(states: OPEN) {{ totalCount }}
+    openPRs: pullRequests(states: OPEN) {{ totalCount }}
+{_README_FIELDS}
+    topIssues: issues(states: OPEN, first: $limit, orderBy: {{field: COMMENTS, direction: DESC}}) {{
+      nodes {{ number title comments {{ totalCount }} }}
+    }}
+    topPRs: pullRequests(states: OPEN, first: $limit, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
+      nodes {{ number title author {{ login }} }}
+    }}
+  }}
+}}
+"""
+
+
+def graphql_enabled() -> bool:
+    """GITHUB_GRAPHQL=auto (default) uses GraphQL whenever a token is configured; off disables it."""
+    return os.getenv("GITHUB_GRAPHQL", "auto").lower() != "off" and get_github_client().has_token
+
+
+def _parse_overview(res: GitHubResponse) -> GitHubResponse:
+    """
+    Reshape the GraphQL result into the REST payloads the tools already format:
+    `{"repo": {...}, "readme": str | None, "issues": [...], "prs": [...]}`.
+    """
+    body = res.json() if isinstance(res.json(), dict) else {}
+    repo = (body.get("data") or {}).get("repository")
+    if res.status_code != 200 or not repo:
+        logger.info("GraphQL overview unavailable (%s): %s", res.status_code, body.get("errors"))
+        return GitHubResponse(res.status_code if res.status_code != 200 else 404, body, res.headers)
+
+    readme = next(
+        (blob["text"] for i in range(len(README_NAMES)) if (blob := repo.get(f"readme{i}")) and "text" in blob),
+        None,
+    )
+    overview = {
+        "repo": {
+            "full_name": repo["nameWithOwner"],
+            "description": repo.get("description"),
+            # REST's open_issues_count includes open pull requests.
+            "open_issues_count": repo["openIssues"]["totalCount"] + repo["openPRs"]["totalCount"],
+        },
+        "readme": readme,
+        "issues": [
+            {"number": n["number"], "title": n["title"], "comments": n["comments"]["totalCount"]}
+            for n in repo["topIssues"]["nodes"]
+        ],
+        "prs": [
+            {"number": n["number"], "title": n["title"], "user": {"login": (n.get("author") or {}).get("login", "ghost")}}
+            for n in repo["topPRs"]["nodes"]
+        ],
+    }
+    return GitHubResponse(200, overview, res.headers)
+
+
+def _variables(key: ResourceKey) -> dict:
+    return {"owner": key.owner, "name": key.repo, "limit": OVERVIEW_LIMIT}
+
+
+def fetch_repo_overview(tool: str, key: ResourceKey) -> Optional[dict]:
+    """
+    Repository metadata, README, top issues and open PRs in one GraphQL round-trip,
+    cached (as a listing) so DescribeGitHubRepo, ListTopIssues and ListTopPRs share it.
+    Returns None when GraphQL is disabled or fails; callers then use REST.
+    """
+    if not graphql_enabled():
+        return None
+    try:
+        res = get_resource_cache().get(
+            tool, "listing", key, "#overview",
+            fetch=lambda: _parse_overview(get_github_client().graphql(REPO_OVERVIEW_QUERY, _variables(key))),
+        )
+    except Exception as e:
+        logger.warning("GraphQL overview for %s failed, falling back to REST: %s", key, e)
+        return None
+    return res.json() if res.status_code == 200 else None
+
+
+async def afetch_repo_overview(tool: str, key: ResourceKey) -> Optional[dict]:
+    if not graphql_enabled():
+        return None
+
+    async def fetch():
+        return _parse_overview(await get_github_client().agraphql(REPO_OVERVIEW_QUERY, _variables(key)))
+
+    try:
+        res = await get_resource_cache().aget(tool, "listing", key, "#overview", fetch=fetch)
+    except Exception as e:
+        logger.warning("GraphQL overview for %s failed, falling back to REST: %s", key, e)
+        return None
+    return res.json() if res.status_code == 200 else None
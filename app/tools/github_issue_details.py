@@ -1,12 +1,36 @@
 import re
-import requests
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
+from app.tools.github_resources import get_resource_cache, resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.schemas import IssueURLInput
+
+TOOL_NAME = "GitHubIssueDetails"
+
+ISSUE_URL_RE = re.compile(r"https?://github\.com/([^/]+)/([^/#]+)(?:/issues/|#)(\d+)")
+INVALID_ISSUE_URL = "Invalid format. Use: https://github.com/owner/repo/issues/123 or https://github.com/owner/repo#123"
+
+
+def _login(data: dict):
+    return f"@{data['user']['login']}" if data.get("user") else None
+
+def _format_issue(res) -> str:
+    if res.status_code != 200:
+        return f"Issue fetch failed: {res.status_code}"
+
+    data = res.json()
+    if output_mode() == COMPACT:
+        return compact(
+            f"issue #{data.get('number')}: {data.get('title', 'No title')}",
+            {"state": data.get("state"), "author": _login(data), "comments": data.get("comments"),
+             "url": data.get("html_url")},
+            {"body": data.get("body") or "No description"},
+        )
+    return (
+        f"🪪 Issue #{data.get('number')}: {data.get('title', 'No title')}\n"
+        f"🔗 URL: {data.get('html_url')}\n"
+        f"📝 Description:\n{(data.get('body') or 'No description')[:1000]}"
+    )
 
 def _github_issue_details(issue_url: str) -> str:
     """
@@ -15,31 +39,42 @@ def _github_issue_details(issue_url: str) -> str:
     - https://github.com/owner/repo/issues/123
     - https://github.com/owner/repo#123
     """
-    match = re.match(r"https?://github\.com/([^/]+)/([^/#]+)(?:/issues/|#)(\d+)", issue_url.strip())
+    match = ISSUE_URL_RE.match(issue_url.strip())
     if not match:
-        return "Invalid format. Use: https://github.com/owner/repo/issues/123 or https://github.com/owner/repo#123"
+        return INVALID_ISSUE_URL
 
-    owner, repo, issue_number = match.groups()
+    key = resource_key(*match.groups())
     try:
-        res = requests.get(f"{GITHUB_API}/{owner}/{repo}/issues/{issue_number}", headers=HEADERS, timeout=5)
-        if res.status_code != 200:
-            return f"Issue fetch failed: {res.status_code}"
-
-        data = res.json()
-        return (
-            f"🪪 Issue #{data.get('number')}: {data.get('title', 'No title')}\n"
-            f"🔗 URL: {data.get('html_url')}\n"
-            f"📝 Description:\n{data.get('body', 'No description')[:1000]}"
-        )
+        return _format_issue(get_resource_cache().get(TOOL_NAME, "issue", key))
+    except Exception as e:
+        return f"Error retrieving issue: {str(e)}"
+
+async def _agithub_issue_details(issue_url: str) -> str:
+    match = ISSUE_URL_RE.match(issue_url.strip())
+    if not match:
+        return INVALID_ISSUE_URL
+
+    key = resource_key(*match.groups())
+    try:
+        return _format_issue(await get_resource_cache().aget(TOOL_NAME, "issue", key))
     except Exception as e:
         return f"Error retrieving issue: {str(e)}"
 
 github_issue_details = Tool(
-    name="GitHubIssueDetails",
+    name=TOOL_NAME,
     func=_github_issue_details,
+    coroutine=_agithub_issue_details,
     description="Fetch metadata and description of a GitHub issue from its URL."
 )
 
+github_issue_details_structured = StructuredTool.from_function(
+    func=_github_issue_details,
+    coroutine=_agithub_issue_details,
+    name=github_issue_details.name,
+    description=github_issue_details.description,
+    args_schema=IssueURLInput,
+)
+
 # Optional: CLI test
 if __name__ == "__main__":
-    print(_github_issue_details("https://github.com/openai/openai-python/issues/2544"))
\ No newline at end of file
+    print(_github_issue_details("https://github.com/openai/openai-python/issues/2544"))
@@ -1,19 +1,63 @@
+import asyncio
 import re
-import requests
 
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
 from langchain.schema import HumanMessage
 
-from app.client.openai_client import get_openai_llm
+from app.tools.github_resources import get_resource_cache, resource_key
+from app.client.cassette_llm import CassetteChatModel
+from app.observability.cassette import current_cassette
+from app.client.llm_cache import SQLiteLLMCache, get_llm_cache
+from app.client.openai_client import OPENAI_MODEL, get_openai_llm
+from app.tools.schemas import IssueURLInput
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
+# OpenAI-backed LLM, built on first use so importing this module needs
+# neither network access nor an API key. Its calls go into the cassette of a
+# recorded agent turn (and come from it in a replayed one).
+llm = None
 
-# initialize your OpenAI-backed LLM
-llm = get_openai_llm()
+def _get_llm():
+    global llm
+    if llm is None:
+        llm = CassetteChatModel(factory=get_openai_llm, model=OPENAI_MODEL)
+    return llm
+
+TOOL_NAME = "GitHubIssueFixer"
+# Part of the LLM cache key: bump whenever `_build_fix_prompt` changes.
+FIX_PROMPT_VERSION = "issue-fix@1"
+
+ISSUE_URL_RE = re.compile(r"https?://github\.com/([^/]+)/([^/#]+)(?:/issues/|#)(\d+)")
+INVALID_ISSUE_URL = (
+    "Invalid issue URL. "
+    "Use https://github.com/owner/repo/issues/123 or https://github.com/owner/repo#123"
+)
+
+def _build_fix_prompt(issue: dict) -> str:
+    title = issue.get("title", "<no title>")
+    body = (issue.get("body") or "").strip() or "<no description>"
+
+    return (f"""
+            You are an experienced software engineer. The following GitHub issue describes a bug or missing feature:
+            
+            Issue Title: {title}
+            
+            Issue Description:
+            {body}
+            
+            Please suggest 2–3 distinct ways to fix or address this issue. For each suggestion:
+            - Give a brief rationale.
+            - Provide a code snippet or pseudo-code if applicable.
+            """
+            .strip())
+
+def _fix_cache_key(issue: dict) -> str:
+    model = getattr(_get_llm(), "model_name", "unknown")
+    return SQLiteLLMCache.make_key(model, FIX_PROMPT_VERSION, issue.get("title") or "", issue.get("body") or "")
+
+def _llm_cache():
+    # Not in recorded or replayed turns: a cache hit would leave no reply in
+    # the cassette, and a replay must not write to the real cache.
+    return None if current_cassette() is not None else get_llm_cache()
 
 def _github_issue_fixer(issue_url: str) -> str:
     """
@@ -21,69 +65,116 @@ def _github_issue_fixer(issue_url: str) -> str:
     to propose 2–3 concrete ways to fix it (with code examples).
     """
     # 1. Validate & parse URL
-    match = re.match(
-        r"https?://github\.com/([^/]+)/([^/#]+)(?:/issues/|#)(\d+)",
-        issue_url.strip()
-    )
+    match = ISSUE_URL_RE.match(issue_url.strip())
     if not match:
-        return (
-            "Invalid issue URL. "
-            "Use https://github.com/owner/repo/issues/123 or https://github.com/owner/repo#123"
-        )
+        return INVALID_ISSUE_URL
 
-    owner, repo, issue_number = match.groups()
+    key = resource_key(*match.groups())
 
-    # 2. Fetch issue data from GitHub API
+    # 2. Fetch issue data (shared with GitHubIssueDetails through the resource cache)
     try:
-        res = requests.get(
-            f"{GITHUB_API}/{owner}/{repo}/issues/{issue_number}",
-            headers=HEADERS,
-            timeout=5
-        )
+        res = get_resource_cache().get(TOOL_NAME, "issue", key)
         if res.status_code != 200:
             return f"Failed to fetch issue: {res.status_code}"
         issue = res.json()
     except Exception as e:
         return f"Error retrieving issue: {e}"
 
-    title = issue.get("title", "<no title>")
-    body = issue.get("body", "").strip() or "<no description>"
+    # 3. Reuse the suggestions for this issue if its content hasn't changed
+    cache = _llm_cache()
+    cache_key = _fix_cache_key(issue)
+    cached = cache.lookup(cache_key, issue.get("updated_at")) if cache is not None else None
+    if cached is not None:
+        return cached
 
-    # 3. Build prompt for the LLM
-    prompt = (f"""
-            You are an experienced software engineer. The following GitHub issue describes a bug or missing feature:
-            
-            Issue Title: {title}
-            
-            Issue Description:
-            {body}
-            
-            Please suggest 2–3 distinct ways to fix or address this issue. For each suggestion:
-            - Give a brief rationale.
-            - Provide a code snippet or pseudo-code if applicable.
-            """
-            .strip())
+    # 4. Build prompt for the LLM
+    prompt = _build_fix_prompt(issue)
 
-    # 4. Invoke the LLM via invoke() instead of __call__()
+    # 5. Invoke the LLM via invoke() instead of __call__()
     try:
         messages = [HumanMessage(content=prompt)]
-        llm_result = llm.invoke(messages)
-        # extract the first generation's message
-        return llm_result.content
-        # return generation.message.content.strip()
+        llm_result = _get_llm().invoke(messages)
     except Exception as e:
         return f"Error generating fix suggestions: {e}"
+    # extract the first generation's message
+    suggestions = llm_result.content
+    if cache is not None:
+        cache.store(cache_key, str(key), suggestions, issue.get("updated_at"))
+    return suggestions
+
+async def _aload_issue(issue_url: str):
+    """`(key, issue)` for an issue URL, or an error message for the LLM."""
+    match = ISSUE_URL_RE.match(issue_url.strip())
+    if not match:
+        return INVALID_ISSUE_URL
 
-# 5. Wrap as a LangChain Tool
+    key = resource_key(*match.groups())
+
+    try:
+        res = await get_resource_cache().aget(TOOL_NAME, "issue", key)
+        if res.status_code != 200:
+            return f"Failed to fetch issue: {res.status_code}"
+        return key, res.json()
+    except Exception as e:
+        return f"Error retrieving issue: {e}"
+
+async def asuggest_fixes(issues: list) -> list[str]:
+    """
+    Fix suggestions for already fetched `(key, issue)` pairs, in order. Cached
+    suggestions are reused (except in cassette turns); the rest are generated
+    in one `llm.abatch` call.
+    """
+    cache = _llm_cache()
+    cache_keys = [_fix_cache_key(issue) for _, issue in issues]
+    if cache is None:
+        results = [None] * len(issues)
+    else:
+        results = list(await asyncio.gather(*(
+            cache.alookup(cache_key, issue.get("updated_at")) for cache_key, (_, issue) in zip(cache_keys, issues)
+        )))
+    misses = [i for i, result in enumerate(results) if result is None]
+    if not misses:
+        return results
+
+    replies = await _get_llm().abatch(
+        [[HumanMessage(content=_build_fix_prompt(issues[i][1]))] for i in misses],
+        return_exceptions=True,
+    )
+    for i, reply in zip(misses, replies):
+        if isinstance(reply, Exception):
+            results[i] = f"Error generating fix suggestions: {reply}"
+            continue
+        key, issue = issues[i]
+        results[i] = reply.content
+        if cache is not None:
+            await cache.astore(cache_keys[i], str(key), reply.content, issue.get("updated_at"))
+    return results
+
+async def _agithub_issue_fixer(issue_url: str) -> str:
+    loaded = await _aload_issue(issue_url)
+    if isinstance(loaded, str):
+        return loaded
+    return (await asuggest_fixes([loaded]))[0]
+
+# 6. Wrap as a LangChain Tool
 github_issue_fixer = Tool(
-    name="GitHubIssueFixer",
+    name=TOOL_NAME,
     func=_github_issue_fixer,
+    coroutine=_agithub_issue_fixer,
     description=(
         "Given a GitHub issue URL, fetch the issue details and suggest 2–3 concrete "
         "fixes or improvements, including rationale and optional code snippets."
     )
 )
 
+github_issue_fixer_structured = StructuredTool.from_function(
+    func=_github_issue_fixer,
+    coroutine=_agithub_issue_fixer,
+    name=github_issue_fixer.name,
+    description=github_issue_fixer.description,
+    args_schema=IssueURLInput,
+)
+
 # Optional CLI test
 if __name__ == "__main__":
     print(
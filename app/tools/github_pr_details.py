@@ -1,12 +1,36 @@
 import re
-import requests
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
+from app.tools.github_resources import get_resource_cache, resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.schemas import PullURLInput
+
+TOOL_NAME = "GitHubPRDetails"
+
+PR_URL_RE = re.compile(r"https?://github\.com/([^/]+)/([^/]+)/(?:pull|pulls)/(\d+)")
+INVALID_PR_URL = "Invalid PR URL format. Use: https://github.com/owner/repo/pull/123"
+
+
+def _login(data: dict):
+    return f"@{data['user']['login']}" if data.get("user") else None
+
+def _format_pr(res) -> str:
+    if res.status_code != 200:
+        return f"PR fetch failed: {res.status_code}"
+
+    data = res.json()
+    if output_mode() == COMPACT:
+        return compact(
+            f"PR #{data.get('number')}: {data.get('title', 'No title')}",
+            {"state": data.get("state"), "author": _login(data), "changed files": data.get("changed_files"),
+             "url": data.get("html_url")},
+            {"body": data.get("body") or "No description"},
+        )
+    return (
+        f"🔀 PR #{data.get('number')}: {data.get('title', 'No title')}\n"
+        f"🔗 URL: {data.get('html_url')}\n"
+        f"📝 Description:\n{(data.get('body') or 'No description')[:1000]}"
+    )
 
 def _github_pr_details(pr_url: str) -> str:
     """
@@ -15,31 +39,42 @@ def _github_pr_details(pr_url: str) -> str:
     - https://github.com/owner/repo/pull/123
     - https://github.com/owner/repo/pulls/123
     """
-    match = re.match(r"https?://github\.com/([^/]+)/([^/]+)/(?:pull|pulls)/(\d+)", pr_url.strip())
+    match = PR_URL_RE.match(pr_url.strip())
     if not match:
-        return "Invalid PR URL format. Use: https://github.com/owner/repo/pull/123"
+        return INVALID_PR_URL
 
-    owner, repo, pr_number = match.groups()
+    key = resource_key(*match.groups())
     try:
-        res = requests.get(f"{GITHUB_API}/{owner}/{repo}/pulls/{pr_number}", headers=HEADERS, timeout=5)
-        if res.status_code != 200:
-            return f"PR fetch failed: {res.status_code}"
-
-        data = res.json()
-        return (
-            f"🔀 PR #{data.get('number')}: {data.get('title', 'No title')}\n"
-            f"🔗 URL: {data.get('html_url')}\n"
-            f"📝 Description:\n{data.get('body', 'No description')[:1000]}"
-        )
+        return _format_pr(get_resource_cache().get(TOOL_NAME, "pull", key))
+    except Exception as e:
+        return f"Error retrieving PR: {str(e)}"
+
+async def _agithub_pr_details(pr_url: str) -> str:
+    match = PR_URL_RE.match(pr_url.strip())
+    if not match:
+        return INVALID_PR_URL
+
+    key = resource_key(*match.groups())
+    try:
+        return _format_pr(await get_resource_cache().aget(TOOL_NAME, "pull", key))
     except Exception as e:
         return f"Error retrieving PR: {str(e)}"
 
 github_pr_details = Tool(
-    name="GitHubPRDetails",
+    name=TOOL_NAME,
     func=_github_pr_details,
+    coroutine=_agithub_pr_details,
     description="Fetch metadata and description of a GitHub Pull Request from its URL."
 )
 
+github_pr_details_structured = StructuredTool.from_function(
+    func=_github_pr_details,
+    coroutine=_agithub_pr_details,
+    name=github_pr_details.name,
+    description=github_pr_details.description,
+    args_schema=PullURLInput,
+)
+
 # Optional: CLI test
 if __name__ == "__main__":
-    print(_github_pr_details("https://github.com/openai/openai-python/pull/2543"))
\ No newline at end of file
+    print(_github_pr_details("https://github.com/openai/openai-python/pull/2543"))
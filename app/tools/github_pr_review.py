@@ -1,48 +1,49 @@
+import asyncio
+import os
 import re
-import requests
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
-TIMEOUT = 5
+from app.agent.budget import BudgetExceeded
+from app.client.github_client import MAX_PER_PAGE, GitHubResponse, get_github_client, parse_last_page
+from app.client.rate_limit import RateLimitExceeded
+from app.tools.github_resources import get_resource_cache, resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.pr_files import PRFilesSummary
+from app.tools.schemas import PullURLInput
+
+TOOL_NAME = "GitHubPRReview"
 
 PR_URL_RE = re.compile(
     r"https?://github\.com/([^/]+)/([^/]+)/(?:pull|pulls)/(\d+)"
 )
 ISSUE_REF_RE = re.compile(r"#(\d+)")
+# The rich checklist in one line: the model knows what each point means.
+COMPACT_CHECKLIST = "focus, naming/style, edge cases, tests, docs, performance/security, CI"
+# Largest files and directories listed in compact reviews.
+COMPACT_TOP = 3
 
-def _review_pr(pr_url: str) -> str:
-    """
-    Summarize a PR and emit a lightweight review checklist.
-    Input: https://github.com/owner/repo/pull/123
-    """
-    m = PR_URL_RE.match(pr_url.strip())
-    if not m:
-        return "Invalid PR URL. Use: https://github.com/owner/repo/pull/123"
-
-    owner, repo, pr_number = m.groups()
-
-    # 1. Fetch PR metadata
-    meta_res = requests.get(
-        f"{GITHUB_API}/{owner}/{repo}/pulls/{pr_number}",
-        headers=HEADERS, timeout=TIMEOUT
-    )
-    if meta_res.status_code != 200:
-        return f"Failed to fetch PR: {meta_res.status_code}"
-    pr = meta_res.json()
-
-    # 2. Fetch list of changed files
-    files_res = requests.get(
-        f"{GITHUB_API}/{owner}/{repo}/pulls/{pr_number}/files",
-        headers=HEADERS, timeout=TIMEOUT
+def _render_compact_review(pr: dict, summary: PRFilesSummary, linked_str: str) -> str:
+    items = ["top files: " + ", ".join(
+        f"{name} (+{adds}/-{dels})" for name, adds, dels in summary.top_files()[:COMPACT_TOP]
+    )]
+    items.append("directories: " + ", ".join(
+        f"{directory}/ {count} (+{adds}/-{dels})"
+        for directory, count, adds, dels in summary.top_directories(COMPACT_TOP)
+    ))
+    if patches := summary.patches():
+        items.append("largest hunks:\n```diff\n" + "".join(
+            f"--- {name}\n{patch.rstrip()}\n" for name, patch in patches
+        ) + "```")
+    items.append(f"review for: linked issues, {COMPACT_CHECKLIST}")
+    return compact(
+        f"PR #{pr['number']}: {pr.get('title', '<no title>')}",
+        {"author": f"@{pr['user']['login']}", "url": pr["html_url"], "linked issues": linked_str,
+         "files changed": f"{summary.files} (+{summary.additions}/-{summary.deletions})"},
+        {"description": pr.get("body") or "<no description>"},
+        items=items,
     )
-    if files_res.status_code != 200:
-        return f"Failed to fetch PR files: {files_res.status_code}"
-    files = files_res.json()
 
+def _render_review(pr: dict, summary: PRFilesSummary) -> str:
     # 3. Extract linked issues from PR body
     body = pr.get("body") or ""
     linked_issues = sorted(set(ISSUE_REF_RE.findall(body)))
@@ -50,19 +51,25 @@ def _review_pr(pr_url: str) -> str:
         ", ".join(f"#{num}" for num in linked_issues)
         if linked_issues else "None"
     )
+    if output_mode() == COMPACT:
+        return _render_compact_review(pr, summary, linked_str)
 
-    # 4. Summarize changes
-    total_adds = sum(f.get("additions", 0) for f in files)
-    total_dels = sum(f.get("deletions", 0) for f in files)
-    file_count = len(files)
-
-    top_files = files[:5]
+    # 4. Summarize changes, largest first
+    file_count = summary.files
     files_summary = "\n".join(
-        f"  • {f['filename']} (+{f['additions']}/−{f['deletions']})"
-        for f in top_files
+        f"  • {name} (+{adds}/−{dels})"
+        for name, adds, dels in summary.top_files()
+    )
+    if file_count > summary.top_n:
+        files_summary += f"\n  • ...and {file_count - summary.top_n} more files."
+    dirs_summary = "\n".join(
+        f"  • {directory}/ {count} files (+{adds}/−{dels})"
+        for directory, count, adds, dels in summary.top_directories()
+    )
+    patches = summary.patches()
+    patches_str = "".join(
+        f"--- {name}\n{patch.rstrip()}\n" for name, patch in patches
     )
-    if file_count > 5:
-        files_summary += f"\n  • ...and {file_count - 5} more files."
 
     # 5. Build review checklist
     checklist = [
@@ -86,21 +93,141 @@ def _review_pr(pr_url: str) -> str:
         f"🔗 URL: {pr['html_url']}\n\n"
         f"📝 Description:\n{body.strip()[:300] or '<no description>'}\n\n"
         f"📎 Linked issues: {linked_str}\n"
-        f"🗂️ Files changed: {file_count}   (+{total_adds}/−{total_dels})\n"
+        f"🗂️ Files changed: {file_count}   (+{summary.additions}/−{summary.deletions})\n"
         f"{files_summary}\n\n"
-        f"🛠️ Review Checklist\n"
+        f"📁 Directories:\n"
+        f"{dirs_summary}\n\n"
+        + (f"🧩 Largest hunks:\n```diff\n{patches_str}```\n\n" if patches else "")
+        + f"🛠️ Review Checklist\n"
         f"{checklist_str}"
     )
 
+def _files_page(page: int) -> dict:
+    return {"per_page": MAX_PER_PAGE, "page": page}
+
+def _files_path(key) -> str:
+    return f"/repos/{key.owner}/{key.repo}/pulls/{key.number}/files"
+
+def _summary_params() -> dict:
+    return {"patch_budget": int(os.getenv("PR_PATCH_BUDGET", "0"))}
+
+def _page_windows(last_page: int):
+    # Pages 2..last, a few at a time: only one window of pages is held in memory.
+    window = max(1, int(os.getenv("PR_FILES_WINDOW", "8")))
+    for start in range(2, last_page + 1, window):
+        yield range(start, min(start + window, last_page + 1))
+
+def _summarize_files(github, key) -> GitHubResponse:
+    """
+    Stream every page of the PR's changed files into a PRFilesSummary. Pages
+    bypass the client cache: only the summary, returned as the response data,
+    is kept (by the resource cache). A failed page is returned as is.
+    """
+    path = _files_path(key)
+    res = github.get(path, params=_files_page(1), use_cache=False)
+    if res.status_code != 200:
+        return res
+    summary = PRFilesSummary(**_summary_params())
+    summary.add(res.json())
+    for pages in _page_windows(parse_last_page(res.headers.get("Link"))):
+        for page_res in github.gather(*(
+            lambda page=page: github.get(path, params=_files_page(page), use_cache=False)
+            for page in pages
+        )):
+            if page_res.status_code != 200:
+                return page_res
+            summary.add(page_res.json())
+    return GitHubResponse(200, summary.dump())
+
+async def _asummarize_files(github, key) -> GitHubResponse:
+    path = _files_path(key)
+    res = await github.aget(path, params=_files_page(1), use_cache=False)
+    if res.status_code != 200:
+        return res
+    summary = PRFilesSummary(**_summary_params())
+    summary.add(res.json())
+    for pages in _page_windows(parse_last_page(res.headers.get("Link"))):
+        for page_res in await asyncio.gather(*(
+            github.aget(path, params=_files_page(page), use_cache=False)
+            for page in pages
+        )):
+            if page_res.status_code != 200:
+                return page_res
+            summary.add(page_res.json())
+    return GitHubResponse(200, summary.dump())
+
+def _review_pr(pr_url: str) -> str:
+    """
+    Summarize a PR and emit a lightweight review checklist.
+    Input: https://github.com/owner/repo/pull/123
+    """
+    m = PR_URL_RE.match(pr_url.strip())
+    if not m:
+        return "Invalid PR URL. Use: https://github.com/owner/repo/pull/123"
+
+    key = resource_key(*m.groups())
+    resources = get_resource_cache()
+
+    try:
+        # 1. Fetch PR metadata and the summary of its changed files concurrently;
+        # the summary goes first, so it gathers its pages from this thread
+        github = get_github_client()
+        files_res, meta_res = github.gather(
+            lambda: resources.get(TOOL_NAME, "pull", key, "/files", params=_summary_params(),
+                                  fetch=lambda: _summarize_files(github, key)),
+            lambda: resources.get(TOOL_NAME, "pull", key),
+        )
+        if meta_res.status_code != 200:
+            return f"Failed to fetch PR: {meta_res.status_code}"
+        if files_res.status_code != 200:
+            return f"Failed to fetch PR files: {files_res.status_code}"
+    except (RateLimitExceeded, BudgetExceeded) as e:
+        return f"Failed to fetch PR: {e}"
+
+    return _render_review(meta_res.json(), PRFilesSummary.load(files_res.json()))
+
+async def _areview_pr(pr_url: str) -> str:
+    m = PR_URL_RE.match(pr_url.strip())
+    if not m:
+        return "Invalid PR URL. Use: https://github.com/owner/repo/pull/123"
+
+    key = resource_key(*m.groups())
+    resources = get_resource_cache()
+
+    try:
+        github = get_github_client()
+        meta_res, files_res = await asyncio.gather(
+            resources.aget(TOOL_NAME, "pull", key),
+            resources.aget(TOOL_NAME, "pull", key, "/files", params=_summary_params(),
+                           fetch=lambda: _asummarize_files(github, key)),
+        )
+        if meta_res.status_code != 200:
+            return f"Failed to fetch PR: {meta_res.status_code}"
+        if files_res.status_code != 200:
+            return f"Failed to fetch PR files: {files_res.status_code}"
+    except (RateLimitExceeded, BudgetExceeded) as e:
+        return f"Failed to fetch PR: {e}"
+
+    return _render_review(meta_res.json(), PRFilesSummary.load(files_res.json()))
+
 github_review_pr = Tool(
-    name="GitHubPRReview",
+    name=TOOL_NAME,
     func=_review_pr,
+    coroutine=_areview_pr,
     description=(
         "Fetches a GitHub PR, summarizes its intent and code changes, "
         "and emits a basic review checklist."
     )
 )
 
+github_review_pr_structured = StructuredTool.from_function(
+    func=_review_pr,
+    coroutine=_areview_pr,
+    name=github_review_pr.name,
+    description=github_review_pr.description,
+    args_schema=PullURLInput,
+)
+
 # Optional CLI test
 if __name__ == "__main__":
     url = "https://github.com/openai/openai-python/pull/2543"
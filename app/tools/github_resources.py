@@ -0,0 +1,149 @@
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from app.client.cache import LRUTTLCache
+from app.client.github_client import GitHubResponse, get_github_client
+from app.client.shared_cache import tiered
+from app.observability.cassette import current_cassette
+
+logger = logging.getLogger(__name__)
+
+# Seconds a parsed resource is reused before it is fetched again (and, past
+# the client's own TTL, revalidated with an ETag). Repository metadata and
+# READMEs change far less often than issues, PRs and listings.
+RESOURCE_TTLS = {
+    "repo": 300.0,
+    "issue": 120.0,
+    "pull": 120.0,
+    "listing": 60.0,
+}
+
+_REPO_SUFFIX_RE = re.compile(r"(\.git)?[?#].*$|\.git$")
+
+
+class ResourceKey(NamedTuple):
+    """Canonical identity of a GitHub resource, independent of how its URL was written."""
+    owner: str
+    repo: str
+    number: Optional[int] = None
+
+    def __str__(self) -> str:
+        name = f"{self.owner}/{self.repo}"
+        return name if self.number is None else f"{name}#{self.number}"
+
+
+def resource_key(owner: str, repo: str, number=None) -> ResourceKey:
+    """
+    Normalize URL components: GitHub names are case-insensitive, and agent
+    inputs often carry a `.git` suffix, a query string or a fragment.
+    """
+    repo = _REPO_SUFFIX_RE.sub("", repo.strip())
+    return ResourceKey(owner.strip().lower(), repo.lower(), int(number) if number is not None else None)
+
+
+def _api_path(kind: str, key: ResourceKey, suffix: str) -> str:
+    base = f"/repos/{key.owner}/{key.repo}"
+    if kind == "issue":
+        base += f"/issues/{key.number}"
+    elif kind == "pull":
+        base += f"/pulls/{key.number}"
+    return base + suffix
+
+
+class ResourceCache:
+    """
+    Memoizes parsed GitHub responses for the tools, shared by every session.
+
+    Entries are keyed by the canonical ResourceKey rather than the raw URL, so
+    `Owner/Repo#7`, `owner/repo/issues/7` and `owner/repo.git/issues/7` all hit
+    the same entry, and a fresh hit does no network I/O at all. Each resource
+    type has its own LRU+TTL cache, backed by the node's shared tier when
+    SHARED_CACHE_PATH is set. Only successful (200) responses are kept.
+    Hits and misses are counted per tool.
+    """
+
+    def __init__(self, maxsize: int = 256, ttls: Optional[dict] = None):
+        ttls = {**RESOURCE_TTLS, **(ttls or {})}
+        self.caches = {
+            kind: tiered(LRUTTLCache(maxsize=maxsize, ttl=ttl), f"resource:{kind}", GitHubResponse.dump, GitHubResponse.load)
+            for kind, ttl in ttls.items()
+        }
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._stats_lock = threading.Lock()
+
+    def _count(self, tool: str, name: str) -> None:
+        with self._stats_lock:
+            self._stats[tool][name] += 1
+
+    def _lookup(self, tool: str, kind: str, key: ResourceKey, suffix: str, params: Optional[dict]):
+        cache_key = (key, suffix, tuple(sorted((params or {}).items())))
+        # Cassette turns go to the client: a hit here would leave no response
+        # in a recorded cassette, and replayed data must not be cached.
+        if current_cassette() is not None:
+            return None, None
+        cached = self.caches[kind].get(cache_key)
+        self._count(tool, "hits" if cached is not None else "misses")
+        if cached is not None:
+            logger.debug("%s served %s%s from the resource cache", tool, key, suffix)
+        return cache_key, cached
+
+    def _store(self, kind: str, cache_key: Optional[tuple], res: GitHubResponse) -> GitHubResponse:
+        if cache_key is not None and res.status_code == 200:
+            self.caches[kind].set(cache_key, res)
+        return res
+
+    def get(self, tool: str, kind: str, key: ResourceKey, suffix: str = "",
+            params: Optional[dict] = None,
+            fetch: Optional[Callable[[], GitHubResponse]] = None) -> GitHubResponse:
+        """
+        Cached REST GET of `suffix` under the resource. `fetch` replaces the
+        REST call for parts assembled some other way (e.g. a GraphQL query).
+        """
+        cache_key, cached = self._lookup(tool, kind, key, suffix, params)
+        if cached is not None:
+            return cached
+        if fetch is not None:
+            res = fetch()
+        else:
+            res = get_github_client().get(_api_path(kind, key, suffix), params=params)
+        return self._store(kind, cache_key, res)
+
+    async def aget(self, tool: str, kind: str, key: ResourceKey, suffix: str = "",
+                   params: Optional[dict] = None,
+                   fetch: Optional[Callable[[], Awaitable[GitHubResponse]]] = None) -> GitHubResponse:
+        cache_key, cached = self._lookup(tool, kind, key, suffix, params)
+        if cached is not None:
+            return cached
+        if fetch is not None:
+            res = await fetch()
+        else:
+            res = await get_github_client().aget(_api_path(kind, key, suffix), params=params)
+        return self._store(kind, cache_key, res)
+
+    def clear(self) -> None:
+        for cache in self.caches.values():
+            cache.clear()
+
+    def stats(self) -> dict:
+        """Per-tool hits, misses and hit rate."""
+        with self._stats_lock:
+            stats = {tool: dict(counts) for tool, counts in self._stats.items()}
+        for counts in stats.values():
+            total = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = counts["hits"] / total if total else 0.0
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_resource_cache() -> ResourceCache:
+    # TOOL_CACHE_TTL overrides every per-type TTL (0 disables memoization).
+    ttl = os.getenv("TOOL_CACHE_TTL")
+    return ResourceCache(
+        maxsize=int(os.getenv("TOOL_CACHE_SIZE", "256")),
+        ttls={kind: float(ttl) for kind in RESOURCE_TTLS} if ttl else None,
+    )
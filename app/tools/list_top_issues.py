@@ -1,51 +1,100 @@
 import re
-import requests
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
+
+from app.client.github_client import MAX_PER_PAGE
+from app.tools.github_graphql import OVERVIEW_LIMIT, afetch_repo_overview, fetch_repo_overview
+from app.tools.github_resources import get_resource_cache, resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.schemas import TopItemsInput
+from app.tools.watched_repos import alocal_overview, local_overview
+
+TOOL_NAME = "ListTopIssues"
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
 
 def _extract_owner_repo(url: str):
     match = re.match(r"https?://github\.com/([^/]+)/([^/]+)(?:/|$)", url.strip())
     return match.groups() if match else (None, None)
 
+def _issue_params() -> dict:
+    # The issues endpoint also returns pull requests; ask for a full page so
+    # there are still `limit` issues left after dropping them.
+    return {
+        "state": "open",
+        "per_page": MAX_PER_PAGE,
+        "sort": "comments",
+        "direction": "desc"
+    }
+
+def _format_issues(res, owner: str, repo: str, limit: int) -> str:
+    if res.status_code != 200:
+        return f"Issue fetch failed: {res.status_code}"
+    return _render_issues([i for i in res.json() if "pull_request" not in i][:limit], owner, repo)
+
+def _render_issues(issues: list, owner: str, repo: str) -> str:
+    if not issues:
+        return "No open issues found."
+
+    if output_mode() == COMPACT:
+        return compact(
+            f"top {len(issues)} open issues in {owner}/{repo} (by comments):",
+            items=(f"#{issue['number']} {issue['title']} ({issue['comments']})" for issue in issues),
+        )
+    lines = [f"🔥 Top {len(issues)} Open Issues in {owner}/{repo}:"]
+    for idx, issue in enumerate(issues, 1):
+        lines.append(f"{idx}. #{issue['number']} - {issue['title']} ({issue['comments']} comments)")
+    return "\n".join(lines)
+
 def _list_top_issues(repo_url: str, limit: int = 10) -> str:
     owner, repo = _extract_owner_repo(repo_url)
     if not owner or not repo:
         return "Invalid GitHub repo URL. Format: https://github.com/owner/repo"
 
+    key = resource_key(owner, repo)
+    overview = local_overview(TOOL_NAME, key, limit) or (
+        fetch_repo_overview(TOOL_NAME, key) if limit <= OVERVIEW_LIMIT else None
+    )
+    if overview is not None:
+        return _render_issues(overview["issues"][:limit], owner, repo)
+
     try:
-        params = {
-            "state": "open",
-            "per_page": limit,
-            "sort": "comments",
-            "direction": "desc"
-        }
-        res = requests.get(f"{GITHUB_API}/{owner}/{repo}/issues", headers=HEADERS, params=params, timeout=5)
-        if res.status_code != 200:
-            return f"Issue fetch failed: {res.status_code}"
-
-        issues = [i for i in res.json() if "pull_request" not in i]
-        if not issues:
-            return "No open issues found."
-
-        lines = [f"🔥 Top {len(issues)} Open Issues in {owner}/{repo}:"]
-        for idx, issue in enumerate(issues, 1):
-            lines.append(f"{idx}. #{issue['number']} - {issue['title']} ({issue['comments']} comments)")
-        return "\n".join(lines)
+        res = get_resource_cache().get(TOOL_NAME, "listing", key, "/issues", params=_issue_params())
+        return _format_issues(res, owner, repo, limit)
+    except Exception as e:
+        return f"Error retrieving issues: {str(e)}"
 
+async def _alist_top_issues(repo_url: str, limit: int = 10) -> str:
+    owner, repo = _extract_owner_repo(repo_url)
+    if not owner or not repo:
+        return "Invalid GitHub repo URL. Format: https://github.com/owner/repo"
+
+    key = resource_key(owner, repo)
+    overview = await alocal_overview(TOOL_NAME, key, limit) or (
+        await afetch_repo_overview(TOOL_NAME, key) if limit <= OVERVIEW_LIMIT else None
+    )
+    if overview is not None:
+        return _render_issues(overview["issues"][:limit], owner, repo)
+
+    try:
+        res = await get_resource_cache().aget(TOOL_NAME, "listing", key, "/issues", params=_issue_params())
+        return _format_issues(res, owner, repo, limit)
     except Exception as e:
         return f"Error retrieving issues: {str(e)}"
 
 list_top_issues = Tool(
-    name="ListTopIssues",
+    name=TOOL_NAME,
     func=lambda url: _list_top_issues(url, limit=10),
+    coroutine=lambda url: _alist_top_issues(url, limit=10),
     description="List top 10 open issues in a GitHub repo, sorted by comment count."
 )
 
+list_top_issues_structured = StructuredTool.from_function(
+    func=_list_top_issues,
+    coroutine=_alist_top_issues,
+    name=list_top_issues.name,
+    description="List the top open issues in a GitHub repo (default 10), sorted by comment count.",
+    args_schema=TopItemsInput,
+)
+
 # Optional: CLI test
 if __name__ == "__main__":
     print(_list_top_issues("https://github.com/openai/openai-python"))
@@ -1,51 +1,97 @@
 import re
-import requests
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
+
+from app.tools.github_graphql import OVERVIEW_LIMIT, afetch_repo_overview, fetch_repo_overview
+from app.tools.github_resources import get_resource_cache, resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.schemas import TopItemsInput
+from app.tools.watched_repos import alocal_overview, local_overview
+
+TOOL_NAME = "ListTopPRs"
 
-GITHUB_API = "https://api.github.com/repos"
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "langchain-agent"
-}
 
 def _extract_owner_repo(url: str):
     match = re.match(r"https?://github\.com/([^/]+)/([^/]+)(?:/|$)", url.strip())
     return match.groups() if match else (None, None)
 
+def _pr_params(limit: int) -> dict:
+    return {
+        "state": "open",
+        "per_page": limit,
+        "sort": "created",  # GitHub API doesn't support 'popularity' sort
+        "direction": "desc"
+    }
+
+def _format_prs(res, owner: str, repo: str) -> str:
+    if res.status_code != 200:
+        return f"PR fetch failed: {res.status_code}"
+    return _render_prs(res.json(), owner, repo)
+
+def _render_prs(prs: list, owner: str, repo: str) -> str:
+    if not prs:
+        return "No open pull requests found."
+
+    if output_mode() == COMPACT:
+        return compact(
+            f"top {len(prs)} open PRs in {owner}/{repo} (newest first):",
+            items=(f"#{pr['number']} {pr['title']} (@{pr['user']['login']})" for pr in prs),
+        )
+    lines = [f"🚀 Top {len(prs)} Open PRs in {owner}/{repo}:"]
+    for idx, pr in enumerate(prs, 1):
+        lines.append(f"{idx}. #{pr['number']} - {pr['title']} (by @{pr['user']['login']})")
+    return "\n".join(lines)
+
 def _list_top_prs(repo_url: str, limit: int = 10) -> str:
     owner, repo = _extract_owner_repo(repo_url)
     if not owner or not repo:
         return "Invalid GitHub repo URL. Format: https://github.com/owner/repo"
 
+    key = resource_key(owner, repo)
+    overview = local_overview(TOOL_NAME, key, limit) or (
+        fetch_repo_overview(TOOL_NAME, key) if limit <= OVERVIEW_LIMIT else None
+    )
+    if overview is not None:
+        return _render_prs(overview["prs"][:limit], owner, repo)
+
     try:
-        params = {
-            "state": "open",
-            "per_page": limit,
-            "sort": "created",  # GitHub API doesn't support 'popularity' sort
-            "direction": "desc"
-        }
-        res = requests.get(f"{GITHUB_API}/{owner}/{repo}/pulls", headers=HEADERS, params=params, timeout=5)
-        if res.status_code != 200:
-            return f"PR fetch failed: {res.status_code}"
-
-        prs = res.json()
-        if not prs:
-            return "No open pull requests found."
-
-        lines = [f"🚀 Top {len(prs)} Open PRs in {owner}/{repo}:"]
-        for idx, pr in enumerate(prs, 1):
-            lines.append(f"{idx}. #{pr['number']} - {pr['title']} (by @{pr['user']['login']})")
-        return "\n".join(lines)
+        res = get_resource_cache().get(TOOL_NAME, "listing", key, "/pulls", params=_pr_params(limit))
+        return _format_prs(res, owner, repo)
+    except Exception as e:
+        return f"Error retrieving PRs: {str(e)}"
 
+async def _alist_top_prs(repo_url: str, limit: int = 10) -> str:
+    owner, repo = _extract_owner_repo(repo_url)
+    if not owner or not repo:
+        return "Invalid GitHub repo URL. Format: https://github.com/owner/repo"
+
+    key = resource_key(owner, repo)
+    overview = await alocal_overview(TOOL_NAME, key, limit) or (
+        await afetch_repo_overview(TOOL_NAME, key) if limit <= OVERVIEW_LIMIT else None
+    )
+    if overview is not None:
+        return _render_prs(overview["prs"][:limit], owner, repo)
+
+    try:
+        res = await get_resource_cache().aget(TOOL_NAME, "listing", key, "/pulls", params=_pr_params(limit))
+        return _format_prs(res, owner, repo)
     except Exception as e:
         return f"Error retrieving PRs: {str(e)}"
 
 list_top_prs = Tool(
-    name="ListTopPRs",
+    name=TOOL_NAME,
     func=lambda url: _list_top_prs(url, limit=10),
+    coroutine=lambda url: _alist_top_prs(url, limit=10),
     description="List top 10 open pull requests in a GitHub repo."
 )
 
+list_top_prs_structured = StructuredTool.from_function(
+    func=_list_top_prs,
+    coroutine=_alist_top_prs,
+    name=list_top_prs.name,
+    description="List the most recent open pull requests in a GitHub repo (default 10).",
+    args_schema=TopItemsInput,
+)
+
 # Optional: CLI test
 if __name__ == "__main__":
     print(_list_top_prs("https://github.com/openai/openai-python"))
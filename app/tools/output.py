@@ -0,0 +1,205 @@
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+# How tools render their results. RICH (emoji headers, previews, checklists)
+# is for people: batch results, CLI tests. COMPACT is what the agent's LLM
+# reads: every observation is re-sent on each later ReAct step, so it is
+# plain `key: value` lines with long text cut to a token budget.
+RICH = "rich"
+COMPACT = "compact"
+
+# Budgets are counted in characters, roughly four per token: close enough to
+# size a result without running the tokenizer on every tool call.
+CHARS_PER_TOKEN = 4
+# Longest kept prose paragraph and code block in shortened text.
+PARAGRAPH_CHARS = 200
+CODE_LINES = 12
+# Shorter text is cheaper to repeat than to point back to.
+DEDUP_MIN_CHARS = 200
+
+_mode: ContextVar[str] = ContextVar("tool_output_mode", default=RICH)
+_tool: ContextVar[Optional[str]] = ContextVar("tool_output_tool", default=None)
+# Digest of text already returned in this agent turn -> tool that returned it.
+_seen: ContextVar[Optional[dict]] = ContextVar("tool_output_seen", default=None)
+
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_BADGES_RE = re.compile(r"^\s*(?:\[?!\[[^\]]*\]\([^)]*\)(?:\]\([^)]*\))?\s*)+$")
+_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+
+
+def agent_output_mode() -> str:
+    """TOOL_OUTPUT_MODE: how tools render results for the agent, "compact" (default) or "rich"."""
+    mode = os.getenv("TOOL_OUTPUT_MODE", COMPACT).lower()
+    if mode not in (COMPACT, RICH):
+        raise ValueError(f"Unknown TOOL_OUTPUT_MODE {mode!r}; use {COMPACT!r} or {RICH!r}")
+    return mode
+
+
+def output_mode() -> str:
+    return _mode.get()
+
+
+def budget_chars() -> int:
+    """Characters one compact tool result may use (TOOL_OUTPUT_TOKENS, default 150 tokens)."""
+    return int(os.getenv("TOOL_OUTPUT_TOKENS", "150")) * CHARS_PER_TOKEN
+
+
+def _reset(var: ContextVar, token) -> None:
+    try:
+        var.reset(token)
+    except ValueError:
+        # Tool coroutines may finish in another context (cancelled turns).
+        pass
+
+
+@contextmanager
+def tool_call(tool: str, mode: str):
+    """Render the results of one call of `tool` in `mode`."""
+    mode_token, tool_token = _mode.set(mode), _tool.set(tool)
+    try:
+        yield
+    finally:
+        _reset(_mode, mode_token)
+        _reset(_tool, tool_token)
+
+
+@contextmanager
+def output_scope():
+    """
+    One agent turn: compact results point back to earlier results of the
+    turn instead of repeating them (the same issue body from two tools, a
+    repeated call).
+    """
+    token = _seen.set({})
+    try:
+        yield
+    finally:
+        _reset(_seen, token)
+
+
+def repeat_of(text: str) -> Optional[str]:
+    """The tool that already returned `text` this turn, or None (and remember it)."""
+    seen = _seen.get()
+    if seen is None or len(text) < DEDUP_MIN_CHARS:
+        return None
+    digest = hashlib.blake2b(text.encode("utf-8", errors="ignore"), digest_size=16).digest()
+    earlier = seen.get(digest)
+    if earlier is None:
+        seen[digest] = _tool.get() or "tool"
+    return earlier
+
+
+# -- smart truncation --------------------------------------------------------
+
+def _blocks(text: str) -> list[tuple[str, str]]:
+    """Markdown split into ("heading" | "code" | "text", block), comments and badges dropped."""
+    blocks, lines, code = [], [], None
+
+    def flush():
+        prose = _TAG_RE.sub("", "\n".join(lines)).strip()
+        if prose:
+            blocks.append(("text", prose))
+        lines.clear()
+
+    for line in _COMMENT_RE.sub("", text.replace("\r\n", "\n")).split("\n"):
+        line = line.rstrip()
+        if code is not None:
+            code.append(line)
+            if _FENCE_RE.match(line):
+                blocks.append(("code", "\n".join(code)))
+                code = None
+        elif _FENCE_RE.match(line):
+            flush()
+            code = [line]
+        elif _HEADING_RE.match(line):
+            flush()
+            blocks.append(("heading", line))
+        elif not line.strip() or _BADGES_RE.match(line):
+            flush()
+        else:
+            lines.append(line)
+    flush()
+    if code:
+        blocks.append(("code", "\n".join(code)))
+    return blocks
+
+
+def _clip(text: str, limit: int) -> str:
+    # End on a sentence if one finishes past half the limit, else on a word.
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind(".\n"))
+    if end > limit // 2:
+        return cut[:end + 1]
+    return cut.rsplit(None, 1)[0] + " …"
+
+
+def _head_lines(code: str, n: int) -> str:
+    lines = code.split("\n")
+    if len(lines) <= n + 2:
+        return code
+    return "\n".join(lines[:n + 1] + ["…", lines[-1] if _FENCE_RE.match(lines[-1]) else "```"])
+
+
+def shorten(text: str, limit: int) -> str:
+    """
+    Markdown cut to about `limit` characters, keeping its shape: headings and
+    the start of code blocks are kept, paragraphs are cut to their first
+    sentences, and HTML comments, tags and badge lines are dropped.
+    """
+    blocks = _blocks(text or "")
+    full = "\n\n".join(block for _, block in blocks)
+    if len(full) <= limit:
+        return full
+
+    out, used, dropped = [], 0, False
+    for kind, block in blocks:
+        if kind == "code":
+            block = _head_lines(block, CODE_LINES)
+        elif kind == "text":
+            block = _clip(block, PARAGRAPH_CHARS)
+        room = limit - used
+        if len(block) > room:
+            if kind != "text" or room < 80:
+                dropped = True
+                continue
+            block = _clip(block, room)
+        out.append(block)
+        used += len(block) + 2
+    if dropped or used > limit:
+        out.append("…")
+    return "\n\n".join(out)
+
+
+# -- compact rendering -------------------------------------------------------
+
+def compact(header: str, fields: Optional[dict] = None, texts: Optional[dict] = None,
+            items: Iterable[str] = ()) -> str:
+    """
+    A compact result: `header`, then one `key: value; ...` line for `fields`
+    (empty values skipped), then `items` one per line, then each of `texts`
+    (markdown) shortened to share what is left of the output budget. Long
+    text already returned this turn is replaced by a pointer to it.
+    """
+    lines = [header]
+    values = [f"{name}: {value}" for name, value in (fields or {}).items() if value not in (None, "")]
+    if values:
+        lines.append("; ".join(values))
+    lines.extend(items)
+    texts = {name: text.strip() for name, text in (texts or {}).items() if text and text.strip()}
+    if texts:
+        share = max(PARAGRAPH_CHARS, (budget_chars() - sum(len(line) + 1 for line in lines)) // len(texts))
+        for name, text in texts.items():
+            earlier = repeat_of(text)
+            if earlier is not None:
+                lines.append(f"{name}: (same as in the earlier {earlier} result)")
+            else:
+                lines.append(f"{name}:\n{shorten(text, share)}")
+    return "\n".join(lines)
@@ -0,0 +1,110 @@
+import heapq
+import posixpath
+from itertools import count
+from typing import Iterable
+
+# Files and directories listed in a review, largest changes first.
+TOP_FILES = 5
+TOP_DIRECTORIES = 5
+
+
+def _changes(f: dict) -> int:
+    return f.get("changes") or f.get("additions", 0) + f.get("deletions", 0)
+
+
+def _trim_patch(patch: str, budget: int) -> str:
+    """Cut a patch to at most `budget` bytes, at a line boundary."""
+    if len(patch.encode()) <= budget:
+        return patch
+    trimmed = patch.encode()[:budget].decode(errors="ignore")
+    return trimmed[:trimmed.rfind("\n") + 1] if "\n" in trimmed else ""
+
+
+class PRFilesSummary:
+    """
+    Aggregates a PR's changed files one page at a time, so the pages can be
+    dropped as soon as they are added: memory stays bounded by the number of
+    directories, TOP_FILES entries and `patch_budget` bytes of patches, however
+    large the PR is.
+
+    Keeps totals, per-directory file/addition/deletion counts, the files with
+    the most changes and, when `patch_budget` > 0, the patches of the most
+    changed files that fit in `patch_budget` bytes (UTF-8).
+    """
+
+    def __init__(self, top_files: int = TOP_FILES, patch_budget: int = 0):
+        self.top_n = top_files
+        self.patch_budget = patch_budget
+        self.files = 0
+        self.additions = 0
+        self.deletions = 0
+        self.directories: dict[str, list[int]] = {}
+        # Min-heaps of (changes, seq, ...), so the smallest entry is evicted first;
+        # `seq` keeps ties in input order and avoids comparing dicts.
+        self._top: list[tuple] = []
+        self._patches: list[tuple] = []
+        self._patch_bytes = 0
+        self._seq = count()
+
+    def add(self, files: Iterable[dict]) -> None:
+        for f in files:
+            additions, deletions, changes = f.get("additions", 0), f.get("deletions", 0), _changes(f)
+            self.files += 1
+            self.additions += additions
+            self.deletions += deletions
+
+            stats = self.directories.setdefault(posixpath.dirname(f["filename"]) or ".", [0, 0, 0])
+            stats[0] += 1
+            stats[1] += additions
+            stats[2] += deletions
+
+            # Negated sequence: among equal changes the earliest file wins.
+            entry = (changes, -next(self._seq), f["filename"], additions, deletions)
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, entry)
+            else:
+                heapq.heappushpop(self._top, entry)
+
+            if self.patch_budget and f.get("patch"):
+                self._add_patch(changes, entry[1], f["filename"], f["patch"])
+
+    def _add_patch(self, changes: int, seq: int, filename: str, patch: str) -> None:
+        patch = _trim_patch(patch, self.patch_budget)
+        if not patch:
+            return
+        size = len(patch.encode())
+        heapq.heappush(self._patches, (changes, seq, filename, patch, size))
+        self._patch_bytes += size
+        while self._patch_bytes > self.patch_budget:
+            self._patch_bytes -= heapq.heappop(self._patches)[-1]
+
+    def top_files(self) -> list[tuple[str, int, int]]:
+        """(filename, additions, deletions) of the most changed files, largest first."""
+        return [(name, adds, dels) for _, _, name, adds, dels in sorted(self._top, reverse=True)]
+
+    def top_directories(self, n: int = TOP_DIRECTORIES) -> list[tuple[str, int, int, int]]:
+        """(directory, files, additions, deletions) of the most changed directories."""
+        ranked = sorted(self.directories.items(), key=lambda item: item[1][1] + item[1][2], reverse=True)
+        return [(directory, *stats) for directory, stats in ranked[:n]]
+
+    def patches(self) -> list[tuple[str, str]]:
+        """(filename, patch) of the kept hunks, most changed file first."""
+        return [(name, patch) for _, _, name, patch, _ in sorted(self._patches, reverse=True)]
+
+    def dump(self) -> dict:
+        """JSON-serializable form, for the resource cache."""
+        return {
+            "top_n": self.top_n, "patch_budget": self.patch_budget,
+            "files": self.files, "additions": self.additions, "deletions": self.deletions,
+            "directories": self.directories, "top": self._top, "patches": self._patches,
+        }
+
+    @classmethod
+    def load(cls, value: dict) -> "PRFilesSummary":
+        summary = cls(value["top_n"], value["patch_budget"])
+        summary.files, summary.additions, summary.deletions = value["files"], value["additions"], value["deletions"]
+        summary.directories = {directory: list(stats) for directory, stats in value["directories"].items()}
+        summary._top = [tuple(entry) for entry in value["top"]]
+        summary._patches = [tuple(entry) for entry in value["patches"]]
+        summary._patch_bytes = sum(entry[-1] for entry in summary._patches)
+        return summary
@@ -0,0 +1,35 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.client.github_client import MAX_PER_PAGE
+
+# Argument schemas of the structured tools used by AGENT_MODE=tool_calling.
+# Field names match the parameters of the tool functions they are passed to.
+
+
+class RepoURLInput(BaseModel):
+    repo_url: str = Field(description="GitHub repository URL, e.g. https://github.com/owner/repo")
+
+
+class TopItemsInput(RepoURLInput):
+    limit: int = Field(10, ge=1, le=MAX_PER_PAGE, description="How many items to list")
+
+
+class IssueURLInput(BaseModel):
+    issue_url: str = Field(description="GitHub issue URL, e.g. https://github.com/owner/repo/issues/123")
+
+
+class PullURLInput(BaseModel):
+    pr_url: str = Field(description="GitHub pull request URL, e.g. https://github.com/owner/repo/pull/123")
+
+
+class RepoSearchInput(BaseModel):
+    name: str = Field(description="Repository name or keywords to search for")
+
+
+class LocalSearchInput(BaseModel):
+    query: str = Field(description="Words to search for in issue and PR titles, bodies and comments")
+    repo_url: Optional[str] = Field(None, description="Limit the search to this watched repository")
+    state: Literal["open", "closed", "all"] = Field("open", description="Which issues and PRs to search")
+    limit: int = Field(10, ge=1, le=50, description="How many matches to return")
@@ -1,14 +1,39 @@
-from langchain.tools import Tool
-from langchain_tavily import TavilySearch
+from langchain.tools import StructuredTool, Tool
+
+from app.tools.output import COMPACT, budget_chars, output_mode, shorten
+from app.tools.schemas import RepoSearchInput
+
+def _render_results(response) -> str:
+    text = f"{response}"
+    if output_mode() == COMPACT:
+        text = shorten(text, budget_chars())
+    return f"Final Answer:\n{text}"
 
 def _search_github_repo_link(name: str) -> str:
     """Search GitHub repository link by name using Tavily Search."""
+    # Imported lazily: langchain_tavily is slow to import and only needed here.
+    from langchain_tavily import TavilySearch
     search = TavilySearch()
     response = search.run(f"{name}")
-    return f"Final Answer:\n{response}"
+    return _render_results(response)
+
+async def _asearch_github_repo_link(name: str) -> str:
+    from langchain_tavily import TavilySearch
+    search = TavilySearch()
+    response = await search.arun(f"{name}")
+    return _render_results(response)
 
 search_github_repo = Tool(
     name="SearchGitHubRepo",
     func=_search_github_repo_link,
+    coroutine=_asearch_github_repo_link,
     description="Find GitHub repository link by name"
 )
+
+search_github_repo_structured = StructuredTool.from_function(
+    func=_search_github_repo_link,
+    coroutine=_asearch_github_repo_link,
+    name=search_github_repo.name,
+    description=search_github_repo.description,
+    args_schema=RepoSearchInput,
+)
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import re
+import threading
+from typing import Optional
+
+from langchain.tools import StructuredTool, Tool
+
+from app.client.embeddings import embed, embeddings_enabled, from_blobs
+from app.client.repo_store import get_repo_store
+from app.tools.github_resources import resource_key
+from app.tools.output import COMPACT, compact, output_mode
+from app.tools.schemas import LocalSearchInput
+from app.tools.watched_repos import watched_repos
+
+TOOL_NAME = "SearchLocalIssues"
+
+_REPO_PREFIX_RE = re.compile(r"^\s*(https?://github\.com/)?([\w.-]+)/([\w.-]+)/?(?:\s+|:\s*|$)")
+_WORD_RE = re.compile(r"\w+")
+# Reciprocal rank fusion constant: how much the top ranks dominate.
+RRF_K = 60
+
+# (repos, state, indexed_at) -> (items, matrix), rebuilt whenever the index changes.
+_vector_cache: dict = {}
+_vector_lock = threading.Lock()
+
+
+def _fts_query(query: str) -> Optional[str]:
+    # Quoted terms joined with OR: user text never breaks the FTS5 syntax, and
+    # BM25 ranks items matching more (and rarer) terms first.
+    words = _WORD_RE.findall(query)
+    return " OR ".join(f'"{w}"' for w in words) if words else None
+
+
+def _vector_index(repos: list[str], state: str):
+    store = get_repo_store()
+    key = (tuple(repos), state, store.indexed_at(repos))
+    with _vector_lock:
+        cached = _vector_cache.get(key[:2])
+        if cached is not None and cached[0] == key[2]:
+            return cached[1], cached[2]
+    items, blobs = store.vectors(repos, state)
+    matrix = from_blobs(blobs) if blobs else None
+    with _vector_lock:
+        _vector_cache[key[:2]] = (key[2], items, matrix)
+    return items, matrix
+
+
+def search_items(repos: list[str], query: str, state: str = "open", limit: int = 10) -> list[tuple]:
+    """
+    (repo, item, snippet) of the items of `repos` most relevant to `query`.
+
+    Full-text (BM25) matches are fused with embedding similarity when
+    embeddings are enabled (reciprocal rank fusion), so items that match the
+    words and items that match the meaning both surface; items that only
+    resemble the query below SEARCH_MIN_SIMILARITY are left out.
+    """
+    match = _fts_query(query)
+    if match is None:
+        return []
+    candidates = limit * 3
+    scores, found = {}, {}
+    for rank, (repo, item, snippet) in enumerate(get_repo_store().search_text(repos, match, state, candidates)):
+        scores[repo, item["number"]] = 1 / (RRF_K + rank)
+        found[repo, item["number"]] = (repo, item, snippet)
+
+    vector = embed(query) if embeddings_enabled() else None
+    if vector is not None:
+        items, matrix = _vector_index(repos, state)
+        if matrix is not None:
+            similarity = matrix @ vector
+            min_similarity = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.2"))
+            for rank, idx in enumerate(similarity.argsort()[::-1][:candidates]):
+                if similarity[idx] < min_similarity:
+                    break
+                repo, item = items[idx]
+                key = (repo, item["number"])
+                scores[key] = scores.get(key, 0) + 1 / (RRF_K + rank)
+                found.setdefault(key, (repo, item, None))
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [found[key] for key in ranked]
+
+
+def _snippet(item: dict, snippet: Optional[str]) -> str:
+    text = snippet or (item.get("body") or "").strip().split("\n", 1)[0][:160]
+    return " ".join(text.split())
+
+
+def _render_results(results: list, query: str, repos: list[str]) -> str:
+    where = repos[0] if len(repos) == 1 else f"{len(repos)} watched repos"
+    if not results:
+        return f"No indexed issues or PRs match '{query}' in {where}."
+    if output_mode() == COMPACT:
+        return compact(f"{len(results)} matches for '{query}' in {where}:", items=(
+            f"{repo if len(repos) > 1 else ''}#{item['number']} [{'PR' if 'pull_request' in item else 'issue'}, "
+            f"{item.get('state', 'open')}] {item['title']} ({item.get('comments', 0)}): {_snippet(item, snippet)[:120]}"
+            for repo, item, snippet in results
+        ))
+    lines = [f"🔎 Top {len(results)} matches for '{query}' in {where}:"]
+    for idx, (repo, item, snippet) in enumerate(results, 1):
+        kind = "PR" if "pull_request" in item else "issue"
+        prefix = f"{repo}" if len(repos) > 1 else ""
+        lines.append(
+            f"{idx}. {prefix}#{item['number']} [{kind}, {item.get('state', 'open')}] {item['title']} "
+            f"({item.get('comments', 0)} comments)\n   {_snippet(item, snippet)}"
+        )
+    return "\n".join(lines)
+
+
+def _search_local_issues(query: str, repo_url: Optional[str] = None, state: str = "open", limit: int = 10) -> str:
+    watched = sorted(str(key) for key in watched_repos())
+    if not watched:
+        return "No repositories are indexed locally. Set WATCHED_REPOS to index some."
+
+    if repo_url is None:
+        # Single-string input: "owner/repo <query>" (or a repo URL), or just a query.
+        # A bare "word/word" prefix names a repo only if it is watched: in
+        # "memory/leak in parser" it is part of the query.
+        m = _REPO_PREFIX_RE.match(query)
+        if m and (m.group(1) or str(resource_key(m.group(2), m.group(3))) in watched):
+            repo_url, query = f"{m.group(2)}/{m.group(3)}", query[m.end():]
+    if repo_url:
+        m = _REPO_PREFIX_RE.match(repo_url)
+        repo = str(resource_key(m.group(2), m.group(3))) if m else None
+        if repo not in watched:
+            return f"{repo_url} is not indexed locally. Indexed repos: {', '.join(watched)}"
+        repos = [repo]
+    else:
+        repos = watched
+
+    query = query.strip()
+    if not _fts_query(query):
+        return "Please give some words to search for."
+    try:
+        return _render_results(search_items(repos, query, state, limit), query, repos)
+    except Exception as e:
+        return f"Local search failed: {str(e)}"
+
+
+async def _asearch_local_issues(query: str, repo_url: Optional[str] = None, state: str = "open",
+                                limit: int = 10) -> str:
+    return await asyncio.to_thread(_search_local_issues, query, repo_url, state, limit)
+
+
+search_local_issues = Tool(
+    name=TOOL_NAME,
+    func=_search_local_issues,
+    coroutine=_asearch_local_issues,
+    description=(
+        "Search the open issues and PRs of the locally indexed (watched) repositories by "
+        "keywords, e.g. 'owner/repo memory leak'. Fast and free; use it to find issues about a topic."
+    ),
+)
+
+search_local_issues_structured = StructuredTool.from_function(
+    func=_search_local_issues,
+    coroutine=_asearch_local_issues,
+    name=search_local_issues.name,
+    description="Search the issues and PRs of the locally indexed (watched) repositories by keywords.",
+    args_schema=LocalSearchInput,
+)
+
+# Optional CLI test
+if __name__ == "__main__":
+    print(_search_local_issues("memory leak"))
@@ -0,0 +1,199 @@
+import asyncio
+import base64
+import logging
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Optional
+
+from app.client.github_client import MAX_PER_PAGE, get_github_client, parse_last_page
+from app.client.rate_limit import BACKGROUND
+from app.client.repo_store import RepoStore, get_repo_store
+from app.client.shared_cache import get_shared_cache
+from app.observability.metrics import WATCHED_LOOKUPS, WATCHED_SYNC_REQUESTS
+from app.tools.github_graphql import OVERVIEW_LIMIT
+from app.tools.github_resources import ResourceKey, resource_key
+
+logger = logging.getLogger(__name__)
+
+_REPO_RE = re.compile(r"^(?:https?://github\.com/)?([^/\s]+)/([^/\s]+?)/?$")
+
+
+@lru_cache(maxsize=1)
+def watched_repos() -> frozenset:
+    """WATCHED_REPOS: comma- or space-separated `owner/repo` names or repo URLs."""
+    repos = set()
+    for entry in re.split(r"[,\s]+", os.getenv("WATCHED_REPOS", "").strip()):
+        match = _REPO_RE.match(entry)
+        if match:
+            repos.add(resource_key(*match.groups()))
+        elif entry:
+            logger.warning("Ignoring invalid WATCHED_REPOS entry %r", entry)
+    return frozenset(repos)
+
+
+def _refresh_interval() -> float:
+    return float(os.getenv("WATCHED_REFRESH_INTERVAL", "300"))
+
+
+def local_overview(tool: str, key: ResourceKey, limit: int = OVERVIEW_LIMIT) -> Optional[dict]:
+    """
+    A watched repo's overview from the local store (same shape as the GraphQL
+    overview), or None if the repo is not watched, not synced yet, or was last
+    synced more than WATCHED_MAX_AGE seconds ago (the refresher is failing).
+    """
+    if key not in watched_repos():
+        return None
+    overview = get_repo_store().overview(str(key), limit)
+    max_age = float(os.getenv("WATCHED_MAX_AGE", str(3 * _refresh_interval())))
+    fresh = overview is not None and time.time() - overview["synced_at"] <= max_age
+    WATCHED_LOOKUPS.inc(tool=tool, result="hit" if fresh else "miss")
+    return overview if fresh else None
+
+
+async def alocal_overview(tool: str, key: ResourceKey, limit: int = OVERVIEW_LIMIT) -> Optional[dict]:
+    if key not in watched_repos():
+        return None
+    return await asyncio.to_thread(local_overview, tool, key, limit)
+
+
+class RepoRefresher:
+    """
+    Keeps the local store of watched repos up to date in the background.
+
+    Every `interval` seconds each repo's metadata, README, issues and pull
+    requests, and then their comments are synced incrementally:
+
+    - every request goes out with the ETag stored for it, so an unchanged
+      resource costs a 304 that GitHub does not count against the rate limit
+    - the issues endpoint (which also lists pull requests) is asked only for
+      items updated `since` the newest one stored, oldest first, so a sync
+      capped at `max_pages` resumes where it stopped; the first sync lists
+      open items only; comments are synced the same way
+    - requests run at BACKGROUND priority, leaving the reserved share of the
+      rate limit to interactive requests
+    """
+
+    def __init__(self, store: RepoStore, repos, interval: float = 300.0, max_pages: int = 10):
+        self.store = store
+        self.repos = sorted(repos)
+        self.interval = interval
+        self.max_pages = max_pages
+        self._task: Optional[asyncio.Task] = None
+
+    async def _get(self, repo: str, resource: str, path: str, params: Optional[dict] = None):
+        etag = await asyncio.to_thread(self.store.etag, repo, resource)
+        res = await get_github_client().aget(path, params=params, use_cache=False, priority=BACKGROUND, etag=etag)
+        WATCHED_SYNC_REQUESTS.inc(result={200: "changed", 304: "not_modified"}.get(res.status_code, "error"))
+        return res
+
+    async def _sync_metadata(self, repo: str, base: str) -> None:
+        res = await self._get(repo, "repo", base)
+        if res.status_code == 200:
+            await asyncio.to_thread(self.store.save_repo, repo, res.json())
+            await asyncio.to_thread(self.store.set_etag, repo, "repo", res.headers.get("ETag"))
+        elif res.status_code != 304:
+            raise RuntimeError(f"repo fetch failed: {res.status_code}")
+
+    async def _sync_readme(self, repo: str, base: str) -> None:
+        res = await self._get(repo, "readme", f"{base}/readme")
+        if res.status_code in (200, 404):
+            readme = (
+                base64.b64decode(res.json().get("content", "")).decode("utf-8", errors="ignore")
+                if res.status_code == 200 else None
+            )
+            await asyncio.to_thread(self.store.save_readme, repo, readme)
+            await asyncio.to_thread(self.store.set_etag, repo, "readme", res.headers.get("ETag"))
+
+    async def _sync_pages(self, repo: str, resource: str, path: str, params: dict, save) -> None:
+        """Fetch up to `max_pages` pages of a listing (the first revalidated by ETag) and `save` each."""
+        page, last_page = 1, 1
+        while page <= min(last_page, self.max_pages):
+            if page == 1:
+                res = await self._get(repo, resource, path, {**params, "page": page})
+            else:
+                res = await get_github_client().aget(
+                    path, params={**params, "page": page}, use_cache=False, priority=BACKGROUND
+                )
+            if res.status_code == 304:
+                break
+            if res.status_code != 200:
+                raise RuntimeError(f"{resource} fetch failed: {res.status_code}")
+            await asyncio.to_thread(save, repo, res.json())
+            if page == 1:
+                await asyncio.to_thread(self.store.set_etag, repo, resource, res.headers.get("ETag"))
+            last_page = parse_last_page(res.headers.get("Link"))
+            page += 1
+
+    async def _sync_items(self, repo: str, base: str) -> None:
+        since = await asyncio.to_thread(self.store.since, repo)
+        params = {"state": "all", "since": since} if since else {"state": "open"}
+        params.update({"sort": "updated", "direction": "asc", "per_page": MAX_PER_PAGE})
+        await self._sync_pages(repo, "issues", f"{base}/issues", params, self.store.upsert_items)
+
+    async def _sync_comments(self, repo: str, base: str) -> None:
+        # The first sync takes the newest comments (a repo can have far more
+        # than max_pages of them); later ones everything updated since.
+        since = await asyncio.to_thread(self.store.since, repo, "comments_since")
+        params = {"since": since, "direction": "asc"} if since else {"direction": "desc"}
+        params.update({"sort": "updated", "per_page": MAX_PER_PAGE})
+        await self._sync_pages(repo, "comments", f"{base}/issues/comments", params, self.store.upsert_comments)
+
+    async def _sync_repo(self, key: ResourceKey) -> None:
+        repo, base = str(key), f"/repos/{key.owner}/{key.repo}"
+        await asyncio.gather(
+            self._sync_metadata(repo, base),
+            self._sync_readme(repo, base),
+            self._sync_items(repo, base),
+        )
+        # After the items, so that new comments find their item to index.
+        await self._sync_comments(repo, base)
+        await asyncio.to_thread(self.store.mark_synced, repo)
+
+    async def refresh(self) -> None:
+        """Sync every watched repo once, concurrently; failures are logged per repo."""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._sync_repo(key) for key in self.repos), return_exceptions=True)
+        for key, result in zip(self.repos, results):
+            if isinstance(result, Exception):
+                logger.warning("Syncing watched repo %s failed: %s", key, result)
+        logger.info("Synced %d watched repos in %.2fs", len(self.repos), time.perf_counter() - start)
+
+    async def run(self) -> None:
+        # With several workers on a node, the one holding the lease syncs; the
+        # lease outlives two intervals, so another worker takes over if it dies.
+        shared, owner = get_shared_cache(), f"pid-{os.getpid()}"
+        while True:
+            try:
+                if shared is None or shared.acquire_lease("watched-repos", owner, 2 * self.interval):
+                    await self.refresh()
+            except Exception as e:
+                logger.error("Watched repo refresh failed: %s", str(e), exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def refresher_from_env() -> Optional[RepoRefresher]:
+    """A refresher for WATCHED_REPOS, or None if no repos are watched."""
+    repos = watched_repos()
+    if not repos:
+        return None
+    return RepoRefresher(
+        get_repo_store(),
+        repos,
+        interval=_refresh_interval(),
+        max_pages=int(os.getenv("WATCHED_MAX_PAGES", "10")),
+    )
@@ -0,0 +1,128 @@
+"""
+/chat under bursts, with and without admission control (coalescing of
+identical new-session questions, a concurrency cap and a bounded queue).
+
+Two bursts are sent at once to the in-process app with the fake LLM:
+
+- "identical": everyone asks the same question about one repo, as when a PR
+  link is shared with a team; coalesced, it runs the agent once
+- "distinct": more different questions than the server can run at once;
+  admitted requests keep a stable p99, the excess gets a fast 429/503
+
+Then a session is started, with room in the session table for it and twice
+the requests that can be admitted at once, and the distinct burst is sent
+again: refused requests must not take session slots and evict it (exits 1
+if its history is gone).
+
+    python benchmarks/bench_admission.py --burst 200 --max-concurrent 8 --max-queue 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.load_chat import _percentile
+
+
+async def _burst(client: httpx.AsyncClient, messages: list[str]) -> dict:
+    async def one(message):
+        start = time.perf_counter()
+        res = await client.post("/chat", json={"message": message})
+        return res.status_code, time.perf_counter() - start, res.headers.get("Retry-After")
+
+    results = await asyncio.gather(*(one(m) for m in messages))
+    ok = [elapsed for status, elapsed, _ in results if status == 200]
+    rejected = [elapsed for status, elapsed, _ in results if status in (429, 503)]
+    return {
+        "ok": len(ok),
+        "429": sum(status == 429 for status, _, _ in results),
+        "503": sum(status == 503 for status, _, _ in results),
+        "p50_ms": _percentile(ok, 50) * 1000,
+        "p99_ms": _percentile(ok, 99) * 1000,
+        "reject_p99_ms": _percentile(rejected, 99) * 1000,
+        "retry_after": max((int(r) for _, _, r in results if r), default=0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admission control benchmark")
+    parser.add_argument("--burst", type=int, default=200, help="Requests sent at once per burst")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="Fake LLM latency per call (s)")
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--queue-timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    os.environ["FAKE_LLM_DELAY"] = str(args.llm_delay)
+    import logging
+    logging.disable(logging.WARNING)
+
+    import app.routes.agent_router as agent_router
+    from benchmarks.fake_app import app, get_agent
+
+    bursts = {
+        "identical": ["Tell me about https://github.com/acme/widgets"] * args.burst,
+        "distinct": [f"Tell me about https://github.com/acme/repo-{i}" for i in range(args.burst)],
+    }
+    configs = {
+        "off": {"AGENT_MAX_CONCURRENT": "0", "AGENT_MAX_QUEUE": "0", "CHAT_COALESCE": "0"},
+        "on": {"AGENT_MAX_CONCURRENT": str(args.max_concurrent), "AGENT_MAX_QUEUE": str(args.max_queue),
+               "AGENT_QUEUE_TIMEOUT": str(args.queue_timeout), "CHAT_COALESCE": "1"},
+    }
+
+    async def session_survives(client, messages) -> bool:
+        os.environ.update(configs["on"])
+        # Room for the session and twice what can be admitted at once.
+        os.environ["MAX_SESSIONS"] = str(2 * (args.max_concurrent + args.max_queue) + 1)
+        agent_router.get_admission.cache_clear()
+        agent_router.get_sessions.cache_clear()
+        res = await client.post("/chat", json={"message": "Tell me about https://github.com/acme/widgets"})
+        session_id = res.json()["session_id"]
+        await _burst(client, messages)
+        return bool(get_agent().get_history(f"session-{session_id}"))
+
+    async def run_all():
+        rows = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            for burst, messages in bursts.items():
+                for name, env in configs.items():
+                    os.environ.update(env)
+                    agent_router.get_admission.cache_clear()
+                    llm_calls, requests = get_agent().llm.calls, server.requests
+                    result = await _burst(client, messages)
+                    rows.append((burst, name, result, get_agent().llm.calls - llm_calls, server.requests - requests))
+            survives = await session_survives(client, bursts["distinct"])
+        return rows, survives
+
+    rows, survives = asyncio.run(run_all())
+    server.stop()
+
+    print(f"burst={args.burst}  llm delay={args.llm_delay * 1000:.0f}ms  max concurrent={args.max_concurrent}  "
+          f"queue={args.max_queue}  queue timeout={args.queue_timeout:.0f}s")
+    print(f"{'burst':<10} {'admission':>9} {'ok':>5} {'429':>5} {'503':>5} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'reject p99 ms':>13} {'retry-after':>11} {'llm calls':>9} {'github req':>10}")
+    for burst, name, r, llm_calls, requests in rows:
+        print(f"{burst:<10} {name:>9} {r['ok']:>5} {r['429']:>5} {r['503']:>5} {r['p50_ms']:>8.0f} {r['p99_ms']:>8.0f} "
+              f"{r['reject_p99_ms']:>13.0f} {r['retry_after']:>11} {llm_calls:>9} {requests:>10}")
+    print(f"existing session kept through a rejected burst: {'yes' if survives else 'NO'}")
+    if not survives:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+LLM calls and latency per question: ReAct (AGENT_MODE=react) vs native tool
+calling (AGENT_MODE=tool_calling), with the fake chat model and fake GitHub.
+
+ReAct makes one LLM round-trip per tool call plus one for the answer; tool
+calling asks for every lookup in one turn and runs them concurrently, so
+multi-lookup questions ("compare these three issues") benefit most.
+
+    python benchmarks/bench_agent_modes.py --llm-delay 0.3 --latency 0.05 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.fake_llm import FakeChatModel
+
+REPO_URL = "https://github.com/acme/widgets"
+QUESTIONS = {
+    "one repo": f"Describe the repository {REPO_URL}",
+    "one PR": f"Review this pull request: {REPO_URL}/pull/42",
+    "three issues": (f"Compare {REPO_URL}/issues/1, {REPO_URL}/issues/2 "
+                     f"and {REPO_URL}/issues/3"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ReAct vs tool-calling agent benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.3, help="Fake LLM latency per call (s)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    import logging
+    logging.disable(logging.WARNING)
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from app.agent.github_agent import GitHubAgent
+
+    rows = []
+    for mode in ("react", "tool_calling"):
+        llm = FakeChatModel(delay=args.llm_delay)
+        agent = GitHubAgent(thread_id="bench", checkpointer=MemorySaver(), llm=llm,
+                            summarizer_llm=FakeChatModel(), agent_mode=mode)
+        for label, question in QUESTIONS.items():
+            samples, calls_before = [], llm.calls
+            for i in range(args.runs):
+                start = time.perf_counter()
+                asyncio.run(agent.achat(question, thread_id=f"{mode}-{label}-{i}"))
+                samples.append(time.perf_counter() - start)
+            rows.append((mode, label, (llm.calls - calls_before) / args.runs, statistics.median(samples) * 1000))
+    server.stop()
+
+    print(f"llm delay={args.llm_delay * 1000:.0f}ms  github latency={args.latency * 1000:.0f}ms  runs={args.runs}")
+    print(f"{'mode':<13} {'question':<13} {'LLM calls':>10} {'median ms':>10}")
+    for mode, label, calls, ms in rows:
+        print(f"{mode:<13} {label:<13} {calls:>10.1f} {ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Triage throughput: one /chat turn per issue vs the batch runner.
+
+- chat: `GitHubAgent.achat` for each issue URL in turn ("Summarize this
+  issue: ..."), which is what triaging through /chat amounts to today
+- batch details / batch fix: BatchRunner over the same URLs, with
+  `--concurrency` items in flight; fix suggestions go through `llm.abatch`
+
+Then items that fail (404s, a failing LLM) are run through each task: every
+one must come back with status "error" (exits 1 otherwise).
+
+    python benchmarks/bench_batch.py --issues 40 --llm-delay 0.3 --latency 0.05 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.fake_llm import FakeChatModel
+
+REPO_URL = "https://github.com/acme/widgets"
+# FakeGitHub answers 404 for everything in a repo named "missing".
+MISSING_URL = "https://github.com/acme/missing"
+
+
+class FailingChatModel(FakeChatModel):
+    async def _agenerate(self, *args, **kwargs):
+        raise RuntimeError("LLM unavailable")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential chat vs batch runner benchmark")
+    parser.add_argument("--issues", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.3, help="Fake LLM latency per call (s)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    import logging
+    logging.disable(logging.WARNING)
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    import app.tools.github_issue_review as github_issue_review
+    from app.agent.github_agent import GitHubAgent
+    from app.tools.batch import BatchRunner
+
+    urls = [f"{REPO_URL}/issues/{i}" for i in range(1, args.issues + 1)]
+    llm = FakeChatModel(delay=args.llm_delay)
+    github_issue_review.llm = llm
+    agent = GitHubAgent(thread_id="bench", checkpointer=MemorySaver(), llm=llm, summarizer_llm=llm)
+    runner = BatchRunner(concurrency=args.concurrency)
+
+    async def chat_each():
+        for i, url in enumerate(urls):
+            await agent.achat(f"Summarize this issue: {url}", thread_id=f"triage-{i}")
+
+    async def collect(task_urls, task):
+        return [result async for result in runner.run(task_urls, task)]
+
+    rows = []
+    for name, run in (("chat", chat_each), ("batch details", lambda: collect(urls, "details")),
+                      ("batch fix", lambda: collect(urls, "fix"))):
+        calls_before, start = llm.calls, time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        rows.append((name, elapsed, args.issues / elapsed, llm.calls - calls_before))
+
+    failures = {
+        "details": [f"{MISSING_URL}/issues/1", f"{MISSING_URL}/pull/2"],
+        "review": [f"{MISSING_URL}/pull/2"],
+        "fix": [f"{MISSING_URL}/issues/1", urls[0]],
+    }
+    github_issue_review.llm = FailingChatModel()
+    wrong = [f"{task} {item['url']}" for task, task_urls in failures.items()
+             for item in asyncio.run(collect(task_urls, task)) if item["status"] != "error"]
+    server.stop()
+
+    print(f"issues={args.issues}  concurrency={args.concurrency}  "
+          f"llm delay={args.llm_delay * 1000:.0f}ms  github latency={args.latency * 1000:.0f}ms")
+    print(f"{'mode':<14} {'total s':>8} {'items/s':>8} {'LLM calls':>10} {'speedup':>8}")
+    for name, elapsed, rate, calls in rows:
+        print(f"{name:<14} {elapsed:>8.2f} {rate:>8.1f} {calls:>10} {rate / rows[0][2]:>7.1f}x")
+    if wrong:
+        print(f"Failed items not reported as errors: {', '.join(wrong)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Per-turn cost of a model stuck in a ReAct loop, with and without request budgets.
+
+The fake chat model runs in `confused` mode: it never gives a final answer and
+keeps calling DescribeGitHubRepo. Without budgets the turn only ends at
+LangChain's default `max_iterations` (15). With budgets it ends at the first
+exhausted limit and returns a partial answer built from the tool output.
+
+    python benchmarks/bench_budget.py --llm-delay 0.05 --runs 5 --max-iterations 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.fake_llm import FakeChatModel
+
+QUESTION = "Tell me about https://github.com/acme/widgets"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ReAct request budget benchmark")
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Fake LLM latency per call (s)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=60.0)
+    parser.add_argument("--max-iterations", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=20000)
+    parser.add_argument("--max-github-calls", type=int, default=40)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    import logging
+    logging.disable(logging.WARNING)
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from app.agent.budget import BudgetLimits
+    from app.agent.github_agent import GitHubAgent
+
+    llm = FakeChatModel(delay=args.llm_delay, confused=True)
+    agent = GitHubAgent(thread_id="bench", checkpointer=MemorySaver(), llm=llm, summarizer_llm=FakeChatModel())
+    configs = [
+        # LangChain's AgentExecutor defaults: 15 iterations, no deadline.
+        ("unbounded", BudgetLimits(max_seconds=0, max_iterations=15, max_tokens=0, max_github_calls=0)),
+        ("budgeted", BudgetLimits(args.max_seconds, args.max_iterations, args.max_tokens, args.max_github_calls)),
+    ]
+
+    rows = []
+    for name, limits in configs:
+        samples, llm_before, github_before = [], llm.calls, server.requests
+        for i in range(args.runs):
+            start = time.perf_counter()
+            answer = asyncio.run(agent.achat(QUESTION, thread_id=f"{name}-{i}", limits=limits))
+            samples.append(time.perf_counter() - start)
+        rows.append((name, statistics.median(samples) * 1000, max(samples) * 1000,
+                     (llm.calls - llm_before) / args.runs, (server.requests - github_before) / args.runs,
+                     answer.splitlines()[0][:48]))
+    server.stop()
+
+    print(f"llm delay={args.llm_delay * 1000:.0f}ms  github latency={args.latency * 1000:.0f}ms  runs={args.runs}")
+    print(f"{'config':<10} {'p50 ms':>8} {'max ms':>8} {'LLM calls':>10} {'GitHub reqs':>12}  answer")
+    for name, p50, worst, llm_calls, github_calls, answer in rows:
+        print(f"{name:<10} {p50:>8.1f} {worst:>8.1f} {llm_calls:>10.1f} {github_calls:>12.1f}  {answer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Wall-clock comparison of sequential vs concurrent GitHub fan-out in
+GitHubPRReview and DescribeGitHubRepo, against the local fake GitHub server.
+
+    python benchmarks/bench_fanout.py --latency 0.05 --files 250
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+
+PR_URL = "https://github.com/acme/widgets/pull/42"
+REPO_URL = "https://github.com/acme/widgets"
+
+
+def _time(fn, runs: int) -> float:
+    fn()  # warm up the connection pool
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _atime(coro_fn, runs: int) -> float:
+    # One event loop for all runs: the async client is bound to its loop.
+    async def run():
+        await coro_fn()
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await coro_fn()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1000
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub fan-out benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server latency per request (s)")
+    parser.add_argument("--files", type=int, default=250, help="Changed files in the fake PR")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency, files_per_pr=args.files).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    # Always go to the (fake) network so we measure round-trips, not the cache.
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+
+    from app.client.github_client import MAX_PER_PAGE, get_github_client, parse_last_page
+    from app.tools.github_describe_repo import _adescribe_repo, _describe_repo, _fetch_readme, _format_repo
+    from app.tools.github_resources import resource_key
+    from app.tools.github_pr_review import _areview_pr, _render_review, _review_pr
+    from app.tools.pr_files import PRFilesSummary
+
+    github = get_github_client()
+
+    def sequential_review():
+        path = "/repos/acme/widgets/pulls/42"
+        pr = github.get(path).json()
+        summary, page, last_page = PRFilesSummary(), 1, 1
+        while page <= last_page:
+            res = github.get(f"{path}/files", params={"per_page": MAX_PER_PAGE, "page": page})
+            last_page = parse_last_page(res.headers.get("Link"))
+            summary.add(res.json())
+            page += 1
+        return _render_review(pr, summary)
+
+    def sequential_describe():
+        data = github.get("/repos/acme/widgets").json()
+        return _format_repo(data, _fetch_readme(resource_key("acme", "widgets")))
+
+    rows = [
+        ("PR review, sequential", _time(sequential_review, args.runs)),
+        ("PR review, concurrent (sync)", _time(lambda: _review_pr(PR_URL), args.runs)),
+        ("PR review, concurrent (async)", _atime(lambda: _areview_pr(PR_URL), args.runs)),
+        ("Describe repo, sequential", _time(sequential_describe, args.runs)),
+        ("Describe repo, concurrent (sync)", _time(lambda: _describe_repo(REPO_URL), args.runs)),
+        ("Describe repo, concurrent (async)", _atime(lambda: _adescribe_repo(REPO_URL), args.runs)),
+    ]
+    server.stop()
+
+    print(f"latency={args.latency * 1000:.0f}ms/request  files={args.files}  runs={args.runs}")
+    for name, ms in rows:
+        print(f"{name:<36} {ms:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Local issue search: index build, incremental updates and query latency of
+SearchLocalIssues over a synthetic repo, full-text only vs full text fused
+with hashed embeddings (needs NumPy).
+
+    python benchmarks/bench_local_search.py --items 5000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import TOPICS
+
+REPO = "acme/widgets"
+QUERIES = ["memory leak", "crash startup config", "proxy timeout", "readme typo", "windows unicode filename",
+           "retry-after ignored", "slow import cli", "leaking memry", "timeouts behind proxies"]
+FILLER = ("the of and to in is it that for on with as this was but be at by not are from or have an they which "
+          "one you were her all she there would their we him been has when who will more no if out so said").split()
+
+
+def _items(n: int, start: int = 1, updated: str = "2024-01-01T00:00:00Z") -> list[dict]:
+    rng = random.Random(start)
+    return [
+        {
+            "number": number,
+            "title": f"{TOPICS[number % len(TOPICS)]} ({number})",
+            "body": " ".join(rng.choice(FILLER) for _ in range(120)),
+            "state": "open",
+            "comments": number % 30,
+            "user": {"login": "someone"},
+            "created_at": updated,
+            "updated_at": updated,
+        }
+        for number in range(start, start + n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local issue search benchmark")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["WATCHED_REPOS"] = REPO
+    os.environ["REPO_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "repos.db")
+    import logging
+    logging.disable(logging.WARNING)
+
+    from app.client.embeddings import np
+    from app.client.repo_store import get_repo_store
+    from app.tools.search_local_issues import search_items
+
+    store = get_repo_store()
+    rows = []
+    for mode in ("off", "auto") if np is not None else ("off",):
+        os.environ["SEARCH_EMBEDDINGS"] = mode
+        store.clear()
+        start = time.perf_counter()
+        for offset in range(0, args.items, 100):  # one sync page at a time
+            store.upsert_items(REPO, _items(min(100, args.items - offset), offset + 1))
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.upsert_items(REPO, _items(10, 1, updated="2024-02-01T00:00:00Z"))
+        update = time.perf_counter() - start
+
+        search_items([REPO], QUERIES[0])  # load the vector matrix
+        samples = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            search_items([REPO], QUERIES[i % len(QUERIES)])
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        rows.append(("full text" if mode == "off" else "full text + embeddings", build, update,
+                     statistics.median(samples), samples[int(len(samples) * 0.99) - 1]))
+
+    print(f"items={args.items}  queries={args.queries}  numpy={'yes' if np is not None else 'no'}")
+    print(f"{'mode':<24} {'build s':>8} {'10-item update ms':>18} {'query p50 ms':>13} {'p99 ms':>7}")
+    for name, build, update, p50, p99 in rows:
+        print(f"{name:<24} {build:>8.2f} {update * 1000:>18.1f} {p50 * 1000:>13.2f} {p99 * 1000:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Peak memory and latency of GitHubPRReview on large PRs: every page of
+changed files buffered in a list (the previous behaviour) vs pages streamed
+into a PRFilesSummary, with and without a patch byte budget.
+
+Each run is a cold review (client and tool caches cleared first). "peak" is
+the tracemalloc high-water mark during the review, "retained" what is still
+allocated afterwards (pages held by the caches). The fake GitHub server runs
+in a child process so tracemalloc only sees the client side.
+
+    python benchmarks/bench_pr_review.py --files 3000 --patch-lines 4 --latency 0.02
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+
+PR_URL = "https://github.com/acme/widgets/pull/42"
+
+
+def _serve(conn, latency: float, files: int, patch_lines: int):
+    server = FakeGitHub(latency=latency, files_per_pr=files, patch_lines=patch_lines).start()
+    conn.send(server.url)
+    conn.recv()  # block until the parent is done
+    server.stop()
+
+
+def _measure(fn, reset, runs: int) -> tuple[float, float, float, str]:
+    fn()  # warm up the connection pool
+    samples, peaks, retained = [], [], []
+    for _ in range(runs):
+        reset()
+        tracemalloc.start()
+        start = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - start)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        retained.append(current)
+    return statistics.median(samples) * 1000, max(peaks) / 2**20, max(retained) / 2**20, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffered vs streaming PR review benchmark")
+    parser.add_argument("--files", type=int, default=3000, help="Changed files in the fake PR (GitHub caps at 3000)")
+    parser.add_argument("--patch-lines", type=int, default=4, help="Patch lines per changed line")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake server latency per request (s)")
+    parser.add_argument("--budget", type=int, default=16000, help="PR_PATCH_BUDGET for the last run (bytes)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve, args=(child, args.latency, args.files, args.patch_lines), daemon=True)
+    server.start()
+    os.environ["GITHUB_API_URL"] = parent.recv()
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    import logging
+    logging.disable(logging.WARNING)
+
+    from app.client.github_client import get_github_client, parse_last_page
+    from app.tools.github_pr_review import TOOL_NAME, _files_page, _render_review, _review_pr
+    from app.tools.github_resources import get_resource_cache, resource_key
+    from app.tools.pr_files import PRFilesSummary
+
+    github = get_github_client()
+    resources = get_resource_cache()
+    key = resource_key("acme", "widgets", 42)
+
+    def reset():
+        github.cache.clear()
+        resources.clear()
+
+    def buffered():
+        # What the tool did before: all pages fetched at once into one list.
+        meta_res, files_res = github.gather(
+            lambda: resources.get(TOOL_NAME, "pull", key),
+            lambda: resources.get(TOOL_NAME, "pull", key, "/files", params=_files_page(1)),
+        )
+        files = list(files_res.json())
+        for page_res in github.gather(*(
+            lambda page=page: resources.get(TOOL_NAME, "pull", key, "/files", params=_files_page(page))
+            for page in range(2, parse_last_page(files_res.headers.get("Link")) + 1)
+        )):
+            files.extend(page_res.json())
+        summary = PRFilesSummary()
+        summary.add(files)
+        return _render_review(meta_res.json(), summary)
+
+    def streaming(budget: int):
+        os.environ["PR_PATCH_BUDGET"] = str(budget)
+        return lambda: _review_pr(PR_URL)
+
+    rows = [
+        ("buffered", *_measure(buffered, reset, args.runs)),
+        ("streaming", *_measure(streaming(0), reset, args.runs)),
+        (f"streaming, {args.budget}B hunks", *_measure(streaming(args.budget), reset, args.runs)),
+    ]
+    parent.send("stop")
+    server.join()
+
+    print(f"files={args.files}  patch lines/change={args.patch_lines}  "
+          f"latency={args.latency * 1000:.0f}ms  window={os.getenv('PR_FILES_WINDOW', '8')} pages")
+    print(f"{'mode':<26} {'median ms':>10} {'peak MiB':>9} {'retained MiB':>13} {'output chars':>13}")
+    for name, ms, peak, retained, out in rows:
+        print(f"{name:<26} {ms:>10.1f} {peak:>9.1f} {retained:>13.1f} {len(out):>13}")
+
+
+if __name__ == "__main__":
+    main()
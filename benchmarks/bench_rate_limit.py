@@ -0,0 +1,98 @@
+"""
+Burst behaviour of the GitHub client against a rate-limited fake GitHub.
+
+- burst: `--requests` distinct issue lookups from `--concurrency` threads while
+  the fake only allows `--quota` requests per `--window` seconds. Compares a
+  client that sends everything immediately and returns whatever comes back
+  (the behaviour before the scheduler) with RateLimitScheduler.
+- single-flight: `--concurrency` identical lookups at once, with caching off.
+
+    python benchmarks/bench_rate_limit.py --requests 120 --quota 50 --window 2
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+
+
+def passthrough_scheduler():
+    from app.client.rate_limit import RateLimitScheduler
+
+    class Passthrough(RateLimitScheduler):
+        def _admit(self, priority, resource):
+            return 0.0
+
+        def observe(self, *args, **kwargs):
+            return None
+
+    return Passthrough()
+
+
+def burst(client, requests: int, concurrency: int) -> dict:
+    from app.client.rate_limit import RateLimitExceeded
+
+    def fetch(i):
+        try:
+            return client.get(f"/repos/acme/widgets/issues/{i + 1}").status_code
+        except RateLimitExceeded:
+            return "gave up"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(fetch, range(requests)))
+    return {
+        "ok": statuses.count(200),
+        "rate_limited": statuses.count(403),
+        "gave_up": statuses.count("gave up"),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub rate-limit scheduler benchmark")
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--quota", type=int, default=50, help="Fake GitHub requests allowed per window")
+    parser.add_argument("--window", type=float, default=2.0, help="Fake GitHub rate-limit window (s)")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rps", type=float, default=15.0, help="Scheduler token-bucket rate")
+    args = parser.parse_args()
+
+    from app.client.github_client import GitHubClient
+    from app.client.rate_limit import RateLimitScheduler
+
+    rows = []
+    for name, scheduler in [
+        ("unscheduled", passthrough_scheduler()),
+        ("scheduled", RateLimitScheduler(rate=args.rps, burst=int(args.rps * 2))),
+    ]:
+        server = FakeGitHub(latency=args.latency, rate_limit=args.quota, rate_window=args.window).start()
+        client = GitHubClient(base_url=server.url, cache_ttl=0, scheduler=scheduler)
+        result = burst(client, args.requests, args.concurrency)
+        rows.append((name, result, server.requests, scheduler.stats()))
+        server.stop()
+
+    server = FakeGitHub(latency=args.latency).start()
+    scheduler = RateLimitScheduler(rate=0)
+    client = GitHubClient(base_url=server.url, cache_ttl=0, scheduler=scheduler)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda _: client.get("/repos/acme/widgets/issues/7", use_cache=False), range(args.concurrency)))
+    server.stop()
+
+    print(f"burst: {args.requests} requests, concurrency={args.concurrency}, "
+          f"quota={args.quota}/{args.window:.0f}s, latency={args.latency * 1000:.0f}ms")
+    print(f"{'client':<12} {'ok':>5} {'403':>5} {'gave up':>8} {'upstream':>9} {'retries':>8} {'elapsed s':>10} {'ok/s':>7}")
+    for name, r, upstream, stats in rows:
+        print(f"{name:<12} {r['ok']:>5} {r['rate_limited']:>5} {r['gave_up']:>8} {upstream:>9} "
+              f"{stats['retries']:>8} {r['elapsed']:>10.2f} {r['ok'] / r['elapsed']:>7.1f}")
+    print(f"single-flight: {args.concurrency} identical concurrent requests -> {server.requests} upstream "
+          f"({scheduler.stats()['deduplicated']} deduplicated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+CPU cost of agent turns, replayed offline from recorded sessions (cassettes).
+
+A replay answers every LLM call and GitHub request from the cassette, so
+what is measured is the agent's own work: graph, summarization, tools and
+response parsing. Without --corpus a session is first recorded against the
+fake GitHub server and the fake LLM, which are then shut down; with it,
+every *.jsonl.gz cassette in the directory is replayed (record real traffic
+with `cli.py --record` or CASSETTE_DIR to build one).
+
+    python benchmarks/bench_replay.py --runs 5 --profile
+    python benchmarks/bench_replay.py --corpus cassettes/ --save baseline.json
+    # bisect a CPU regression: exits 1 when a cassette got >20% slower
+    git bisect run python benchmarks/bench_replay.py --corpus cassettes/ --baseline baseline.json
+
+It also exits 1 when a replay left anything in the GitHub client's cache:
+replays must neither read nor fill it.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPO_URL = "https://github.com/acme/widgets"
+SESSION = [
+    f"Describe the repository {REPO_URL}",
+    f"Review this pull request: {REPO_URL}/pull/42",
+    f"Compare {REPO_URL}/issues/1, {REPO_URL}/issues/2 and {REPO_URL}/issues/3",
+    f"What about {REPO_URL}/issues/4 and {REPO_URL}/pull/7?",
+]
+
+
+def record_session(path: str, mode: str) -> None:
+    """Record SESSION against the fake GitHub server and fake LLM into `path`."""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from app.agent.github_agent import GitHubAgent
+    from app.observability.cassette import Recorder
+    from benchmarks.fake_llm import FakeChatModel
+
+    agent = GitHubAgent(thread_id="bench-replay", checkpointer=MemorySaver(), llm=FakeChatModel(),
+                        summarizer_llm=FakeChatModel(), agent_mode=mode, recorder=Recorder(path=path))
+    for question in SESSION:
+        agent.chat(question)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmark / CPU regression check")
+    parser.add_argument("--corpus", help="Directory of recorded cassettes (default: record a fake session)")
+    parser.add_argument("--runs", type=int, default=5, help="Replays per cassette")
+    parser.add_argument("--method", choices=["chat", "achat", "astream"], default="achat")
+    parser.add_argument("--agent-mode", choices=["react", "tool_calling"], default="react",
+                        help="Agent mode of the recorded fake session")
+    parser.add_argument("--profile", action="store_true", help="Print a cProfile report of the last replay")
+    parser.add_argument("--save", metavar="FILE", help="Write median CPU ms per cassette to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare with a --save file; exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    import logging
+    logging.disable(logging.WARNING)
+
+    if args.corpus:
+        paths = sorted(glob.glob(os.path.join(args.corpus, "*.jsonl.gz")))
+        if not paths:
+            sys.exit(f"No *.jsonl.gz cassettes in {args.corpus}")
+    else:
+        from benchmarks.fake_github import FakeGitHub
+        server = FakeGitHub(latency=0.0).start()
+        os.environ["GITHUB_API_URL"] = server.url
+        paths = [os.path.join(tempfile.mkdtemp(prefix="cassettes-"), "fake-session.jsonl.gz")]
+        record_session(paths[0], args.agent_mode)
+        # From here on nothing answers on the network.
+        server.stop()
+
+    from app.agent.replay import format_report, load_cassette, replay, replay_agent
+    from app.client.github_client import get_github_client
+
+    github_cache = get_github_client().cache
+    github_cache.clear()
+
+    medians, regressed = {}, []
+    baseline = json.load(open(args.baseline)) if args.baseline else {}
+    print(f"{'cassette':<28} {'turns':>5} {'cpu ms':>8} {'min':>8} {'max':>8} {'faithful':>8} {'baseline':>8}")
+    for path in paths:
+        cassette = load_cassette(path)
+        agent = replay_agent(cassette)
+        samples, result = [], None
+        for i in range(args.runs):
+            result = replay(cassette, agent, method=args.method, profile=args.profile and i == args.runs - 1)
+            samples.append(result.cpu_seconds * 1000)
+        name = os.path.basename(path)
+        medians[name] = statistics.median(samples)
+        before = baseline.get(name)
+        if before is not None and medians[name] > before * (1 + args.tolerance):
+            regressed.append(name)
+        print(f"{name[:28]:<28} {len(result.turns):>5} {medians[name]:>8.1f} {min(samples):>8.1f} "
+              f"{max(samples):>8.1f} {'yes' if result.faithful else 'NO':>8} "
+              f"{'-' if before is None else f'{before:.1f}':>8}")
+        if args.profile:
+            print(format_report(result))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(medians, f, indent=2)
+    if len(github_cache):
+        print(f"Replays left {len(github_cache)} entries in the GitHub client cache")
+        sys.exit(1)
+    if regressed:
+        print(f"CPU regression (>{args.tolerance:.0%} over baseline): {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Round-trips and latency of a "tell me about this repo" question, REST vs
+GraphQL, against the local fake GitHub server.
+
+One question = DescribeGitHubRepo + ListTopIssues + ListTopPRs on the same
+repository, called one after another as the ReAct agent does. The tool
+resource cache is cleared before each question, so only sharing within a
+question counts.
+
+    python benchmarks/bench_repo_overview.py --latency 0.05 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+
+REPO_URL = "https://github.com/acme/widgets"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="REST vs GraphQL repository overview benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server latency per request (s)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    # GraphQL is only used with a token; the fake server accepts any.
+    os.environ["GITHUB_TOKEN"] = "fake-token"
+
+    from app.tools.github_describe_repo import github_describe_repo
+    from app.tools.github_resources import get_resource_cache
+    from app.tools.list_top_issues import list_top_issues
+    from app.tools.list_top_prs import list_top_prs
+
+    def question():
+        get_resource_cache().clear()
+        return [tool.run(REPO_URL) for tool in (github_describe_repo, list_top_issues, list_top_prs)]
+
+    rows = []
+    for backend in ("off", "auto"):
+        os.environ["GITHUB_GRAPHQL"] = backend
+        question()  # warm up the connection pool
+        samples, before = [], server.requests
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            answers = question()
+            samples.append(time.perf_counter() - start)
+        issues = answers[1].count("\n")
+        rows.append(("REST" if backend == "off" else "GraphQL", (server.requests - before) / args.runs,
+                     statistics.median(samples) * 1000, issues))
+    server.stop()
+
+    print(f"latency={args.latency * 1000:.0f}ms/request  runs={args.runs}")
+    print(f"{'backend':<8} {'requests/question':>18} {'median ms':>10} {'issues listed':>14}")
+    for name, requests, ms, issues in rows:
+        print(f"{name:<8} {requests:>18.1f} {ms:>10.1f} {issues:>14}")
+
+
+if __name__ == "__main__":
+    main()
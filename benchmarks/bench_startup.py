@@ -0,0 +1,87 @@
+"""
+Cold-start benchmark for the API server and the CLI.
+
+Each sample is a fresh interpreter:
+- main: `import main` (what uvicorn does before serving)
+- cli:  `python cli.py` until the "You:" prompt appears (the agent itself
+        is built in the background while the user types)
+
+    python benchmarks/bench_startup.py --runs 5 --importtime
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "main": [sys.executable, "-c", "import main"],
+    "cli": [sys.executable, "-u", "cli.py"],
+}
+PROMPT = b"You:"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # Constructing the OpenAI clients needs a key, not a network round-trip.
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    return env
+
+
+def _run_once(cmd: list[str]) -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=_env(), stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b""
+    while PROMPT not in output:
+        chunk = proc.stdout.read1(1024)
+        if not chunk:
+            break
+        output += chunk
+    elapsed = time.perf_counter() - start
+    proc.communicate(b"exit\n")
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(cmd)} exited with {proc.returncode}")
+    return elapsed
+
+
+def time_target(cmd: list[str], runs: int) -> list[float]:
+    """Wall time until the process prints its prompt, or exits if it has none."""
+    return [_run_once(cmd) for _ in range(runs)]
+
+
+def top_imports(target: str, limit: int) -> list[tuple[int, str]]:
+    """Slowest modules (cumulative microseconds) according to `-X importtime`."""
+    cmd = [sys.executable, "-X", "importtime"] + TARGETS[target][1:]
+    result = subprocess.run(cmd, cwd=ROOT, env=_env(), input="exit\n", text=True, capture_output=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", choices=["main", "cli", "all"], default="all")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports")
+    args = parser.parse_args()
+
+    targets = list(TARGETS) if args.target == "all" else [args.target]
+    for target in targets:
+        samples = time_target(TARGETS[target], args.runs)
+        print(f"{target:<5} median {statistics.median(samples) * 1000:8.1f} ms   "
+              f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+        if args.importtime:
+            for cumulative, name in top_imports(target, 10):
+                print(f"      {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: per-turn token accounting cost on long conversation threads.
+
+Compares re-encoding the whole history every turn (the old behaviour of
+`_summarize_old_messages`) with the incremental TokenAccountant.
+
+    python benchmarks/bench_token_accounting.py --turns 400
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agent.tokens import TokenAccountant
+
+SAMPLE_QUESTION = "Can you summarize the open issues in https://github.com/openai/openai-python and suggest fixes?"
+SAMPLE_ANSWER = (
+    "Here are the most discussed open issues, with a short summary of each and "
+    "a suggested next step. " * 8
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token accounting micro-benchmark")
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--report-every", type=int, default=50)
+    args = parser.parse_args()
+
+    accountant = TokenAccountant(args.model)
+    messages = []
+    token_counts, total_tokens = {}, 0
+
+    print(f"{'turn':>6} {'messages':>9} {'full re-encode ms':>18} {'incremental ms':>15}")
+    for turn in range(1, args.turns + 1):
+        messages.append(HumanMessage(content=f"{SAMPLE_QUESTION} ({turn})", id=f"h{turn}"))
+        messages.append(AIMessage(content=f"{SAMPLE_ANSWER} ({turn})", id=f"a{turn}"))
+
+        start = time.perf_counter()
+        full = sum(len(accountant.encoder.encode(m.content)) for m in messages)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        token_counts, total_tokens = accountant.update(messages, token_counts, total_tokens)
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        assert full == total_tokens, (full, total_tokens)
+        if turn % args.report_every == 0 or turn == 1:
+            print(f"{turn:>6} {len(messages):>9} {full_ms:>18.3f} {incremental_ms:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
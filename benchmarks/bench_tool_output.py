@@ -0,0 +1,84 @@
+"""
+Prompt tokens per question with rich vs compact tool outputs.
+
+Each question runs one agent turn on a fresh thread with the fake LLM against
+a fake GitHub serving realistic markdown (badges, HTML, code blocks, issue
+templates). Every tool observation is re-sent to the model on each later
+ReAct step, so the prompt tokens of a turn grow with the size of its tool
+outputs. "tool tokens" is the size of the turn's tool outputs, "prompt tokens"
+sums the prompts of all LLM calls of the turn, fixed ReAct prompt included.
+Both count about four characters per token, like the fake model.
+
+    python benchmarks/bench_tool_output.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.fake_llm import FakeChatModel, lookups
+
+REPO = "https://github.com/acme/widgets"
+QUESTIONS = [
+    ("describe repo", f"Tell me about {REPO}"),
+    ("two issues", f"Compare {REPO}/issues/3 and {REPO}/issues/5"),
+    ("PR review", f"Review {REPO}/pull/8"),
+    ("repo + issue + PR", f"Does {REPO}/pull/8 fix {REPO}/issues/7? Some context: {REPO}"),
+    ("repeated lookup", f"Summarize {REPO}/issues/7, then check {REPO}/issues/7 again for details"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool output mode benchmark")
+    parser.add_argument("--output-tokens", type=int, default=150, help="TOOL_OUTPUT_TOKENS for compact mode")
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=0.0, markdown=True).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    os.environ["TOOL_OUTPUT_TOKENS"] = str(args.output_tokens)
+    import logging
+    logging.disable(logging.WARNING)
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from app.agent.github_agent import GitHubAgent
+    from app.tools.output import output_scope
+
+    results = {}
+    for mode in ("rich", "compact"):
+        os.environ["TOOL_OUTPUT_MODE"] = mode
+        llm = FakeChatModel()
+        agent = GitHubAgent(thread_id="bench", checkpointer=MemorySaver(), llm=llm, summarizer_llm=FakeChatModel())
+        tools = {tool.name: tool for tool in agent.tools}
+        for i, (name, question) in enumerate(QUESTIONS):
+            # The lookups the fake model makes for the question, as the agent would run them.
+            with output_scope():
+                tool_chars = sum(len(tools[tool].run(url)) for tool, _, url in lookups(question))
+            tokens, calls = llm.prompt_tokens, llm.calls
+            agent.chat(question, thread_id=f"{mode}-{i}")
+            results[mode, name] = (tool_chars // 4, llm.prompt_tokens - tokens, llm.calls - calls)
+    server.stop()
+
+    print(f"compact budget={args.output_tokens} tokens per tool result")
+    print(f"{'':<18} {'':>9} {'tool tokens':^24} {'prompt tokens':^24}")
+    print(f"{'question':<18} {'llm calls':>9} {'rich':>7} {'compact':>8} {'saved':>7} {'rich':>7} {'compact':>8} {'saved':>7}")
+    totals = {"rich": [0, 0], "compact": [0, 0]}
+    for name, _ in QUESTIONS:
+        rich, compact = results["rich", name], results["compact", name]
+        for mode, (tool_tokens, prompt_tokens, _) in (("rich", rich), ("compact", compact)):
+            totals[mode][0] += tool_tokens
+            totals[mode][1] += prompt_tokens
+        print(f"{name:<18} {compact[2]:>9} {rich[0]:>7} {compact[0]:>8} {1 - compact[0] / rich[0]:>6.0%} "
+              f"{rich[1]:>7} {compact[1]:>8} {1 - compact[1] / rich[1]:>6.0%}")
+    rich, compact = totals["rich"], totals["compact"]
+    print(f"{'total':<18} {'':>9} {rich[0]:>7} {compact[0]:>8} {1 - compact[0] / rich[0]:>6.0%} "
+          f"{rich[1]:>7} {compact[1]:>8} {1 - compact[1] / rich[1]:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Repo questions answered from GitHub vs from the local store of watched repos.
+
+- github: DescribeGitHubRepo, ListTopIssues and ListTopPRs on a repo that is
+  not watched (every call goes to the fake GitHub; caches disabled)
+- watched: the same tools on a watched repo after one background sync
+- sync: what the refresher itself costs, cold and when nothing changed
+
+    python benchmarks/bench_watched_repos.py --latency 0.05 --runs 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+
+WATCHED_URL = "https://github.com/acme/widgets"
+OTHER_URL = "https://github.com/acme/gadgets"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watched repo local store benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ["GITHUB_CACHE_TTL"] = "0"
+    os.environ["TOOL_CACHE_TTL"] = "0"
+    os.environ["GITHUB_MAX_RPS"] = "0"
+    os.environ["WATCHED_REPOS"] = WATCHED_URL
+    os.environ["REPO_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "repos.db")
+    import logging
+    logging.disable(logging.WARNING)
+
+    from app.tools.github_describe_repo import _adescribe_repo
+    from app.tools.list_top_issues import _alist_top_issues
+    from app.tools.list_top_prs import _alist_top_prs
+    from app.tools.watched_repos import refresher_from_env
+
+    refresher = refresher_from_env()
+    tools = (("DescribeGitHubRepo", _adescribe_repo), ("ListTopIssues", _alist_top_issues),
+             ("ListTopPRs", _alist_top_prs))
+
+    async def sync(name):
+        requests, not_modified, start = server.requests, server.not_modified, time.perf_counter()
+        await refresher.refresh()
+        return (name, (time.perf_counter() - start) * 1000, server.requests - requests,
+                server.not_modified - not_modified)
+
+    async def timed(fn, url):
+        samples, requests = [], server.requests
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            await fn(url)
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1000, (server.requests - requests) / args.runs
+
+    async def run():
+        syncs = [await sync("cold sync"), await sync("sync, new watermark"), await sync("sync, unchanged")]
+        rows = []
+        for name, fn in tools:
+            await fn(OTHER_URL)  # warm up the connection pool
+            rows.append((name, *await timed(fn, OTHER_URL), *await timed(fn, WATCHED_URL)))
+        return syncs, rows
+
+    syncs, rows = asyncio.run(run())
+    server.stop()
+
+    print(f"github latency={args.latency * 1000:.0f}ms  runs={args.runs}")
+    print(f"{'tool':<20} {'github p50 ms':>14} {'req/call':>9} {'watched p50 ms':>15} {'req/call':>9}")
+    for name, github_ms, github_req, local_ms, local_req in rows:
+        print(f"{name:<20} {github_ms:>14.1f} {github_req:>9.1f} {local_ms:>15.2f} {local_req:>9.1f}")
+    print(f"\n{'refresher':<20} {'ms':>8} {'requests':>9} {'304s':>6}")
+    for name, ms, requests, not_modified in syncs:
+        print(f"{name:<20} {ms:>8.1f} {requests:>9} {not_modified:>6}")
+
+
+if __name__ == "__main__":
+    main()
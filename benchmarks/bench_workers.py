@@ -0,0 +1,110 @@
+"""
+/chat throughput as uvicorn workers are added (`serve.py`), with the fake
+LLM and fake GitHub, with and without the shared cache tier.
+
+Each configuration starts `serve.py --app benchmarks.fake_app:app`, waits for
+it, warms it up and runs the load_chat load generator against it. With the
+fake LLM a turn is mostly CPU (LangChain, LangGraph, tools), so throughput
+should grow with workers up to the number of cores; "github req" counts what
+the workers fetched, which the shared tier keeps flat as workers are added.
+
+    python benchmarks/bench_workers.py --workers 1,2,4 --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.load_chat import run as load
+from serve import available_cores
+
+MESSAGE = "Tell me about https://github.com/acme/widgets"
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during start-up")
+        try:
+            if httpx.get(f"{url}/metrics", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start in time")
+
+
+def _serve(workers: int, port: int, shared: bool, env: dict) -> subprocess.Popen:
+    env = dict(env)
+    if not shared:
+        env["SHARED_CACHE_PATH"] = ""  # serve.py keeps variables that are already set
+    return subprocess.Popen(
+        [sys.executable, "serve.py", "--app", "benchmarks.fake_app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def main():
+    cores = available_cores()
+    parser = argparse.ArgumentParser(description="uvicorn worker scaling benchmark")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8) if n == 1 or n <= max(2, cores)),
+                        help="Comma-separated worker counts")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="Fake LLM latency per call (s)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency).start()
+    tmp = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "GITHUB_API_URL": server.url,
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "sk-benchmark"),
+        "GITHUB_MAX_RPS": "0",
+        "LLM_CACHE_SIZE": "0",
+        "FAKE_LLM_DELAY": str(args.llm_delay),
+        "CHECKPOINT_DB_PATH": os.path.join(tmp, "checkpoints.db"),
+    }
+
+    rows = []
+    for workers in [int(n) for n in args.workers.split(",")]:
+        for shared in (False, True) if workers > 1 else (False,):
+            env["SHARED_CACHE_PATH"] = os.path.join(tmp, f"shared-{workers}.db")
+            port = args.port + len(rows)
+            proc = _serve(workers, port, shared, env)
+            try:
+                url = f"http://127.0.0.1:{port}"
+                _wait_ready(url, proc)
+                asyncio.run(load(f"{url}/chat", MESSAGE, min(args.concurrency, 8), 16, 60))  # warm up every worker
+                requests = server.requests
+                result = asyncio.run(load(f"{url}/chat", MESSAGE, args.concurrency, args.requests, 120))
+                rows.append((workers, shared, result, server.requests - requests))
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+    server.stop()
+
+    print(f"cores={cores}  requests={args.requests}  concurrency={args.concurrency}  "
+          f"github latency={args.latency * 1000:.0f}ms  llm delay={args.llm_delay * 1000:.0f}ms")
+    print(f"{'workers':>7} {'shared':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'github req':>11} {'scaling':>8}")
+    base = rows[0][2]["throughput_rps"] or 1
+    for workers, shared, result, github in rows:
+        print(f"{workers:>7} {'yes' if shared else 'no':>7} {result['throughput_rps']:>8.1f} {result['p50_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['errors']:>7} {github:>11} {result['throughput_rps'] / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
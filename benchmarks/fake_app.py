@@ -0,0 +1,21 @@
+"""
+`main:app` with the agent's LLM replaced by FakeChatModel, for benchmarks
+that run real uvicorn workers (e.g. `serve.py --app benchmarks.fake_app:app`).
+FAKE_LLM_DELAY sets the fake model's latency per call in seconds.
+"""
+import os
+from functools import lru_cache
+
+import app.routes.agent_router as agent_router
+from benchmarks.fake_llm import FakeChatModel
+from main import app  # noqa: F401  (the ASGI app uvicorn loads)
+
+
+@lru_cache(maxsize=1)
+def get_agent():
+    from app.agent.github_agent import GitHubAgent
+    llm = FakeChatModel(delay=float(os.getenv("FAKE_LLM_DELAY", "0")))
+    return GitHubAgent(thread_id="api-session", llm=llm, summarizer_llm=llm)
+
+
+agent_router.get_agent = get_agent
@@ -0,0 +1,400 @@
+"""
+Local stand-in for the parts of the GitHub REST API the tools use.
+
+Every response is generated deterministically from the request path, and
+each request sleeps for `latency` seconds to model the network round-trip.
+List endpoints paginate with a `Link` header, responses carry an ETag and
+honour If-None-Match (304s don't count against the limit, as on GitHub), and
+`rate_limit` requests per `rate_window` seconds are allowed before 403s with
+X-RateLimit-* headers are returned. `POST /graphql` answers the repository
+overview query (any query is treated as that one) from the same data.
+Every path under a repository named `missing` is a 404, for error paths.
+
+    server = FakeGitHub(latency=0.05).start()
+    os.environ["GITHUB_API_URL"] = server.url   # before importing app.*
+    ...
+    server.stop()
+"""
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROUTES = [
+    ("repo", re.compile(r"^/repos/([^/]+)/([^/]+)$")),
+    ("readme", re.compile(r"^/repos/([^/]+)/([^/]+)/readme$")),
+    ("issues", re.compile(r"^/repos/([^/]+)/([^/]+)/issues$")),
+    ("issue_comments", re.compile(r"^/repos/([^/]+)/([^/]+)/issues/comments$")),
+    ("issue", re.compile(r"^/repos/([^/]+)/([^/]+)/issues/(\d+)$")),
+    ("pulls", re.compile(r"^/repos/([^/]+)/([^/]+)/pulls$")),
+    ("pull", re.compile(r"^/repos/([^/]+)/([^/]+)/pulls/(\d+)$")),
+    ("pull_files", re.compile(r"^/repos/([^/]+)/([^/]+)/pulls/(\d+)/files$")),
+]
+
+
+# Issue topics, so local search has something to tell apart.
+TOPICS = [
+    "Memory leak when streaming large responses",
+    "Crash on startup with an empty config file",
+    "Timeout errors behind a corporate proxy",
+    "Typo in the installation section of the README",
+    "Unicode filenames are rejected on Windows",
+    "Retry logic ignores the Retry-After header",
+    "Slow imports make the CLI sluggish",
+]
+
+# With `markdown=True`: README and issue/PR bodies shaped like real ones
+# (badges, HTML, headings, code blocks, issue-template comments).
+MARKDOWN_README = """[![CI](https://github.com/{owner}/{repo}/actions/workflows/ci.yml/badge.svg)](https://github.com/{owner}/{repo}/actions) [![PyPI](https://img.shields.io/pypi/v/{repo}.svg)](https://pypi.org/project/{repo}/) [![License](https://img.shields.io/badge/license-MIT-blue.svg)](LICENSE)
+
+<p align="center"><img src="docs/logo.png" alt="{repo}" width="240"></p>
+
+# {repo}
+
+{repo} is a small, fast library for building and serving widgets. It gives you a typed API, async support, pluggable storage backends and a CLI for day-to-day tasks. It is used in production by teams of every size, and it aims to stay dependency-light and easy to embed in existing applications.
+
+## Installation
+
+```sh
+pip install {repo}
+```
+
+## Quick start
+
+```python
+from {repo} import Client
+
+client = Client(api_key="...")
+widget = client.widgets.create(name="demo", size=3)
+for item in client.widgets.list(limit=10):
+    print(item.name, item.size)
+client.widgets.delete(widget.id)
+```
+
+## Configuration
+
+""" + "".join(f"- `OPTION_{i}`: controls behaviour number {i} of the client; see the docs for defaults and examples.\n" for i in range(12)) + """
+## Contributing
+
+We welcome contributions! Please read CONTRIBUTING.md and our code of conduct before opening a pull request. """ + "Run the test suite locally and keep changes focused. " * 12 + """
+
+## License
+
+MIT
+"""
+MARKDOWN_ISSUE = """<!-- Thanks for reporting! Please fill in the template below. Issues without a reproduction may be closed. -->
+
+### Describe the bug
+
+{topic}. It started after upgrading to the latest release and happens every time with the settings below. """ + "The process keeps running but the output is wrong. " * 6 + """
+
+### To Reproduce
+
+```python
+from widgets import Client
+client = Client()
+client.run(step={number})
+```
+
+### Expected behavior
+
+It should work as in the previous release.
+
+### Environment
+
+<!-- Please complete the following information. -->
+- OS: Ubuntu 22.04
+- Python: 3.11
+- Version: 2.{number}.0
+"""
+
+
+class FakeGitHub:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        files_per_pr: int = 250,
+        open_items: int = 60,
+        rate_limit: int = 5000,
+        rate_window: float = 3600.0,
+        patch_lines: int = 0,
+        markdown: bool = False,
+    ):
+        self.latency = latency
+        self.files_per_pr = files_per_pr
+        # Patch lines per changed line; 0 serves the same small patch for every file.
+        self.patch_lines = patch_lines
+        self.open_items = open_items
+        self.markdown = markdown
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self._used = 0
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._server = None
+        # Issue/PR number -> updated_at override, set by touch().
+        self._updated: dict[int, str] = {}
+
+    def _take_quota(self) -> tuple[bool, dict]:
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start, self._used = now, 0
+            allowed = self._used < self.rate_limit
+            if allowed:
+                self._used += 1
+            reset = int(self._window_start + self.rate_window)
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(max(0, self.rate_limit - self._used)),
+                "X-RateLimit-Reset": str(reset),
+            }
+            if not allowed:
+                self.rate_limited += 1
+                headers["Retry-After"] = str(max(1, int(reset - now)))
+            return allowed, headers
+
+    # -- data ----------------------------------------------------------------
+
+    def _repo(self, owner, repo):
+        return {
+            "full_name": f"{owner}/{repo}",
+            "description": f"Fake repository {owner}/{repo}",
+            "open_issues_count": self.open_items,
+        }
+
+    def _readme(self, owner, repo):
+        text = f"# {repo}\n\n" + "This is a generated README line.\n" * 80
+        if self.markdown:
+            text = MARKDOWN_README.format(owner=owner, repo=repo)
+        return {"content": base64.b64encode(text.encode()).decode()}
+
+    def touch(self, number: int) -> None:
+        """Mark issue/PR `number` as updated now, as a new comment would."""
+        with self._lock:
+            self._updated[number] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def _updated_at(self, number):
+        return self._updated.get(number, f"2024-01-{number % 28 + 1:02d}T12:00:00Z")
+
+    def _issue(self, owner, repo, number):
+        return {
+            "number": number,
+            "title": f"Issue {number} in {owner}/{repo}",
+            "html_url": f"https://github.com/{owner}/{repo}/issues/{number}",
+            "body": (
+                MARKDOWN_ISSUE.format(topic=TOPICS[number % len(TOPICS)], number=number) if self.markdown
+                else f"{TOPICS[number % len(TOPICS)]}.\n" + f"Steps to reproduce issue {number}.\n" * 20
+            ),
+            "state": "open",
+            "comments": (number * 7) % 50,
+            "user": {"login": f"user{number % 13}"},
+            "created_at": f"2024-01-{number % 28 + 1:02d}T00:00:00Z",
+            "updated_at": self._updated_at(number),
+        }
+
+    def _comments(self, owner, repo):
+        # Every third issue/PR has two comments.
+        return [
+            {
+                "id": number * 10 + i,
+                "issue_url": f"{self.url}/repos/{owner}/{repo}/issues/{number}",
+                "body": f"Also seeing this: {TOPICS[(number + i) % len(TOPICS)].lower()}.",
+                "updated_at": self._updated_at(number),
+            }
+            for number in range(3, self.open_items + 1, 3)
+            for i in range(2)
+        ]
+
+    def _pull(self, owner, repo, number):
+        return {
+            "number": number,
+            "title": f"PR {number} in {owner}/{repo}",
+            "html_url": f"https://github.com/{owner}/{repo}/pull/{number}",
+            "body": f"Fixes #{number - 1} and #{number - 2}.\n" + "Change details.\n" * 10,
+            "user": {"login": f"user{number % 13}"},
+            "changed_files": self.files_per_pr,
+        }
+
+    def _pull_file(self, idx):
+        additions, deletions = (idx * 3) % 40, (idx * 5) % 25
+        patch = "@@ -1,3 +1,4 @@\n-old line\n+new line\n+another line\n"
+        if self.patch_lines:
+            patch = (
+                f"@@ -1,{deletions} +1,{additions} @@\n"
+                + f"-old line of file_{idx}.py\n" * (deletions * self.patch_lines)
+                + f"+new line of file_{idx}.py\n" * (additions * self.patch_lines)
+            )
+        return {
+            "filename": f"src/module_{idx % 17}/file_{idx}.py",
+            "additions": additions,
+            "deletions": deletions,
+            "changes": additions + deletions,
+            "patch": patch,
+        }
+
+    def _page(self, items, query, path):
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        total_pages = max(1, -(-len(items) // per_page))
+        headers = {}
+        if total_pages > 1:
+            headers["Link"] = (
+                f'<{self.url}{path}?per_page={per_page}&page={min(page + 1, total_pages)}>; rel="next", '
+                f'<{self.url}{path}?per_page={per_page}&page={total_pages}>; rel="last"'
+            )
+        return items[(page - 1) * per_page: page * per_page], headers
+
+    def handle(self, path: str, query: dict):
+        if path.split("/")[3:4] == ["missing"]:
+            return 404, {"message": "Not Found"}, {}
+        for name, pattern in ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            args = match.groups()
+            if name == "repo":
+                return 200, self._repo(*args), {}
+            if name == "readme":
+                return 200, self._readme(*args), {}
+            if name == "issue":
+                return 200, self._issue(args[0], args[1], int(args[2])), {}
+            if name == "pull":
+                return 200, self._pull(args[0], args[1], int(args[2])), {}
+            if name == "issue_comments":
+                items = self._comments(args[0], args[1])
+                if "since" in query:
+                    items = [c for c in items if c["updated_at"] >= query["since"][0]]
+                items.sort(key=lambda c: c["updated_at"], reverse=query.get("direction") == ["desc"])
+                body, headers = self._page(items, query, path)
+                return 200, body, headers
+            if name == "issues":
+                items = [self._issue(args[0], args[1], n) for n in range(1, self.open_items + 1)]
+                for item in items[::4]:
+                    item["pull_request"] = {}
+                if "since" in query:
+                    items = [i for i in items if i["updated_at"] >= query["since"][0]]
+                if query.get("sort") == ["updated"]:
+                    items.sort(key=lambda i: i["updated_at"], reverse=query.get("direction") != ["asc"])
+                else:
+                    items.sort(key=lambda i: i["comments"], reverse=True)
+                body, headers = self._page(items, query, path)
+                return 200, body, headers
+            if name == "pulls":
+                items = [self._pull(args[0], args[1], n) for n in range(self.open_items, 0, -1)]
+                body, headers = self._page(items, query, path)
+                return 200, body, headers
+            if name == "pull_files":
+                # Only the requested page is built, so huge PRs stay cheap to serve.
+                body, headers = self._page(range(self.files_per_pr), query, path)
+                body = [self._pull_file(i) for i in body]
+                return 200, body, headers
+        return 404, {"message": "Not Found"}, {}
+
+    def graphql(self, variables: dict) -> dict:
+        owner, repo, limit = variables["owner"], variables["name"], variables.get("limit", 10)
+        items = [self._issue(owner, repo, n) for n in range(1, self.open_items + 1)]
+        issues = sorted(items[1::4] + items[2::4] + items[3::4], key=lambda i: i["comments"], reverse=True)
+        pulls = [self._pull(owner, repo, n) for n in range(self.open_items, 0, -1)]
+        readme = base64.b64decode(self._readme(owner, repo)["content"]).decode()
+        return {"data": {"repository": {
+            "nameWithOwner": f"{owner}/{repo}",
+            "description": self._repo(owner, repo)["description"],
+            "openIssues": {"totalCount": len(issues)},
+            "openPRs": {"totalCount": len(pulls)},
+            "readme0": {"text": readme},
+            "topIssues": {"nodes": [
+                {"number": i["number"], "title": i["title"], "comments": {"totalCount": i["comments"]}}
+                for i in issues[:limit]
+            ]},
+            "topPRs": {"nodes": [
+                {"number": p["number"], "title": p["title"], "author": {"login": p["user"]["login"]}}
+                for p in pulls[:limit]
+            ]},
+        }}}
+
+    # -- server --------------------------------------------------------------
+
+    def start(self) -> "FakeGitHub":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                parsed = urlparse(self.path)
+                time.sleep(fake.latency)
+                status, body, headers = fake.handle(parsed.path, parse_qs(parsed.query))
+                payload = json.dumps(body).encode()
+                etag = f'"{hashlib.md5(payload).hexdigest()}"'
+
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    with fake._lock:
+                        fake.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                allowed, quota_headers = fake._take_quota()
+                headers.update(quota_headers)
+                if not allowed:
+                    status, payload = 403, json.dumps({"message": "API rate limit exceeded"}).encode()
+                elif status == 200:
+                    headers["ETag"] = etag
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                with fake._lock:
+                    fake.requests += 1
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                time.sleep(fake.latency)
+                allowed, headers = fake._take_quota()
+                if urlparse(self.path).path != "/graphql":
+                    status, payload = 404, json.dumps({"message": "Not Found"}).encode()
+                elif not allowed:
+                    status, payload = 403, json.dumps({"message": "API rate limit exceeded"}).encode()
+                else:
+                    status, payload = 200, json.dumps(fake.graphql(request.get("variables") or {})).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
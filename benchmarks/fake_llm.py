@@ -0,0 +1,148 @@
+"""
+Deterministic stand-in chat model for benchmarks.
+
+It speaks the ReAct text protocol used by GitHubAgent: it picks a tool for
+each GitHub URL in the question, one per step, and once every URL has an
+observation in the scratchpad it returns a final answer built from them.
+Bound to tools (AGENT_MODE=tool_calling) it requests all of those lookups as
+native tool calls in a single turn instead. Anything that is not an agent
+prompt (summaries, fix suggestions) gets a short canned reply.
+A fixed `delay` per call models LLM latency. With `confused=True` it never
+settles on an answer and keeps calling the same tool, like a model stuck in
+a ReAct loop. Token usage is reported as roughly four characters per token.
+"""
+import asyncio
+import json
+import re
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+URL_RE = re.compile(r"https?://github\.com/[^\s'\"]+")
+ISSUE_RE = re.compile(r"https?://github\.com/[^/\s]+/[^/\s#]+/issues/\d+")
+PR_RE = re.compile(r"https?://github\.com/[^/\s]+/[^/\s]+/pull/\d+")
+REPO_RE = re.compile(r"https?://github\.com/[^/\s]+/[^/\s]+")
+
+
+def _prompt_text(messages: list[BaseMessage]) -> str:
+    return "\n".join(m.content if isinstance(m.content, str) else str(m.content) for m in messages)
+
+
+# Tool and argument name for each kind of GitHub URL.
+LOOKUPS = ((PR_RE, "GitHubPRReview", "pr_url"), (ISSUE_RE, "GitHubIssueDetails", "issue_url"),
+           (REPO_RE, "DescribeGitHubRepo", "repo_url"))
+NO_URL_ANSWER = "I can only help with GitHub repositories, issues and PRs."
+
+
+def lookups(question: str) -> list[tuple[str, str, str]]:
+    """(tool, argument, url) for each GitHub URL in `question`."""
+    found = []
+    for url in URL_RE.findall(question):
+        url = url.rstrip(".,)'\"")
+        for pattern, tool, arg in LOOKUPS:
+            if match := pattern.match(url):
+                found.append((tool, arg, match.group(0)))
+                break
+    return found
+
+
+def _answer(observations: list[str]) -> str:
+    return " | ".join((o.strip().splitlines() or ["no data"])[0] for o in observations)
+
+
+def react_step(prompt: str, confused: bool = False) -> str:
+    """The next ReAct generation for `prompt`."""
+    if "Thought:" not in prompt:
+        return "Here is a concise summary of the conversation so far."
+    # The prompt template ends with the scratchpad; only look at the part after the question.
+    question, _, scratchpad = prompt.rpartition("Question:")[2].partition("Thought:")
+    # The question is the formatted message history; only the latest user message counts.
+    todo = lookups(question.rpartition("HumanMessage(content=")[2])
+    observations = scratchpad.split("Observation:")[1:]
+    if not todo:
+        return f"Thought: I can answer directly\nFinal Answer: {NO_URL_ANSWER}"
+    if len(observations) >= len(todo) and not confused:
+        return f"Thought: I now know the final answer\nFinal Answer: {_answer(observations)}"
+    tool, _, url = todo[len(observations) % len(todo)]
+    return f"Thought: I should look this up\nAction: {tool}\nAction Input: {url}"
+
+
+def tool_calling_step(messages: list[BaseMessage], confused: bool = False) -> AIMessage:
+    """The next native tool-calling turn: every lookup at once, then the answer."""
+    last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+    results = [m.content for m in messages[last_human:] if isinstance(m, ToolMessage)]
+    todo = lookups(messages[last_human].content)
+    if not todo:
+        return AIMessage(content=NO_URL_ANSWER)
+    if results and not confused:
+        return AIMessage(content=_answer(results))
+    calls = [{"name": tool, "args": {arg: url}, "id": f"call_{len(results)}_{i}"}
+             for i, (tool, arg, url) in enumerate(todo)]
+    return AIMessage(content="", tool_calls=calls)
+
+
+class FakeChatModel(BaseChatModel):
+    delay: float = 0.0
+    confused: bool = False
+    calls: int = 0
+    # Sum of the prompt tokens reported so far.
+    prompt_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-react"
+
+    @property
+    def model_name(self) -> str:
+        return "gpt-4o-mini"
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _reply(self, messages: list[BaseMessage], tools: Optional[list]) -> AIMessage:
+        self.calls += 1
+        if tools and "Thought:" not in _prompt_text(messages):
+            return tool_calling_step(messages, self.confused)
+        return AIMessage(content=react_step(_prompt_text(messages), self.confused))
+
+    @staticmethod
+    def _usage(messages: list[BaseMessage], reply: AIMessage) -> dict:
+        completion = reply.content + json.dumps(reply.tool_calls)
+        prompt_tokens, completion_tokens = len(_prompt_text(messages)) // 4, len(completion) // 4
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _result(self, messages: list[BaseMessage], tools: Optional[list]) -> ChatResult:
+        reply = self._reply(messages, tools)
+        reply.usage_metadata = self._usage(messages, reply)
+        self.prompt_tokens += reply.usage_metadata["input_tokens"]
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.delay)
+        return self._result(messages, kwargs.get("tools"))
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return self._result(messages, kwargs.get("tools"))
+
+    async def _astream(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any):
+        await asyncio.sleep(self.delay)
+        reply = self._reply(messages, kwargs.get("tools"))
+        for token in re.split(r"(\s+)", reply.content):
+            if token:
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+                if run_manager:
+                    await run_manager.on_llm_new_token(token, chunk=chunk)
+                yield chunk
+        tool_call_chunks = [
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+            for i, call in enumerate(reply.tool_calls)
+        ]
+        # Like OpenAI with stream_options include_usage: usage arrives in a final chunk.
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", tool_call_chunks=tool_call_chunks, usage_metadata=self._usage(messages, reply)))
@@ -0,0 +1,89 @@
+"""
+Concurrent load test for the /chat endpoint.
+
+Start the server first (e.g. `uvicorn main:app --port 8000`), then:
+
+    python benchmarks/load_chat.py --concurrency 32 --requests 256
+
+Run it once against a build with the blocking handler and once against the
+async one to compare throughput on a single uvicorn worker.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _worker(client: httpx.AsyncClient, url: str, message: str, queue: asyncio.Queue, latencies: list, errors: list):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            res = await client.post(url, json={"message": message})
+            if res.status_code != 200:
+                errors.append(res.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url: str, message: str, concurrency: int, total: int, timeout: float) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    latencies: list[float] = []
+    errors: list = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, url, message, queue, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /chat endpoint")
+    parser.add_argument("--url", default="http://localhost:8000/chat")
+    parser.add_argument("--message", default="Describe the repository https://github.com/openai/openai-python")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.message, args.concurrency, args.requests, args.timeout))
+    for key, value in result.items():
+        print(f"{key:>15}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+End-to-end latency benchmarks with no network access.
+
+Starts the local fake GitHub server, swaps the OpenAI models for the
+deterministic FakeChatModel, and drives every tool in app/tools/ plus
+GitHubAgent.chat / achat. Reports p50/p99 latency, throughput and the peak
+memory allocated per call (tracemalloc, measured in a separate pass so it
+does not skew the timings).
+
+    python benchmarks/run_benchmarks.py --scenario all --iterations 50 --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.fake_llm import FakeChatModel
+
+REPO_URL = "https://github.com/acme/widgets"
+ISSUE_URL = "https://github.com/acme/widgets/issues/7"
+PR_URL = "https://github.com/acme/widgets/pull/42"
+
+QUESTIONS = [
+    f"Describe the repository {REPO_URL}",
+    f"Summarize this issue: {ISSUE_URL}",
+    f"Review this pull request: {PR_URL}",
+    "What can you do?",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(name: str, latencies: list[float], elapsed: float, peak_kib: float) -> dict:
+    return {
+        "scenario": name,
+        "calls": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "peak_kib": peak_kib,
+    }
+
+
+def measure_allocations(fn, samples: int = 3) -> float:
+    """Average peak KiB allocated while running `fn` once."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks)
+
+
+def run_threaded(fn, iterations: int, concurrency: int) -> tuple[list[float], float]:
+    def timed(i):
+        start = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(iterations)))
+    return latencies, time.perf_counter() - start
+
+
+async def run_async(coro_fn, iterations: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await coro_fn(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(iterations)))
+    return latencies, time.perf_counter() - start
+
+
+def tool_scenarios(args) -> list[dict]:
+    from app.tools.github_describe_repo import github_describe_repo
+    from app.tools.github_issue_details import github_issue_details
+    from app.tools.github_issue_review import github_issue_fixer
+    from app.tools.github_pr_details import github_pr_details
+    from app.tools.github_pr_review import github_review_pr
+    from app.tools.list_top_issues import list_top_issues
+    from app.tools.list_top_prs import list_top_prs
+
+    # SearchGitHubRepo is left out: it calls Tavily, which has no local stand-in.
+    cases = [
+        (github_describe_repo, REPO_URL),
+        (github_issue_details, ISSUE_URL),
+        (github_pr_details, PR_URL),
+        (list_top_issues, REPO_URL),
+        (list_top_prs, REPO_URL),
+        (github_review_pr, PR_URL),
+        (github_issue_fixer, ISSUE_URL),
+    ]
+    results = []
+    for tool, url in cases:
+        latencies, elapsed = run_threaded(lambda _: tool.run(url), args.iterations, args.concurrency)
+        peak = measure_allocations(lambda: tool.run(url))
+        results.append(report(tool.name, latencies, elapsed, peak))
+    return results
+
+
+def agent_scenarios(args) -> list[dict]:
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from app.agent.github_agent import GitHubAgent
+
+    agent = GitHubAgent(
+        thread_id="bench",
+        checkpointer=MemorySaver(),
+        llm=FakeChatModel(delay=args.llm_delay),
+        summarizer_llm=FakeChatModel(delay=args.llm_delay),
+    )
+
+    def chat(i):
+        agent.chat(QUESTIONS[i % len(QUESTIONS)], thread_id=f"sync-{i % args.concurrency}")
+
+    async def achat(i):
+        await agent.achat(QUESTIONS[i % len(QUESTIONS)], thread_id=f"async-{i % args.concurrency}")
+
+    results = []
+    latencies, elapsed = run_threaded(chat, args.iterations, args.concurrency)
+    results.append(report("GitHubAgent.chat", latencies, elapsed, measure_allocations(lambda: chat(0))))
+
+    latencies, elapsed = asyncio.run(run_async(achat, args.iterations, args.concurrency))
+    results.append(report("GitHubAgent.achat", latencies, elapsed, measure_allocations(lambda: asyncio.run(achat(0)))))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline latency benchmarks for the GitHub agent and tools")
+    parser.add_argument("--scenario", choices=["tools", "agent", "all"], default="all")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.03, help="Fake GitHub latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Fake LLM latency per call (s)")
+    parser.add_argument("--rate-limit", type=int, default=100000, help="Fake GitHub requests per hour")
+    parser.add_argument("--github-rps", type=float, default=0, help="Client token-bucket rate (0 = unthrottled)")
+    parser.add_argument("--cache", action="store_true", help="Keep the GitHub response and tool resource caches enabled")
+    args = parser.parse_args()
+
+    server = FakeGitHub(latency=args.latency, rate_limit=args.rate_limit).start()
+    os.environ["GITHUB_API_URL"] = server.url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["GITHUB_MAX_RPS"] = str(args.github_rps)
+    if not args.cache:
+        os.environ["GITHUB_CACHE_TTL"] = "0"
+        os.environ["TOOL_CACHE_TTL"] = "0"
+        os.environ["LLM_CACHE_SIZE"] = "0"
+    # Never read or pollute the real LLM response cache.
+    os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-"), "llm_cache.db")
+    logging.disable(logging.INFO)
+
+    import app.tools.github_issue_review as github_issue_review
+    github_issue_review.llm = FakeChatModel(delay=args.llm_delay)
+    # Build the shared singletons up front so concurrent first calls don't race to create them.
+    from app.client.github_client import get_github_client
+    from app.client.llm_cache import get_llm_cache
+    from app.tools.github_resources import get_resource_cache
+    get_github_client(), get_llm_cache(), get_resource_cache()
+
+    results = []
+    if args.scenario in ("tools", "all"):
+        results += tool_scenarios(args)
+    if args.scenario in ("agent", "all"):
+        results += agent_scenarios(args)
+    server.stop()
+
+    print(f"github latency={args.latency * 1000:.0f}ms  llm delay={args.llm_delay * 1000:.0f}ms  "
+          f"iterations={args.iterations}  concurrency={args.concurrency}  cache={'on' if args.cache else 'off'}")
+    print(f"{'scenario':<22} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'peak KiB':>9}")
+    for r in results:
+        print(f"{r['scenario']:<22} {r['calls']:>6} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+              f"{r['throughput']:>9.1f} {r['peak_kib']:>9.1f}")
+    print(f"fake GitHub: {server.requests} requests, {server.not_modified} not modified, {server.rate_limited} rate limited")
+    if args.cache:
+        print(f"  LLM response cache: {get_llm_cache().stats()}")
+        for tool, counts in sorted(get_resource_cache().stats().items()):
+            print(f"  {tool:<20} resource cache hit rate {counts['hit_rate']:.0%} "
+                  f"({counts['hits']} hits / {counts['misses']} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,80 @@
 # cli.py
-from app.agent.github_agent import GitHubAgent
+import argparse
+import asyncio
+import json
+import sys
+from typing import Optional
 
-agent = GitHubAgent(thread_id="cli-session")
 
-print("🤖 GitHub Agent Ready. Type 'exit' to quit.")
-while True:
-    user_input = input("You: ")
-    if user_input.lower() in {"exit", "quit"}:
-        break
-    response = agent.chat(user_input)
-    print("Bot:", response)
+def _build_agent(record: Optional[str] = None):
+    # Importing the agent stack (langchain, openai) dominates start-up time,
+    # so it happens in the background while the user types the first question.
+    from app.agent.github_agent import GitHubAgent
+    from app.observability.cassette import Recorder
+    return GitHubAgent(thread_id="cli-session", recorder=Recorder(path=record) if record else None)
+
+
+async def main(record: Optional[str] = None):
+    agent_task = asyncio.create_task(asyncio.to_thread(_build_agent, record))
+    print("🤖 GitHub Agent Ready. Type 'exit' to quit.")
+    while True:
+        user_input = await asyncio.to_thread(input, "You: ")
+        if user_input.lower() in {"exit", "quit"}:
+            break
+        agent = await agent_task
+
+        streamed = False
+        async for event in agent.astream(user_input):
+            if event["event"] == "tool_start":
+                print(f"  🔧 {event['tool']}...", flush=True)
+            elif event["event"] == "token":
+                if not streamed:
+                    print("Bot: ", end="", flush=True)
+                    streamed = True
+                print(event["text"], end="", flush=True)
+            elif event["event"] == "final":
+                # The graph may replace the streamed answer (e.g. with a fallback message).
+                if not streamed:
+                    print("Bot:", event["response"])
+                else:
+                    print()
+
+
+def run_replay(path: str, profile: bool, strict: bool):
+    """Re-run a recorded session offline, the way the chat loop runs it, and print its timings."""
+    from app.agent.replay import ASTREAM, format_report, load_cassette, replay
+    result = replay(load_cassette(path, strict=strict), method=ASTREAM, profile=profile)
+    for turn in result.turns:
+        print("You:", turn["input"])
+        print("Bot:", turn["output"])
+    print(format_report(result))
+    return 0 if result.faithful else 1
+
+
+async def run_batch(task: str, urls: list[str]):
+    """Print one JSON line per URL as each finishes (same format as the /batch API)."""
+    from app.tools.batch import batch_runner_from_env
+    async for result in batch_runner_from_env().run(urls, task):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat with the GitHub agent, or batch-process issue/PR URLs")
+    parser.add_argument("--batch", metavar="TASK", choices=["details", "review", "fix"],
+                        help="Run TASK over URLs given as arguments (or one per line on stdin) and print NDJSON")
+    parser.add_argument("urls", nargs="*", help="Issue or PR URLs for --batch")
+    parser.add_argument("--record", metavar="CASSETTE",
+                        help="Record the session's LLM calls and GitHub responses into CASSETTE (.jsonl.gz)")
+    parser.add_argument("--replay", metavar="CASSETTE",
+                        help="Re-run a recorded session offline and print per-turn and per-node timings")
+    parser.add_argument("--profile", action="store_true", help="With --replay: add a cProfile report")
+    parser.add_argument("--strict", action="store_true",
+                        help="With --replay: fail LLM calls that do not match a recorded request")
+    args = parser.parse_args()
+    if args.batch:
+        urls = args.urls or [line.strip() for line in sys.stdin if line.strip()]
+        asyncio.run(run_batch(args.batch, urls))
+    elif args.replay:
+        sys.exit(run_replay(args.replay, args.profile, args.strict))
+    else:
+        asyncio.run(main(args.record))
@@ -1,11 +1,31 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.routes.agent_router import router as agent_router
+from app.routes.batch_router import router as batch_router
+from app.routes.metrics_router import router as metrics_router
 from fastapi.staticfiles import StaticFiles
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep WATCHED_REPOS synced into the local store while the app runs; the
+    # refresher (and the GitHub client) is only imported when repos are watched.
+    refresher = None
+    if os.getenv("WATCHED_REPOS", "").strip():
+        from app.tools.watched_repos import refresher_from_env
+        refresher = refresher_from_env()
+    if refresher is not None:
+        refresher.start()
+    yield
+    if refresher is not None:
+        await refresher.stop()
+
 app = FastAPI(
     title="MCP LC Agent",
     description="LangChain-powered agent API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 # Mount static files at /static
 app.mount("/static", StaticFiles(directory="static", html=True), name="static")
@@ -19,3 +39,5 @@ def serve_ui():
 
 # Include your agent router
 app.include_router(agent_router)
+app.include_router(batch_router)
+app.include_router(metrics_router)
@@ -0,0 +1,58 @@
+# serve.py
+"""
+Run the API with several uvicorn worker processes on one node.
+
+    python serve.py                 # one worker per available CPU core
+    python serve.py --workers 4 --port 8000
+
+Workers share state through local files rather than memory:
+
+- SHARED_CACHE_PATH: GitHub responses, tool resources and session activity
+  (defaults to a file on /dev/shm, i.e. shared memory, when it exists)
+- CHECKPOINT_BACKEND=sqlite: conversation threads, so any worker can serve
+  any session
+- the LLM response cache and the watched-repo store, which are SQLite already
+
+Variables already set in the environment are left alone.
+"""
+import argparse
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+
+def available_cores() -> int:
+    # Respects CPU affinity (taskset, container cpusets) where the OS reports it.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_shared_cache_path(port: int) -> str:
+    # One file per port, so two deployments on a node don't share entries.
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else "data"
+    return os.path.join(directory, f"lc-github-agent-{port}.db")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Multi-worker API server")
+    parser.add_argument("--app", default="main:app", help="ASGI app import string")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+                        help="Worker processes (default: WEB_CONCURRENCY, else one per core)")
+    args = parser.parse_args()
+
+    workers = args.workers or available_cores()
+    if workers > 1:
+        os.environ.setdefault("SHARED_CACHE_PATH", default_shared_cache_path(args.port))
+        os.environ.setdefault("CHECKPOINT_BACKEND", "sqlite")
+    print(f"Starting {workers} worker(s) on {args.host}:{args.port} "
+          f"(shared cache: {os.getenv('SHARED_CACHE_PATH') or 'off'})")
+    uvicorn.run(args.app, host=args.host, port=args.port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()